@@ -16,6 +16,7 @@ export default class SACApi {
     this.roles = new Roles(this.axiosInstance);
     this.servers = new Servers(this.axiosInstance);
     this.serverPrivileges = new ServerPrivileges(this.axiosInstance);
+    this.players = new Players(this.axiosInstance);
     this.webhookLogs = new WebhookLogs(this.axiosInstance);
     this.rotations = new Rotations(this.axiosInstance);
   }
@@ -144,6 +145,10 @@ class Servers {
     return this.axios.delete(`/v1/api/privileged/servers/${id}/`);
   }
 
+  playersPermissions(id, steamIDs) {
+    return this.axios.post(`/v1/api/privileged/servers/${id}/players_permissions/`, { steam_ids: steamIDs });
+  }
+
   getServerConfig(url) {
     return this.axios.get(`/v1/api/privileged/server_config/${url}/`, {
       responseType: "text",
@@ -181,6 +186,16 @@ class ServerPrivileges {
   }
 }
 
+class Players {
+  constructor(axiosInstance) {
+    this.axios = axiosInstance;
+  }
+
+  access(steamID) {
+    return this.axios.get(`/v1/api/privileged/players/${steamID}/access/`);
+  }
+}
+
 class WebhookLogs {
   constructor(axiosInstance) {
     this.axios = axiosInstance;
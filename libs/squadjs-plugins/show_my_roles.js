@@ -30,17 +30,9 @@ export default class ShowMyRoles extends BasePlugin {
   constructor(server, options, connectors) {
     super(server, options, connectors);
     this.sacAPI = new SACApi(this.options.api_endpoint, this.options.token);
-
-    this.rolesMap = new Map(); // {id: title}
-
-    this.updateRolesMap = this.updateRolesMap.bind(this);
   }
 
   async mount() {
-    await this.updateRolesMap();
-
-    this.server.on("ROUND_ENDED", this.updateRolesMap);
-
     for (const command of this.options.commands) {
       this.server.on(`CHAT_COMMAND:${command}`, (data) => {
         if (data.player) {
@@ -54,33 +46,26 @@ export default class ShowMyRoles extends BasePlugin {
     let response;
 
     try {
-      response = await this.sacAPI.serverPrivileges.list({
-        privileged_steam_id: player.steamID,
-        limit: 30,
-        is_active: true,
-      });
+      response = await this.sacAPI.players.access(player.steamID);
     } catch (error) {
       this.verbose(1, `Ошибка при получении списка привилегий ${error}`);
       await this.warn(player.steamID, "Ошибка при получении списка вип");
       return;
     }
 
-    if (!response.data.count) {
+    if (!response.data.grants.length) {
       await this.warn(player.steamID, "Пока что у вас нет работающих привилегий :)");
       return;
     }
 
     let bulkMessages = [];
 
-    for (let privileged of response.data.results) {
-      let roleNames = [];
-      for (let role of privileged.roles) {
-        roleNames.push(this.rolesMap.get(role));
-      }
+    for (let grant of response.data.grants) {
+      let roleNames = grant.roles.map((role) => role.title);
 
       let formattedDate;
-      if (privileged.date_of_end) {
-        formattedDate = this.formatDate(new Date(privileged.date_of_end));
+      if (grant.date_of_end) {
+        formattedDate = this.formatDate(new Date(grant.date_of_end));
       } else {
         formattedDate = "бессрочно";
       }
@@ -99,20 +84,6 @@ export default class ShowMyRoles extends BasePlugin {
     }
   }
 
-  async updateRolesMap() {
-    let response;
-    try {
-      response = await this.sacAPI.roles.list({ limit: 100 });
-    } catch (error) {
-      this.verbose(1, `Ошибка при получении списка ролей ${error}`);
-      return;
-    }
-
-    for (let role of response.data.results) {
-      this.rolesMap.set(role.id, role.title);
-    }
-  }
-
   formatDate(dt) {
     const day = dt.getDate().toString().padStart(2, "0");
     const month = (dt.getMonth() + 1).toString().padStart(2, "0");
@@ -16,6 +16,9 @@ class WebhookLogAdmin(admin.ModelAdmin):
         "webhook_info",
         "request_info",
         "level",
+        "outcome",
+        "ip",
+        "steam_id",
         "creation_date",
         "content_type",
         "object_id",
@@ -24,7 +27,10 @@ class WebhookLogAdmin(admin.ModelAdmin):
     readonly_fields = ("id", "creation_date", "content_object_link")
     list_display = (
         "level",
+        "outcome",
         "message_display",
+        "ip",
+        "steam_id",
         "creation_date",
         "content_object_link",
     )
@@ -32,7 +38,9 @@ class WebhookLogAdmin(admin.ModelAdmin):
         "creation_date",
         "content_type",
         ("level", AllValuesFieldListFilter),
+        "outcome",
     )
+    search_fields = ("=ip", "=steam_id")
 
     @admin.display(description="Сообщение")
     def message_display(self, obj):
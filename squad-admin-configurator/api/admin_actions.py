@@ -1,17 +1,23 @@
+from collections.abc import Iterable
+
 from django.conf import settings
+from server_admins.services.server_config import server__generate_config
 
 from .models import AdminsConfigDistribution
 
 
-def create_local_configs() -> None:
+def create_local_configs(server_ids: Iterable[int] | None = None) -> None:
     """
     Генерация локальных конфигов администраторов
-    для всех необходимых серверов
+    для всех необходимых серверов, или только для переданных
     """
-    distributions = AdminsConfigDistribution.objects.filter(
+    distributions = AdminsConfigDistribution.objects.select_related("server").filter(
         type_of_distribution__in=AdminsConfigDistribution.TYPES_OF_DISTRIBUTION_WITH_LOCAL  # noqa: E501
     )
 
+    if server_ids is not None:
+        distributions = distributions.filter(server_id__in=server_ids)
+
     for distribution in distributions:
         if distribution.is_active:
             create_local_config(distribution)
@@ -32,4 +38,4 @@ def create_local_config(distrib: AdminsConfigDistribution) -> None:
         "w",
         encoding="utf-8",
     ) as file:
-        file.write(distrib.server.get_config())
+        file.write(server__generate_config(server=distrib.server))
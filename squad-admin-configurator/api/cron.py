@@ -1,7 +1,9 @@
 from django.conf import settings
 from django_cron import CronJobBase, Schedule
+from server_admins.services.change_log import change_log__compact
 
 from .admin_actions import create_local_configs
+from .services.webhook_log import webhook_log__delete_old
 
 EXPIRED_PRIVILEGED_CHAT = settings.DISCORD["EXPIRED_PRIVILEGED_CHAT"]
 
@@ -12,3 +14,22 @@ class CreateAdminsConfig(CronJobBase):
 
     def do(self) -> None:
         create_local_configs()
+
+
+class DeleteOldWebhookLogs(CronJobBase):
+    schedule = Schedule(run_every_mins=60)
+    code = "Удаление старых логов вебхуков"
+
+    def do(self) -> None:
+        webhook_log__delete_old(
+            older_than_days=settings.WEBHOOK_LOGS["DELETE_OLDER_THAN"],
+            max_records_by_level=settings.WEBHOOK_LOGS["MAX_RECORDS_BY_LEVEL"],
+        )
+
+
+class CompactChangeLog(CronJobBase):
+    schedule = Schedule(run_every_mins=60)
+    code = "Удаление старых записей журнала изменений"
+
+    def do(self) -> None:
+        change_log__compact(older_than_days=settings.CHANGE_LOG["DELETE_OLDER_THAN"])
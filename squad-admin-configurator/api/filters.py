@@ -1,10 +1,24 @@
 import django_filters
+from django.db.models import Exists, OuterRef, QuerySet
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from server_admins.models import Privileged, Role, Server, ServerPrivileged
 
+from .models import WebhookLog
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
+
+
+# Фильтры по связанным записям через коррелированный подзапрос EXISTS: в отличие
+# от join с DISTINCT, каждая запись списка проверяется по индексу связи один раз,
+# без дублей и сортировки промежуточного результата
+
 
 class ServerFilter(django_filters.FilterSet):
-    privileged_steam_id = django_filters.NumberFilter("privileged_accesses__privileged__steam_id", distinct=True)
-    privileged_name = django_filters.CharFilter("privileged_accesses__privileged__name", "icontains", distinct=True)
+    privileged_steam_id = django_filters.NumberFilter(method="filter_privileged_accesses")
+    privileged_name = django_filters.CharFilter(method="filter_privileged_accesses")
     title = django_filters.CharFilter("title", "icontains")
 
     class Meta:
@@ -15,19 +29,22 @@ class ServerFilter(django_filters.FilterSet):
             "description",
         )
 
+    def filter_privileged_accesses(self, queryset: QuerySet[Server], name: str, value) -> QuerySet[Server]:
+        lookup = {
+            "privileged_steam_id": "privileged__steam_id",
+            "privileged_name": "privileged__name__icontains",
+        }[name]
+        return queryset.filter(Exists(ServerPrivileged.objects.filter(server=OuterRef("pk"), **{lookup: value})))
+
 
 class RoleFilter(django_filters.FilterSet):
     privileged_steam_id = django_filters.NumberFilter(
-        "privileged_accesses__privileged__steam_id",
-        distinct=True,
-        label="Steam ID пользователя у которого есть связь с ролью",
+        method="filter_privileged_accesses", label="Steam ID пользователя у которого есть связь с ролью"
     )
     privileged = django_filters.ModelChoiceFilter(
-        "privileged_accesses__privileged", queryset=Privileged.objects.all(), distinct=True, label="ID пользователя"
-    )
-    permission = django_filters.CharFilter(
-        "permissions__title", "icontains", distinct=True, label="Названия разрешений"
+        method="filter_privileged_accesses", queryset=Privileged.objects.all(), label="ID пользователя"
     )
+    permission = django_filters.CharFilter(method="filter_permission", label="Названия разрешений")
     title = django_filters.CharFilter("title", "icontains", label="Название роли")
 
     is_active = django_filters.BooleanFilter(label="Активирована ли роль")
@@ -36,6 +53,22 @@ class RoleFilter(django_filters.FilterSet):
         model = Role
         fields = ("is_active",)
 
+    # Тип параметра для схемы API, по методу фильтра его не определить
+    @extend_schema_field(OpenApiTypes.INT)
+    def filter_privileged_accesses(self, queryset: QuerySet[Role], name: str, value) -> QuerySet[Role]:
+        lookup = {
+            "privileged_steam_id": "serverprivileged__privileged__steam_id",
+            "privileged": "serverprivileged__privileged",
+        }[name]
+        return queryset.filter(
+            Exists(ServerPrivileged.roles.through.objects.filter(role=OuterRef("pk"), **{lookup: value}))
+        )
+
+    def filter_permission(self, queryset: QuerySet[Role], name: str, value: str) -> QuerySet[Role]:
+        return queryset.filter(
+            Exists(Role.permissions.through.objects.filter(role=OuterRef("pk"), permission__title__icontains=value))
+        )
+
 
 class PrivilegedFilter(django_filters.FilterSet):
     name = django_filters.CharFilter("name", "icontains", label="Имя")
@@ -52,8 +85,23 @@ class ServerPrivilegedFilter(django_filters.FilterSet):
     server_is_active = django_filters.BooleanFilter("server__is_active", label="Активирован ли сервер")
     privileged_steam_id = django_filters.NumberFilter("privileged__steam_id", label="Steam ID пользователя")
     privileged_is_active = django_filters.BooleanFilter("privileged__is_active", label="Активирован ли пользователь")
-    roles = django_filters.BaseInFilter(field_name="roles", lookup_expr="in")
+    roles = NumberInFilter(method="filter_roles", label="ID ролей через запятую, есть хотя бы одна из них")
 
     class Meta:
         model = ServerPrivileged
         fields = ("server", "privileged", "is_active")
+
+    def filter_roles(self, queryset: QuerySet[ServerPrivileged], name: str, value: list) -> QuerySet[ServerPrivileged]:
+        return queryset.filter(
+            Exists(ServerPrivileged.roles.through.objects.filter(serverprivileged=OuterRef("pk"), role_id__in=value))
+        )
+
+
+class WebhookLogFilter(django_filters.FilterSet):
+    creation_date = django_filters.IsoDateTimeFromToRangeFilter("creation_date", label="Дата создания сообщения")
+    webhook = django_filters.NumberFilter("object_id", label="ID вебхука")
+    webhook_type = django_filters.CharFilter("content_type__model", label="Модель вебхука, например rolewebhook")
+
+    class Meta:
+        model = WebhookLog
+        fields = ("level", "outcome", "ip", "steam_id")
@@ -0,0 +1,214 @@
+import ast
+import json
+import math
+import queue
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from api.models import RoleWebhook, WebhookLog
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import DatabaseError, connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+REQUEST_DATA_REGEX = re.compile(r"^Data: '(.*)'\Z", re.M | re.S)
+
+DATABASE_ERROR_STATUS = 599
+
+SYNTHETIC = "synthetic"
+REPLAY = "replay"
+
+
+@dataclass(slots=True)
+class RequestResult:
+    status_code: int
+    duration: float
+    queries: int
+
+
+def percentile(sorted_values: list[float], percent: int) -> float:
+    index = max(0, math.ceil(percent / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочное тестирование вебхука выдачи ролей, запросы отправляются внутри процесса "
+        "через тестовый клиент Django и подписываются HMAC согласно настройкам вебхука. "
+        "По умолчанию каждый запрос откатывается и не оставляет изменений в базе"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("url", help="Постфикс URL вебхука")
+        parser.add_argument(
+            "--source",
+            choices=(SYNTHETIC, REPLAY),
+            default=SYNTHETIC,
+            help="Сгенерировать данные запросов или повторить запросы из логов этого вебхука",
+        )
+        parser.add_argument("--requests", type=int, default=100, help="Количество запросов")
+        parser.add_argument("--concurrency", type=int, default=1, help="Количество параллельных потоков")
+        parser.add_argument("--seed", type=int, default=None, help="Seed для генерации данных")
+        parser.add_argument(
+            "--commit",
+            action="store_true",
+            help="Сохранять изменения сделанные запросами, иначе каждый запрос откатывается",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("Количество запросов и потоков должно быть больше нуля")
+
+        try:
+            webhook = RoleWebhook.objects.get(url=options["url"])
+        except RoleWebhook.DoesNotExist:
+            raise CommandError(f"Вебхук {options['url']} не найден")
+
+        rand = random.Random(options["seed"])
+
+        if options["source"] == REPLAY:
+            payloads = self.get_replay_payloads(webhook, options["requests"])
+        else:
+            payloads = self.get_synthetic_payloads(webhook, options["requests"], rand)
+
+        payloads_queue: queue.SimpleQueue[dict] = queue.SimpleQueue()
+        for payload in payloads:
+            payloads_queue.put(payload)
+
+        path = reverse("api:role_webhook", args=(webhook.url,))
+        results: list[RequestResult] = []
+
+        threads = [
+            threading.Thread(target=self.worker, args=(webhook, path, payloads_queue, results, options["commit"]))
+            for _ in range(options["concurrency"])
+        ]
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            start = time.perf_counter()
+
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+
+            total_time = time.perf_counter() - start
+
+        self.report(results, total_time)
+
+    def get_synthetic_payloads(self, webhook: RoleWebhook, count: int, rand: random.Random) -> list[dict]:
+        payloads = []
+        for number in range(count):
+            payload = {
+                "steam_id": 76561197960265728 + rand.randrange(10**9),
+                "name": f"load_test_{number}",
+                "comment": "Нагрузочное тестирование",
+            }
+
+            if webhook.allow_custom_duration_until_end:
+                payload["duration_until_end"] = rand.randint(1, 30)
+
+            payloads.append(payload)
+
+        return payloads
+
+    def get_replay_payloads(self, webhook: RoleWebhook, count: int) -> list[dict]:
+        requests_info = (
+            WebhookLog.objects.filter(
+                content_type=ContentType.objects.get_for_model(RoleWebhook),
+                object_id=webhook.pk,
+            )
+            .exclude(request_info="")
+            .order_by("-creation_date")
+            .values_list("request_info", flat=True)[:count]
+        )
+
+        payloads = []
+        for request_info in requests_info:
+            data_match = REQUEST_DATA_REGEX.search(request_info)
+            if data_match is None:
+                continue
+
+            try:
+                data = ast.literal_eval(data_match.group(1))
+            except (ValueError, SyntaxError):
+                continue
+
+            if isinstance(data, dict):
+                payloads.append(data)
+
+        if not payloads:
+            raise CommandError("В логах вебхука не найдено данных запросов для повтора")
+
+        return [payloads[number % len(payloads)] for number in range(count)]
+
+    def worker(
+        self,
+        webhook: RoleWebhook,
+        path: str,
+        payloads: "queue.SimpleQueue[dict]",
+        results: list[RequestResult],
+        commit: bool,
+    ) -> None:
+        client = Client(raise_request_exception=False)
+
+        try:
+            while True:
+                try:
+                    payload = payloads.get_nowait()
+                except queue.Empty:
+                    return
+
+                try:
+                    results.append(self.send(client, webhook, path, payload, commit))
+                except DatabaseError:
+                    # Ошибка при фиксации или откате транзакции, например блокировка в sqlite
+                    results.append(RequestResult(status_code=DATABASE_ERROR_STATUS, duration=0, queries=0))
+        finally:
+            connection.close()
+
+    def send(self, client: Client, webhook: RoleWebhook, path: str, payload: dict, commit: bool) -> RequestResult:
+        body = json.dumps(payload).encode()
+
+        headers = {}
+        if webhook.hmac_is_active:
+            validator = webhook.SENDER_HMAC_VALIDATORS[webhook.request_sender]
+            headers[webhook.hmac_header] = validator.generate_signature_header(webhook, body)
+
+        with CaptureQueriesContext(connection) as queries, transaction.atomic():
+            start = time.perf_counter()
+            response = client.post(path, body, content_type="application/json", headers=headers)
+            duration = time.perf_counter() - start
+
+            if not commit:
+                transaction.set_rollback(True)
+
+        return RequestResult(status_code=response.status_code, duration=duration, queries=len(queries))
+
+    def report(self, results: list[RequestResult], total_time: float) -> None:
+        if not results:
+            raise CommandError("Ни один запрос не был выполнен")
+
+        durations = sorted(result.duration * 1000 for result in results)
+        queries = [result.queries for result in results]
+        statuses = Counter(result.status_code for result in results)
+        errors = sum(count for status_code, count in statuses.items() if status_code >= 400)
+
+        self.stdout.write(
+            f"Запросов: {len(results)} за {total_time:.2f} с\n"
+            f"Пропускная способность: {len(results) / total_time:.1f} запросов/с\n"
+            f"Задержка, мс: p50 {percentile(durations, 50):.2f}, p90 {percentile(durations, 90):.2f}, "
+            f"p95 {percentile(durations, 95):.2f}, p99 {percentile(durations, 99):.2f}, "
+            f"max {durations[-1]:.2f}\n"
+            f"Запросов к БД на вызов: среднее {sum(queries) / len(queries):.1f}, max {max(queries)}\n"
+            f"Ошибки: {errors} ({errors / len(results):.1%})\n"
+            f"Коды ответов ({DATABASE_ERROR_STATUS} - ошибка БД вне запроса): "
+            + ", ".join(f"{code}: {count}" for code, count in sorted(statuses.items()))
+        )
@@ -0,0 +1,98 @@
+# Generated by Django 4.2.29 on 2026-10-19 16:22
+
+import ipaddress
+import re
+
+from django.db import migrations, models
+
+IP_REGEX = re.compile(r"^IP: '([^']*)'", re.M)
+STEAM_ID_REGEX = re.compile(r"""['"]steam_id['"]: ['"]?(\d{1,19})\b""")
+OUTCOME_BY_MESSAGE_PREFIX = {
+    "Ошибка валидации HMAC": "hmac_error",
+    "Ошибка проверки запроса сериализатором": "validation_error",
+    "Добавлены роли": "success",
+}
+
+
+def fill_structured_fields(apps, schema_editor):
+    model_webhook_log = apps.get_model("api", "WebhookLog")
+
+    updated_logs = []
+    for log in model_webhook_log.objects.only("pk", "message", "request_info").iterator(chunk_size=1000):
+        ip_match = IP_REGEX.search(log.request_info)
+        if ip_match:
+            try:
+                log.ip = str(ipaddress.ip_address(ip_match.group(1)))
+            except ValueError:
+                pass
+
+        steam_id_match = STEAM_ID_REGEX.search(log.request_info)
+        if steam_id_match and int(steam_id_match.group(1)) < 2**63:
+            log.steam_id = int(steam_id_match.group(1))
+
+        for prefix, outcome in OUTCOME_BY_MESSAGE_PREFIX.items():
+            if log.message.startswith(prefix):
+                log.outcome = outcome
+                break
+
+        updated_logs.append(log)
+
+        if len(updated_logs) >= 1000:
+            model_webhook_log.objects.bulk_update(updated_logs, ["ip", "steam_id", "outcome"])
+            updated_logs = []
+
+    model_webhook_log.objects.bulk_update(updated_logs, ["ip", "steam_id", "outcome"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_alter_adminsconfigdistribution_description_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='webhooklog',
+            name='api_webhook_content_834d6e_idx',
+        ),
+        migrations.AddField(
+            model_name='webhooklog',
+            name='ip',
+            field=models.GenericIPAddressField(blank=True, null=True, verbose_name='IP адрес запроса'),
+        ),
+        migrations.AddField(
+            model_name='webhooklog',
+            name='outcome',
+            field=models.CharField(blank=True, choices=[('success', 'Успешно'), ('hmac_error', 'Ошибка проверки HMAC'), ('validation_error', 'Ошибка проверки данных')], max_length=20, verbose_name='Результат обработки запроса'),
+        ),
+        migrations.AddField(
+            model_name='webhooklog',
+            name='steam_id',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='Steam ID из запроса'),
+        ),
+        migrations.RunPython(fill_structured_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='webhooklog',
+            index=models.Index(fields=['content_type', 'object_id', 'creation_date'], name='api_webhook_content_dc8dbe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='webhooklog',
+            index=models.Index(fields=['level', 'creation_date'], name='api_webhook_level_d8b078_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='webhooklog',
+            index=models.Index(fields=['ip', 'creation_date'], name='api_webhook_ip_e9a07e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='webhooklog',
+            index=models.Index(fields=['steam_id', 'creation_date'], name='api_webhook_steam_i_7ba761_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='webhooklog',
+            index=models.Index(fields=['outcome', 'creation_date'], name='api_webhook_outcome_7b4b96_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='webhooklog',
+            index=models.Index(fields=['creation_date'], name='api_webhook_creatio_3d49cf_idx'),
+        ),
+    ]
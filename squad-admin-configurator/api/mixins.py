@@ -0,0 +1,193 @@
+import hashlib
+from datetime import datetime
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import Count, Max, Model, Prefetch, QuerySet
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+class AtomicWriteMixin:
+    """
+    Изменяющие запросы выполняются одной транзакцией: запись, действия
+    сигналов и записи журнала изменений фиксируются вместе. При ответе с
+    ошибкой транзакция откатывается
+    """
+
+    def dispatch(self, request, *args, **kwargs) -> HttpResponseBase:
+        if request.method in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+
+        with transaction.atomic():
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code >= 400:
+                transaction.set_rollback(True)
+
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET запросы к списку и отдельной записи
+
+    ETag записи строится по запросу и максимальным датам изменения
+    validator_fields, ETag списка - по запросу (фильтры, limit и offset),
+    общему количеству записей и ID записей полученной страницы с их
+    максимальными датами изменения. При совпадении с If-None-Match
+    возвращается 304 без сериализации записей
+
+    Списки без подсчета количества (count=false) и с курсорной пагинацией
+    отдаются без ETag: для него пришлось бы считать весь список под фильтром
+
+    If-Modified-Since проверяется только для отдельной записи, у списка по дате
+    нельзя заметить удаление
+    """
+
+    validator_fields: tuple[str, ...] = ("update_date",)
+
+    def list(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        if isinstance(self.paginator, CursorPagination) or (
+            hasattr(self.paginator, "is_count_free") and self.paginator.is_count_free(request)
+        ):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        objects = page if page is not None else list(queryset)
+
+        pks = [obj.pk for obj in objects]
+        etag, last_modified = self._get_validators(
+            request,
+            queryset.model._default_manager.filter(pk__in=pks),
+            page=(getattr(self.paginator, "count", None), pks),
+        )
+
+        not_modified = self._get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        serializer = self.get_serializer(objects, many=True)
+        response = self.get_paginated_response(serializer.data) if page is not None else Response(serializer.data)
+
+        return self._set_validator_headers(response, etag, last_modified)
+
+    def retrieve(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        etag, last_modified = self._get_validators(request, queryset)
+
+        not_modified = self._get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        return self._set_validator_headers(super().retrieve(request, *args, **kwargs), etag, last_modified)
+
+    def _get_validators(
+        self, request: Request, queryset: QuerySet, page: tuple | None = None
+    ) -> tuple[str | None, datetime | None]:
+        """
+        queryset - отдельная запись или записи полученной страницы, page -
+        общее количество записей и ID записей страницы по порядку
+        """
+        validator = queryset.order_by().aggregate(
+            count=Count("pk"), **{field: Max(field) for field in self.validator_fields}
+        )
+        if not validator["count"]:
+            # Пустой список или 404, проверять нечего
+            return None, None
+
+        # Ответ зависит и от параметров запроса (фильтры, страница, fields), и от формата
+        key = f"{request.get_full_path()}|{request.accepted_media_type}|{sorted(validator.items())}|{page}"
+        etag = quote_etag(hashlib.md5(key.encode(), usedforsecurity=False).hexdigest())
+        last_modified = max(validator[field] for field in self.validator_fields if validator[field] is not None)
+
+        return etag, last_modified
+
+    @staticmethod
+    def _get_not_modified_response(
+        request: Request, etag: str | None, last_modified: datetime | None = None
+    ) -> HttpResponseBase | None:
+        if etag is None:
+            return None
+
+        return get_conditional_response(
+            request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None
+        )
+
+    @staticmethod
+    def _set_validator_headers(
+        response: Response, etag: str | None, last_modified: datetime | None
+    ) -> HttpResponseBase:
+        if etag is not None and response.status_code == 200:
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+
+        return response
+
+
+class SparseFieldsMixin:
+    """
+    Выборка из базы только тех столбцов и связей, которые попадут в ответ
+    GET запроса с учетом параметров fields и fields!, которые обрабатывает
+    QueryFieldsMixin сериализатора
+
+    Поля сериализатора переводятся в only(), связи из select_related_fields и
+    prefetch_related_fields подгружаются только если их поле запрошено. Если
+    поле сериализатора не отображается на поле модели, выборка не сужается
+    """
+
+    # Поле сериализатора -> связи для select_related/prefetch_related
+    select_related_fields: dict[str, tuple[str, ...]] = {}
+    prefetch_related_fields: dict[str, tuple[str | Prefetch, ...]] = {}
+
+    def get_queryset(self) -> QuerySet:
+        queryset = super().get_queryset()
+        if self.request is None or self.request.method != "GET":
+            return queryset
+
+        serializer_fields = self.get_serializer_class()(context=self.get_serializer_context()).fields.values()
+        model_fields = self._get_model_fields(queryset.model, serializer_fields)
+
+        select_related = [
+            lookup for field in serializer_fields for lookup in self.select_related_fields.get(field.field_name, ())
+        ]
+        prefetch_related = [
+            lookup for field in serializer_fields for lookup in self.prefetch_related_fields.get(field.field_name, ())
+        ]
+
+        if model_fields is not None:
+            # Курсорной пагинации нужны значения полей сортировки у записей страницы
+            ordering = getattr(self.paginator, "ordering", ())
+            model_fields.update(field.lstrip("-") for field in ([ordering] if isinstance(ordering, str) else ordering))
+            queryset = queryset.only("pk", *model_fields, *select_related)
+
+        # select_related() без аргументов подгружает все внешние ключи
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+
+        return queryset.prefetch_related(*prefetch_related)
+
+    @staticmethod
+    def _get_model_fields(model: type[Model], serializer_fields) -> set[str] | None:
+        model_fields = set()
+        for field in serializer_fields:
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+
+            if model_field.concrete and not model_field.many_to_many:
+                model_fields.add(model_field.name)
+            elif not model_field.many_to_many:
+                # Обратные связи и вычисляемые поля без подгрузки всей записи не отдать
+                return None
+
+        return model_fields
@@ -32,11 +32,25 @@ class WebhookLog(models.Model):
         (ERROR, "Ошибка"),
     ]
 
+    SUCCESS = "success"
+    HMAC_ERROR = "hmac_error"
+    VALIDATION_ERROR = "validation_error"
+
+    OUTCOMES: list[tuple[str, str]] = [
+        (SUCCESS, "Успешно"),
+        (HMAC_ERROR, "Ошибка проверки HMAC"),
+        (VALIDATION_ERROR, "Ошибка проверки данных"),
+    ]
+
     message = models.TextField("Лог сообщений")
     request_info = models.TextField("Сведения о запросе", blank=True)
     webhook_info = models.TextField("Сведения о вебхуке")
     level = models.CharField("Уровень логирования", max_length=10, choices=LOG_LEVELS)
 
+    ip = models.GenericIPAddressField("IP адрес запроса", blank=True, null=True)
+    steam_id = models.BigIntegerField("Steam ID из запроса", blank=True, null=True)
+    outcome = models.CharField("Результат обработки запроса", max_length=20, choices=OUTCOMES, blank=True)
+
     creation_date = models.DateTimeField("Дата создания сообщения", auto_now_add=True)
 
     content_type = models.ForeignKey(
@@ -55,7 +69,12 @@ class WebhookLog(models.Model):
         verbose_name = "Лог вебхука"
         verbose_name_plural = "1. Логи вебхуков"
         indexes = [
-            models.Index(fields=["content_type", "object_id"]),
+            models.Index(fields=["content_type", "object_id", "creation_date"]),
+            models.Index(fields=["level", "creation_date"]),
+            models.Index(fields=["ip", "creation_date"]),
+            models.Index(fields=["steam_id", "creation_date"]),
+            models.Index(fields=["outcome", "creation_date"]),
+            models.Index(fields=["creation_date"]),
         ]
         ordering = ("-creation_date",)
 
@@ -223,15 +242,30 @@ class ReceivedWebhook(models.Model):
         message: str,
         log_level: LOG_LEVEL,
         request: Request | None = None,
+        outcome: str = "",
+        steam_id: int | None = None,
     ) -> None:
+        """
+        Запись лога вызова вебхука
+
+        IP и Steam ID дополнительно раскладываются по отдельным индексируемым
+        полям, если Steam ID не передан явно - он будет взят из данных запроса
+        """
         request_info: str = ""
+        ip: str | None = None
         if request is not None:
             ip, _ = get_client_ip(request)
             request_info = f"IP: '{ip}'\nUser-agent: '{request.headers.get('user-agent')}'\nData: '{request.data}'"
 
+            if steam_id is None:
+                steam_id = _get_steam_id_from_request(request)
+
         WebhookLog.objects.create(
             message=message,
             level=log_level,
+            outcome=outcome,
+            ip=ip,
+            steam_id=steam_id,
             content_object=self,
             webhook_info=self.get_webhook_info(),
             request_info=request_info,
@@ -246,6 +280,18 @@ class ReceivedWebhook(models.Model):
         return True
 
 
+def _get_steam_id_from_request(request: Request) -> int | None:
+    try:
+        steam_id = int(request.data.get("steam_id"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+    if not 0 < steam_id < 2**63:
+        return None
+
+    return steam_id
+
+
 class AdminsConfigDistribution(DistributionModel):
     """
     Модель предназначена для хранения url и управления доступностью
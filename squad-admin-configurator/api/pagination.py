@@ -1,6 +1,130 @@
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.utils.urls import replace_query_param
+
+CURSOR = "cursor"
+
+FALSE_VALUES = ("0", "false", "False")
+
+
+class PkCursorPagination(CursorPagination):
+    """
+    Пагинация по первичному ключу, без COUNT(*) и OFFSET, каждая страница
+    берётся по индексу от позиции курсора
+    """
+
+    ordering = "pk"
+    page_size = 10
+    page_size_query_param = "limit"
+    max_page_size = 100
 
 
 class DefaultLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Пагинация по limit и offset с общим количеством записей, по запросу:
+
+    - pagination=cursor - курсорная пагинация по первичному ключу, время
+      получения страницы не зависит от ее глубины
+    - count=false - без подсчета общего количества записей, наличие
+      следующей страницы определяется по одной лишней записи
+    """
+
     default_limit = 10
     max_limit = 100
+    pagination_query_param = "pagination"
+    count_query_param = "count"
+
+    cursor_paginator: PkCursorPagination | None = None
+
+    def is_cursor(self, request) -> bool:
+        return request.query_params.get(self.pagination_query_param) == CURSOR
+
+    def is_count_free(self, request) -> bool:
+        """Страница без подсчета общего количества записей: курсорная или count=false"""
+        return self.is_cursor(request) or request.query_params.get(self.count_query_param) in FALSE_VALUES
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_cursor(request):
+            self.cursor_paginator = PkCursorPagination()
+            self.display_page_controls = False
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+
+        if not self.is_count_free(request):
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.count = None
+        self.display_page_controls = False
+
+        page = list(queryset[self.offset : self.offset + self.limit + 1])
+        self.has_next = len(page) > self.limit
+
+        return page[: self.limit]
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+
+        response = super().get_paginated_response(data)
+        if self.count is None:
+            del response.data["count"]
+
+        return response
+
+    def get_next_link(self):
+        if self.count is not None:
+            return super().get_next_link()
+
+        if not self.has_next:
+            return None
+
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["required"] = [field for field in response_schema.get("required", []) if field != "count"]
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": self.pagination_query_param,
+                "required": False,
+                "in": "query",
+                "description": "cursor - курсорная пагинация по ID, без общего количества записей",
+                "schema": {"type": "string", "enum": [CURSOR]},
+            },
+            {
+                "name": PkCursorPagination.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Позиция курсора при pagination=cursor",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "false - не считать общее количество записей",
+                "schema": {"type": "boolean"},
+            },
+        ]
+
+
+class WebhookLogCursorPagination(CursorPagination):
+    """
+    Пагинация логов по времени создания, без COUNT(*) и OFFSET, страница
+    всегда берётся по индексу от позиции курсора
+    """
+
+    ordering = "-creation_date"
+    page_size = 10
+    page_size_query_param = "limit"
+    max_page_size = 100
@@ -105,6 +105,22 @@ class BaseRequestHMACValidator(ABC):
         """
         raise NotImplementedError("generate_signature_from_request is not implemented")
 
+    @classmethod
+    @abstractmethod
+    def generate_signature_header(cls, webhook_object: "ReceivedWebhook", body: bytes) -> str:
+        """Генерирует значение заголовка с сигнатурой, которое пройдет
+        проверку этим валидатором, т.е. подписывает запрос со стороны
+        отправителя
+
+        Args:
+            webhook_object (ReceivedWebhook): Вебхук с настройками HMAC
+            body (bytes): Тело запроса
+
+        Returns:
+            str: Значение заголовка hmac_header
+        """
+        raise NotImplementedError("generate_signature_header is not implemented")
+
     def compare_signature(self, sign_1, sign_2) -> bool:
         """Сравнивает две сигнатура через функцию с постоянным временем
 
@@ -160,6 +176,14 @@ class DefaultRequestHMACValidator(BaseRequestHMACValidator):
             self.webhook_object.hmac_hash_type,
         ).hex()
 
+    @classmethod
+    def generate_signature_header(cls, webhook_object: "ReceivedWebhook", body: bytes) -> str:
+        return hmac.digest(
+            webhook_object.hmac_secret_key.encode(),
+            body,
+            webhook_object.hmac_hash_type,
+        ).hex()
+
 
 class BattlemetricsRequestHMACValidator(DefaultRequestHMACValidator):
     """Валидатор запроса по hmac для запросов от Battlemetrics или реализующих
@@ -201,3 +225,15 @@ class BattlemetricsRequestHMACValidator(DefaultRequestHMACValidator):
             f"{timestamp_text}.".encode() + self.request.body,
             self.webhook_object.hmac_hash_type,
         ).hex()
+
+    @classmethod
+    def generate_signature_header(cls, webhook_object: "ReceivedWebhook", body: bytes) -> str:
+        timestamp_text = datetime.now(timezone.utc).isoformat()
+
+        signature = hmac.digest(
+            webhook_object.hmac_secret_key.encode(),
+            f"{timestamp_text}.".encode() + body,
+            webhook_object.hmac_hash_type,
+        ).hex()
+
+        return f"t={timestamp_text},s={signature}"
@@ -1,9 +1,16 @@
 from drf_queryfields import QueryFieldsMixin
 from rest_framework import serializers
-from server_admins.models import Permission, Privileged, Role, Server, ServerPrivileged
+from server_admins.models import ChangeLogEntry, Permission, Privileged, Role, Server, ServerPrivileged
 
 from .models import WebhookLog
 
+MAX_PLAYERS_PERMISSIONS_STEAM_IDS = 500
+
+DEFAULT_CHANGES_LIMIT = 500
+MAX_CHANGES_LIMIT = 1000
+
+MAX_BULK_SERVER_PRIVILEGES = 500
+
 
 class RoleWebhookSerializer(serializers.Serializer):
     steam_id = serializers.IntegerField()
@@ -53,6 +60,135 @@ class ServerPrivilegedSerializerWrite(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class PlayerAccessServerSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+
+
+class PlayerAccessRoleSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    permissions = serializers.ListField(child=serializers.CharField())
+
+
+class PlayerAccessGrantSerializer(serializers.Serializer):
+    source = serializers.ChoiceField(
+        choices=("direct", "pack"), help_text="direct - роль на сервере, pack - список пользователей"
+    )
+    id = serializers.IntegerField(help_text="ID роли на сервере или списка пользователей")
+    title = serializers.CharField(help_text="Имя пользователя или название списка")
+    servers = PlayerAccessServerSerializer(many=True)
+    roles = PlayerAccessRoleSerializer(many=True)
+    date_of_end = serializers.DateTimeField(allow_null=True)
+
+
+class PlayerAccessSerializer(serializers.Serializer):
+    steam_id = serializers.IntegerField()
+    grants = PlayerAccessGrantSerializer(many=True)
+
+
+class PlayersPermissionsQuerySerializer(serializers.Serializer):
+    steam_ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=MAX_PLAYERS_PERMISSIONS_STEAM_IDS
+    )
+
+
+class PlayerPermissionsSerializer(serializers.Serializer):
+    steam_id = serializers.IntegerField()
+    permissions = serializers.ListField(child=serializers.CharField())
+
+
+class PlayersPermissionsSerializer(serializers.Serializer):
+    server = serializers.IntegerField()
+    players = PlayerPermissionsSerializer(many=True)
+
+
+class ServerPrivilegedExportQuerySerializer(serializers.Serializer):
+    server = serializers.IntegerField(required=False, help_text="ID сервера")
+    active_only = serializers.BooleanField(default=False, help_text="Только действующие роли")
+    changed_since = serializers.DateTimeField(
+        required=False, help_text="Только роли, которые или пользователи которых изменились с этой даты"
+    )
+
+
+class ChangesQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, default=0, help_text="Номер последней прочитанной записи")
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_CHANGES_LIMIT, default=DEFAULT_CHANGES_LIMIT)
+
+
+class ChangeLogEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChangeLogEntry
+        fields = ("seq", "model", "object_id", "action", "steam_id", "creation_date")
+
+
+class ChangesSerializer(serializers.Serializer):
+    changes = ChangeLogEntrySerializer(many=True)
+    next_since = serializers.IntegerField(help_text="Значение since для следующего запроса")
+    has_more = serializers.BooleanField(help_text="Есть ли записи после этой части")
+    last_seq = serializers.IntegerField(
+        help_text="Номер последней записи журнала, новый клиент запоминает его до полной загрузки полномочий"
+    )
+
+
+class ChangesCompactedSerializer(serializers.Serializer):
+    detail = serializers.CharField()
+    compacted_seq = serializers.IntegerField(help_text="Номер, до которого записи журнала удалены")
+    last_seq = serializers.IntegerField(help_text="Номер последней записи журнала, since для продолжения")
+
+
+class ServerPrivilegedBulkItemsSerializer(serializers.Serializer):
+    """Элементы проверяются по отдельности, чтобы вернуть ошибки для каждого"""
+
+    items = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=MAX_BULK_SERVER_PRIVILEGES
+    )
+
+
+class ServerPrivilegedBulkCreateItemSerializer(serializers.Serializer):
+    server = serializers.IntegerField(help_text="ID сервера")
+    privileged = serializers.IntegerField(help_text="ID пользователя")
+    roles = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, help_text="ID ролей")
+    is_active = serializers.BooleanField(default=True)
+    date_of_end = serializers.DateTimeField(allow_null=True, default=None)
+    comment = serializers.CharField(max_length=200, allow_blank=True, default="")
+
+
+class ServerPrivilegedBulkUpdateItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField(help_text="ID роли на сервере")
+    server = serializers.IntegerField(required=False, help_text="ID сервера")
+    roles = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, required=False, help_text="ID ролей, заменяют текущие"
+    )
+    is_active = serializers.BooleanField(required=False)
+    date_of_end = serializers.DateTimeField(allow_null=True, required=False)
+    comment = serializers.CharField(max_length=200, allow_blank=True, required=False)
+
+
+class ServerPrivilegedBulkCreateSerializer(serializers.Serializer):
+    items = ServerPrivilegedBulkCreateItemSerializer(many=True)
+
+
+class ServerPrivilegedBulkUpdateSerializer(serializers.Serializer):
+    items = ServerPrivilegedBulkUpdateItemSerializer(many=True)
+
+
+class ServerPrivilegedBulkDeactivateSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=MAX_BULK_SERVER_PRIVILEGES
+    )
+
+
+class ServerPrivilegedBulkResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField(allow_null=True, help_text="ID роли на сервере")
+    status = serializers.ChoiceField(choices=("created", "updated", "deactivated", "error"))
+    errors = serializers.DictField(required=False, help_text="Ошибки по полям, если status - error")
+
+
+class ServerPrivilegedBulkResultsSerializer(serializers.Serializer):
+    results = ServerPrivilegedBulkResultSerializer(many=True, help_text="Результаты в порядке переданных элементов")
+
+
 class PrivilegedSerializer(QueryFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Privileged
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from api.models import WebhookLog
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+DELETE_BATCH_SIZE = 1000
+
+
+def webhook_log__delete_old(*, older_than_days: int, max_records_by_level: dict[str, int]) -> int:
+    """
+    Удаление логов вебхуков старше older_than_days дней и логов сверх
+    квоты для каждого уровня логирования
+
+    Возвращает количество удаленных записей
+    """
+    deleted = 0
+
+    if older_than_days > 0:
+        deleted += _delete_in_batches(
+            WebhookLog.objects.filter(creation_date__lt=timezone.now() - timedelta(days=older_than_days))
+        )
+
+    for level, max_records in max_records_by_level.items():
+        if max_records <= 0:
+            continue
+
+        # Самая новая запись, не попадающая в квоту. У нескольких записей может
+        # быть одна дата создания, поэтому граница определяется парой (дата, ID)
+        border = (
+            WebhookLog.objects.filter(level=level)
+            .order_by("-creation_date", "-pk")
+            .values_list("creation_date", "pk")[max_records : max_records + 1]
+            .first()
+        )
+
+        if border is None:
+            continue
+
+        border_date, border_pk = border
+        deleted += _delete_in_batches(
+            WebhookLog.objects.filter(
+                Q(creation_date__lt=border_date) | Q(creation_date=border_date, pk__lte=border_pk), level=level
+            )
+        )
+
+    return deleted
+
+
+def _delete_in_batches(queryset: QuerySet[WebhookLog]) -> int:
+    """
+    Удаление пачками, чтобы не держать долгие блокировки на таблице логов
+    """
+    deleted = 0
+
+    while True:
+        batch_ids = list(queryset.order_by("creation_date").values_list("pk", flat=True)[:DELETE_BATCH_SIZE])
+
+        if not batch_ids:
+            return deleted
+
+        batch_deleted, _ = WebhookLog.objects.filter(pk__in=batch_ids).delete()
+        deleted += batch_deleted
@@ -0,0 +1,130 @@
+import random
+import re
+
+from api.filters import RoleFilter, ServerFilter, ServerPrivilegedFilter
+from django.db import connection
+from django.test import TestCase
+from server_admins.models import Permission, Privileged, Role, Server, ServerPrivileged
+
+FIRST_STEAM_ID = 76561197960265728
+SEED = 20261019
+
+
+class RelatedFiltersTest(TestCase):
+    """
+    Фильтры API по связанным записям идут через EXISTS без DISTINCT и
+    возвращают те же записи, что и join с DISTINCT
+    """
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        # Данные создаются массовыми вставками, в обход сигналов
+        rand = random.Random(SEED)
+
+        permissions = Permission.objects.bulk_create(Permission(title=f"perm_{number}") for number in range(12))
+        roles = Role.objects.bulk_create(Role(title=f"role_{number}") for number in range(8))
+        Role.permissions.through.objects.bulk_create(
+            Role.permissions.through(role=role, permission=permission)
+            for role in roles
+            for permission in rand.sample(permissions, k=3)
+        )
+
+        servers = Server.objects.bulk_create(Server(title=f"Сервер {number}") for number in range(5))
+        privileges = Privileged.objects.bulk_create(
+            Privileged(name=f"Player {number}", steam_id=FIRST_STEAM_ID + number) for number in range(200)
+        )
+
+        server_privileges = ServerPrivileged.objects.bulk_create(
+            ServerPrivileged(server=server, privileged=privileged)
+            for privileged in privileges
+            for server in rand.sample(servers, k=rand.randint(1, 3))
+        )
+        ServerPrivileged.roles.through.objects.bulk_create(
+            ServerPrivileged.roles.through(serverprivileged=server_privileged, role=role)
+            for server_privileged in server_privileges
+            for role in rand.sample(roles, k=rand.randint(1, 3))
+        )
+
+        cls.privileged = privileges[42]
+        cls.role_ids = [roles[1].pk, roles[4].pk, roles[6].pk]
+
+    def get_cases(self) -> list:
+        """Название, фильтр, параметры, эталонный join"""
+        steam_id = self.privileged.steam_id
+
+        return [
+            (
+                "Сервера по Steam ID",
+                ServerFilter,
+                {"privileged_steam_id": steam_id},
+                Server.objects.filter(privileged_accesses__privileged__steam_id=steam_id),
+            ),
+            (
+                "Сервера по имени пользователя",
+                ServerFilter,
+                {"privileged_name": "player 1"},
+                Server.objects.filter(privileged_accesses__privileged__name__icontains="player 1"),
+            ),
+            (
+                "Роли по Steam ID",
+                RoleFilter,
+                {"privileged_steam_id": steam_id},
+                Role.objects.filter(privileged_accesses__privileged__steam_id=steam_id),
+            ),
+            (
+                "Роли по пользователю",
+                RoleFilter,
+                {"privileged": self.privileged.pk},
+                Role.objects.filter(privileged_accesses__privileged=self.privileged),
+            ),
+            (
+                "Роли по разрешению",
+                RoleFilter,
+                {"permission": "perm_1"},
+                Role.objects.filter(permissions__title__icontains="perm_1"),
+            ),
+            (
+                "Роли на серверах по ID ролей",
+                ServerPrivilegedFilter,
+                {"roles": ",".join(map(str, self.role_ids))},
+                ServerPrivileged.objects.filter(roles__in=self.role_ids),
+            ),
+        ]
+
+    def test_filters_use_exists(self) -> None:
+        for title, filterset_class, params, _ in self.get_cases():
+            with self.subTest(title):
+                sql = str(self.filter(filterset_class, params).query).upper()
+
+                self.assertIn("EXISTS", sql)
+                self.assertNotIn("DISTINCT", sql)
+
+    def test_filters_match_join(self) -> None:
+        for title, filterset_class, params, reference in self.get_cases():
+            with self.subTest(title):
+                pks = sorted(self.filter(filterset_class, params).values_list("pk", flat=True))
+
+                self.assertTrue(pks)
+                self.assertEqual(pks, sorted(reference.distinct().values_list("pk", flat=True)))
+
+    def test_subqueries_use_indexes(self) -> None:
+        """
+        В плане SQLite таблицы подзапроса видны только под псевдонимами,
+        поэтому полного просмотра не должно быть во всем подзапросе
+        """
+        if connection.vendor != "sqlite":
+            self.skipTest(f"План запроса для {connection.vendor} не проверяется")
+
+        for title, filterset_class, params, _ in self.get_cases():
+            with self.subTest(title):
+                plan = self.filter(filterset_class, params).explain()
+                _, found, subquery_plan = plan.partition("CORRELATED SCALAR SUBQUERY")
+
+                self.assertTrue(found, plan)
+                self.assertEqual(re.findall(r"\bSCAN (\S+)", subquery_plan), [], plan)
+
+    def filter(self, filterset_class, params: dict):
+        filterset = filterset_class(params, queryset=filterset_class._meta.model.objects.all())
+        self.assertTrue(filterset.is_valid(), filterset.errors)
+
+        return filterset.qs
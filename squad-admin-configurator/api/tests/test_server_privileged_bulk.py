@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+from api.views import ServerPrivilegedViewSet
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from server_admins.models import ChangeLogEntry, EffectiveAccess, Privileged, Role, Server, ServerPrivileged
+from server_admins.services.expiry import expiry__get_scheduled_date, expiry__reschedule
+from server_admins.services.player_access import player__get_access
+
+
+class ServerPrivilegedBulkTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+        cls.server, cls.other_server = Server.objects.bulk_create([Server(title="Сервер 1"), Server(title="Сервер 2")])
+        cls.admin_role, cls.vip_role, cls.whitelist_role = Role.objects.bulk_create(
+            [Role(title="Админ"), Role(title="VIP"), Role(title="Whitelist")]
+        )
+        cls.privileged = Privileged.objects.create(name="Player 1", steam_id=76561197960265729)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+        self.server_priv = ServerPrivileged.objects.create(server=self.server, privileged=self.privileged)
+        self.server_priv.roles.add(self.admin_role)
+
+    def post(self, action: str, data: dict) -> list[dict]:
+        # Запрос напрямую во view, без middleware: в config.toml из репозитория пустой SECRET_KEY
+        request = APIRequestFactory().post("/", data, format="json")
+        force_authenticate(request, self.user)
+
+        response = ServerPrivilegedViewSet.as_view({"post": action})(request)
+        self.assertEqual(response.status_code, 200, response.data)
+
+        return response.data["results"]
+
+    def test_create_reports_item_errors(self) -> None:
+        results = self.post(
+            "bulk_create",
+            {
+                "items": [
+                    {"server": self.other_server.pk, "privileged": self.privileged.pk, "roles": [self.vip_role.pk]},
+                    {"server": 999, "privileged": self.privileged.pk, "roles": [self.vip_role.pk, 998]},
+                    {"server": "abc", "privileged": self.privileged.pk, "roles": []},
+                ]
+            },
+        )
+
+        self.assertEqual([result["status"] for result in results], ["created", "error", "error"])
+        self.assertEqual(set(results[1]["errors"]), {"server", "roles"})
+        self.assertEqual(set(results[2]["errors"]), {"server", "roles"})
+
+        created = ServerPrivileged.objects.get(pk=results[0]["id"])
+        self.assertEqual(created.server, self.other_server)
+        self.assertEqual(list(created.roles.all()), [self.vip_role])
+
+    def test_update_reports_invalid_ids(self) -> None:
+        results = self.post("bulk_update", {"items": [{"id": "abc"}, {"id": 999}, {"id": self.server_priv.pk}]})
+
+        self.assertEqual(
+            [(result["id"], result["status"]) for result in results],
+            [(None, "error"), (999, "error"), (self.server_priv.pk, "updated")],
+        )
+
+    def test_update_moves_server_and_replaces_roles(self) -> None:
+        results = self.post(
+            "bulk_update",
+            {
+                "items": [
+                    {
+                        "id": self.server_priv.pk,
+                        "server": self.other_server.pk,
+                        "roles": [self.vip_role.pk, self.whitelist_role.pk],
+                    }
+                ]
+            },
+        )
+
+        self.assertEqual(results, [{"id": self.server_priv.pk, "status": "updated"}])
+
+        self.server_priv.refresh_from_db()
+        self.assertEqual(self.server_priv.server, self.other_server)
+        self.assertEqual(set(self.server_priv.roles.all()), {self.vip_role, self.whitelist_role})
+
+    def test_update_syncs_derived_state(self) -> None:
+        servers_update_dates = dict(Server.objects.values_list("pk", "privileges_update_date"))
+        last_seq = ChangeLogEntry.objects.order_by("-seq").values_list("seq", flat=True).first()
+
+        self.post(
+            "bulk_update",
+            {"items": [{"id": self.server_priv.pk, "server": self.other_server.pk, "roles": [self.vip_role.pk]}]},
+        )
+
+        self.assertEqual(
+            set(EffectiveAccess.objects.values_list("server_id", "steam_id", "role_id")),
+            {(self.other_server.pk, self.privileged.steam_id, self.vip_role.pk)},
+        )
+
+        # Сдвигается дата изменения полномочий и старого, и нового сервера
+        for server in Server.objects.all():
+            self.assertGreater(server.privileges_update_date, servers_update_dates[server.pk])
+
+        self.assertEqual(
+            list(
+                ChangeLogEntry.objects.filter(seq__gt=last_seq).values_list("model", "object_id", "action", "steam_id")
+            ),
+            [
+                (
+                    ChangeLogEntry.SERVER_PRIVILEGED,
+                    self.server_priv.pk,
+                    ChangeLogEntry.UPDATE,
+                    self.privileged.steam_id,
+                )
+            ],
+        )
+
+    def test_deactivate_resets_player_access(self) -> None:
+        self.assertEqual(len(player__get_access(steam_id=self.privileged.steam_id)["grants"]), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            results = self.post("bulk_deactivate", {"ids": [self.server_priv.pk, 999]})
+
+        self.assertEqual([result["status"] for result in results], ["deactivated", "error"])
+        self.assertFalse(EffectiveAccess.objects.exists())
+        self.assertEqual(player__get_access(steam_id=self.privileged.steam_id)["grants"], [])
+
+    def test_create_schedules_expiry(self) -> None:
+        expiry__reschedule()
+        date_of_end = timezone.now() + timedelta(days=1)
+
+        self.post(
+            "bulk_create",
+            {
+                "items": [
+                    {
+                        "server": self.other_server.pk,
+                        "privileged": self.privileged.pk,
+                        "roles": [self.vip_role.pk],
+                        "date_of_end": date_of_end.isoformat(),
+                    }
+                ]
+            },
+        )
+
+        self.assertEqual(expiry__get_scheduled_date(), date_of_end)
@@ -2,7 +2,9 @@ from django.urls import include, path
 from rest_framework_nested.routers import NestedSimpleRouter, SimpleRouter
 
 from .views import (
+    ChangesView,
     PermissionViewSet,
+    PlayerAccessView,
     PrivilegedViewSet,
     RoleViewSet,
     RoleWebhookView,
@@ -34,5 +36,11 @@ urlpatterns = [
         RoleWebhookView.as_view(),
         name="role_webhook",
     ),
+    path(
+        "players/<int:steam_id>/access/",
+        PlayerAccessView.as_view(),
+        name="player_access",
+    ),
+    path("changes/", ChangesView.as_view(), name="changes"),
     path("", include(router.urls)),
 ]
@@ -1,28 +1,66 @@
+import json
+
 from api.services.role_webhook import role_webhook__create_server_privileges
-from django.http import HttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiExample, OpenApiResponse, extend_schema
+from permissions import BulkChangeDjangoModelPermissions, LookupDjangoModelPermissions
 from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
+from rest_framework.fields import IntegerField
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import SAFE_METHODS
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from server_admins.models import Permission, Privileged, Role, Server, ServerPrivileged
+from server_admins.models import ChangeLogEntry, Permission, Privileged, Role, Server, ServerPrivileged
+from server_admins.services.change_log import ChangeLogCompactedError, change_log__get_since
+from server_admins.services.permissions_index import server__get_players_permissions
+from server_admins.services.player_access import player__get_access
 from server_admins.services.server_config import server__generate_config
-
-from .filters import PrivilegedFilter, RoleFilter, ServerFilter, ServerPrivilegedFilter
+from server_admins.services.server_privileged_bulk import (
+    ERROR,
+    server_privileged__bulk_create,
+    server_privileged__bulk_deactivate,
+    server_privileged__bulk_update,
+)
+from server_admins.services.server_privileged_export import server_privileged__iter_export
+
+from .filters import (
+    PrivilegedFilter,
+    RoleFilter,
+    ServerFilter,
+    ServerPrivilegedFilter,
+    WebhookLogFilter,
+)
+from .mixins import AtomicWriteMixin, ConditionalGetMixin, SparseFieldsMixin
 from .models import AdminsConfigDistribution, RoleWebhook, WebhookLog
-from .pagination import DefaultLimitOffsetPagination
+from .pagination import DefaultLimitOffsetPagination, WebhookLogCursorPagination
 from .serializers import (
+    ChangesCompactedSerializer,
+    ChangesQuerySerializer,
+    ChangesSerializer,
     PermissionSerializer,
+    PlayerAccessSerializer,
+    PlayersPermissionsQuerySerializer,
+    PlayersPermissionsSerializer,
     PrivilegedSerializer,
     RoleSerializer,
     RoleSerializerWrite,
     RoleWebhookSerializer,
+    ServerPrivilegedBulkCreateItemSerializer,
+    ServerPrivilegedBulkCreateSerializer,
+    ServerPrivilegedBulkDeactivateSerializer,
+    ServerPrivilegedBulkItemsSerializer,
+    ServerPrivilegedBulkResultsSerializer,
+    ServerPrivilegedBulkUpdateItemSerializer,
+    ServerPrivilegedBulkUpdateSerializer,
+    ServerPrivilegedExportQuerySerializer,
     ServerPrivilegedSerializer,
     ServerPrivilegedSerializerWrite,
     ServerSerializer,
@@ -62,6 +100,7 @@ class RoleWebhookView(GenericAPIView):
                 f"Ошибка валидации HMAC - {error.detail}",
                 log_level=WebhookLog.WARNING,
                 request=request,
+                outcome=WebhookLog.HMAC_ERROR,
             )
             raise error
 
@@ -72,6 +111,7 @@ class RoleWebhookView(GenericAPIView):
                 f"Ошибка проверки запроса сериализатором {serializer.errors}",
                 log_level=WebhookLog.WARNING,
                 request=request,
+                outcome=WebhookLog.VALIDATION_ERROR,
             )
             raise ValidationError(serializer.errors)
 
@@ -88,6 +128,8 @@ class RoleWebhookView(GenericAPIView):
             f"Добавлены роли {serializer.validated_data}",
             log_level=WebhookLog.INFO,
             request=request,
+            outcome=WebhookLog.SUCCESS,
+            steam_id=steam_id,
         )
 
         return Response(data={"detail": "Created"})
@@ -124,7 +166,80 @@ class ServerConfigView(APIView):
         return Response(status=status.HTTP_403_FORBIDDEN)
 
 
-class ServerViewSet(viewsets.ModelViewSet):
+class PlayerAccessView(GenericAPIView):
+    """
+    Все действующие полномочия игрока на серверах одним ответом: роли на
+    серверах и списки пользователей, с разрешениями ролей и датой окончания
+    """
+
+    queryset = ServerPrivileged.objects.all()
+    serializer_class = PlayerAccessSerializer
+
+    def get(self, request: Request, steam_id: int) -> Response:
+        return Response(self.get_serializer(player__get_access(steam_id=steam_id)).data)
+
+
+class ChangesView(GenericAPIView):
+    """
+    Журнал изменений полномочий частями по возрастанию номера: клиент
+    передает номер последней прочитанной записи и получает следующие
+
+    Каждый ответ содержит last_seq - номер последней записи журнала. Новый
+    клиент запоминает его, загружает полномочия целиком и продолжает с него.
+    Если записи после since уже удалены при очистке журнала, возвращается
+    410 с last_seq, клиенту нужно так же загрузить полномочия заново
+    """
+
+    queryset = ChangeLogEntry.objects.all()
+    serializer_class = ChangesSerializer
+
+    @extend_schema(
+        parameters=[ChangesQuerySerializer],
+        responses={
+            200: ChangesSerializer,
+            400: OpenApiResponse(OpenApiTypes.JSON_PTR, "since больше номера последней записи журнала"),
+            410: ChangesCompactedSerializer,
+        },
+    )
+    def get(self, request: Request) -> Response:
+        query = ChangesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        since = query.validated_data["since"]
+
+        try:
+            changes, has_more, last_seq = change_log__get_since(since=since, limit=query.validated_data["limit"])
+        except ChangeLogCompactedError as error:
+            return Response(
+                ChangesCompactedSerializer(
+                    {
+                        "detail": "Записи журнала после since уже удалены, загрузите полномочия заново",
+                        "compacted_seq": error.compacted_seq,
+                        "last_seq": error.last_seq,
+                    }
+                ).data,
+                status=status.HTTP_410_GONE,
+            )
+
+        if since > last_seq:
+            return Response(
+                {"since": [f"Последняя запись журнала - {last_seq}"], "last_seq": last_seq},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(
+            self.get_serializer(
+                {
+                    "changes": changes,
+                    "next_since": changes[-1].seq if changes else since,
+                    "has_more": has_more,
+                    "last_seq": last_seq,
+                }
+            ).data
+        )
+
+
+class ServerViewSet(AtomicWriteMixin, SparseFieldsMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """View set для доступа к списку серверов"""
 
     queryset = Server.objects.all()
@@ -132,9 +247,36 @@ class ServerViewSet(viewsets.ModelViewSet):
     serializer_class = ServerSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = ServerFilter
+    validator_fields = ("update_date", "privileges_update_date")
+
+    @extend_schema(request=PlayersPermissionsQuerySerializer, responses=PlayersPermissionsSerializer)
+    @action(methods=["post"], detail=True, permission_classes=[LookupDjangoModelPermissions])
+    def players_permissions(self, request: Request, pk: str) -> Response:
+        """
+        Итоговые разрешения списка игроков на сервере по тем же правилам, что
+        и конфигурация администраторов, ответ строится из индекса в памяти
+        """
+        server = self.get_object()
+
+        query = PlayersPermissionsQuerySerializer(data=request.data)
+        query.is_valid(raise_exception=True)
+
+        steam_ids = query.validated_data["steam_ids"]
+        permissions = server__get_players_permissions(server=server, steam_ids=steam_ids)
+
+        return Response(
+            PlayersPermissionsSerializer(
+                {
+                    "server": server.pk,
+                    "players": [
+                        {"steam_id": steam_id, "permissions": sorted(permissions[steam_id])} for steam_id in steam_ids
+                    ],
+                }
+            ).data
+        )
 
 
-class PermissionViewSet(viewsets.ModelViewSet):
+class PermissionViewSet(AtomicWriteMixin, SparseFieldsMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """View set для доступа к списку разрешений"""
 
     queryset = Permission.objects.all()
@@ -147,7 +289,7 @@ class PermissionViewSet(viewsets.ModelViewSet):
     }
 
 
-class RoleViewSet(viewsets.ModelViewSet):
+class RoleViewSet(AtomicWriteMixin, SparseFieldsMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """View set для доступа к списку ролей"""
 
     queryset = Role.objects.all()
@@ -162,7 +304,7 @@ class RoleViewSet(viewsets.ModelViewSet):
             return RoleSerializerWrite
 
 
-class PrivilegedViewSet(viewsets.ModelViewSet):
+class PrivilegedViewSet(AtomicWriteMixin, SparseFieldsMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """View set для доступа к привилегированным пользователям"""
 
     queryset = Privileged.objects.all()
@@ -172,13 +314,15 @@ class PrivilegedViewSet(viewsets.ModelViewSet):
     filterset_class = PrivilegedFilter
 
 
-class ServerPrivilegedViewSet(viewsets.ModelViewSet):
+class ServerPrivilegedViewSet(AtomicWriteMixin, SparseFieldsMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """View set для доступа к привилегированным пользователям на серверах"""
 
-    queryset = ServerPrivileged.objects.select_related("privileged", "server").prefetch_related("roles").all()
+    queryset = ServerPrivileged.objects.all()
     pagination_class = DefaultLimitOffsetPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = ServerPrivilegedFilter
+    # Роли в ответе - только ID, остальные поля ролей не нужны
+    prefetch_related_fields = {"roles": (Prefetch("roles", queryset=Role.objects.only("pk")),)}
 
     def get_serializer_class(self):
         if self.request.method in SAFE_METHODS:
@@ -186,12 +330,109 @@ class ServerPrivilegedViewSet(viewsets.ModelViewSet):
         else:
             return ServerPrivilegedSerializerWrite
 
+    @extend_schema(
+        parameters=[ServerPrivilegedExportQuerySerializer],
+        responses={
+            (200, "application/x-ndjson"): OpenApiResponse(
+                OpenApiTypes.STR,
+                "По одной роли на сервере в строке, JSON с данными пользователя, сервера и списком ролей",
+            )
+        },
+    )
+    @action(methods=["get"], detail=False, pagination_class=None, filter_backends=[])
+    def export(self, request: Request) -> StreamingHttpResponse:
+        """
+        Потоковая выгрузка всех ролей пользователей на серверах в формате
+        NDJSON одним запросом, с постоянным потреблением памяти
+        """
+        query = ServerPrivilegedExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        rows = server_privileged__iter_export(
+            server_id=query.validated_data.get("server"),
+            active_only=query.validated_data["active_only"],
+            changed_since=query.validated_data.get("changed_since"),
+        )
 
-class WebhookLogViewSet(viewsets.ReadOnlyModelViewSet):
+        return StreamingHttpResponse(
+            (json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n" for row in rows),
+            content_type="application/x-ndjson",
+        )
+
+    @extend_schema(request=ServerPrivilegedBulkCreateSerializer, responses=ServerPrivilegedBulkResultsSerializer)
+    @action(methods=["post"], detail=False, pagination_class=None, filter_backends=[])
+    def bulk_create(self, request: Request) -> Response:
+        """
+        Создание ролей пользователей на серверах списком в одной транзакции,
+        элементы с ошибками пропускаются, результат возвращается для каждого
+        """
+        return self._bulk_write(request, ServerPrivilegedBulkCreateItemSerializer, server_privileged__bulk_create)
+
+    @extend_schema(request=ServerPrivilegedBulkUpdateSerializer, responses=ServerPrivilegedBulkResultsSerializer)
+    @action(
+        methods=["post"],
+        detail=False,
+        pagination_class=None,
+        filter_backends=[],
+        permission_classes=[BulkChangeDjangoModelPermissions],
+    )
+    def bulk_update(self, request: Request) -> Response:
+        """
+        Частичное изменение ролей пользователей на серверах списком в одной
+        транзакции: продление, перенос на другой сервер, замена ролей
+        """
+        return self._bulk_write(request, ServerPrivilegedBulkUpdateItemSerializer, server_privileged__bulk_update)
+
+    @extend_schema(request=ServerPrivilegedBulkDeactivateSerializer, responses=ServerPrivilegedBulkResultsSerializer)
+    @action(
+        methods=["post"],
+        detail=False,
+        pagination_class=None,
+        filter_backends=[],
+        permission_classes=[BulkChangeDjangoModelPermissions],
+    )
+    def bulk_deactivate(self, request: Request) -> Response:
+        """Деактивация ролей пользователей на серверах по списку ID"""
+        query = ServerPrivilegedBulkDeactivateSerializer(data=request.data)
+        query.is_valid(raise_exception=True)
+
+        results = server_privileged__bulk_deactivate(ids=query.validated_data["ids"])
+
+        return Response(ServerPrivilegedBulkResultsSerializer({"results": results}).data)
+
+    def _bulk_write(self, request: Request, item_serializer_class, write) -> Response:
+        query = ServerPrivilegedBulkItemsSerializer(data=request.data)
+        query.is_valid(raise_exception=True)
+
+        results: list[dict | None] = []
+        valid_items = []
+        for item in query.validated_data["items"]:
+            item_serializer = item_serializer_class(data=item)
+            if item_serializer.is_valid():
+                results.append(None)
+                valid_items.append(item_serializer.validated_data)
+            else:
+                results.append({"id": self._get_item_id(item), "status": ERROR, "errors": item_serializer.errors})
+
+        written = iter(write(items=valid_items))
+        results = [result or next(written) for result in results]
+
+        return Response(ServerPrivilegedBulkResultsSerializer({"results": results}).data)
+
+    @staticmethod
+    def _get_item_id(item: dict) -> int | None:
+        """ID элемента с ошибкой для результата, если он передан числом"""
+        try:
+            return IntegerField().to_internal_value(item.get("id"))
+        except ValidationError:
+            return None
+
+
+class WebhookLogViewSet(SparseFieldsMixin, viewsets.ReadOnlyModelViewSet):
     """View set только на чтение для доступа к логам вебхуков"""
 
     queryset = WebhookLog.objects.all()
     serializer_class = WebhookLogSerializer
-    pagination_class = DefaultLimitOffsetPagination
+    pagination_class = WebhookLogCursorPagination
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ["level"]
+    filterset_class = WebhookLogFilter
@@ -0,0 +1,79 @@
+// Подсказки названий карт из каталога карт для текущей строки списка карт
+document.addEventListener("DOMContentLoaded", () => {
+    document.querySelectorAll("textarea.layers-autocomplete").forEach((textarea) => {
+        const suggestions = document.createElement("ul");
+        suggestions.className = "layers-autocomplete-results";
+        suggestions.hidden = true;
+        textarea.after(suggestions);
+
+        let searchTimer = null;
+
+        // Начало и конец названия карты в строке с курсором, без фракций после |
+        const getCurrentLayer = () => {
+            const value = textarea.value;
+            const start = value.lastIndexOf("\n", textarea.selectionStart - 1) + 1;
+            let end = value.indexOf("\n", start);
+            if (end === -1) {
+                end = value.length;
+            }
+
+            const line = value.slice(start, end);
+            const nameLength = line.search(/[\s|#]|\/\//);
+            return { start, end: start + (nameLength === -1 ? line.length : nameLength) };
+        };
+
+        const hide = () => {
+            suggestions.hidden = true;
+            suggestions.replaceChildren();
+        };
+
+        const load = () => {
+            const { start, end } = getCurrentLayer();
+            if (textarea.selectionStart > end) {
+                hide();
+                return;
+            }
+
+            const term = textarea.value.slice(start, end);
+            if (!term) {
+                hide();
+                return;
+            }
+
+            fetch(textarea.dataset.autocompleteUrl + "?term=" + encodeURIComponent(term), { credentials: "same-origin" })
+                .then((response) => (response.ok ? response.json() : Promise.reject(response.status)))
+                .then(({ results }) => {
+                    suggestions.replaceChildren(
+                        ...results.map((layer) => {
+                            const item = document.createElement("li");
+                            item.textContent = layer;
+                            return item;
+                        })
+                    );
+                    suggestions.hidden = results.length === 0;
+                })
+                .catch(hide);
+        };
+
+        // Выбранная карта заменяет название в текущей строке, фракции сохраняются
+        suggestions.addEventListener("mousedown", (event) => {
+            const item = event.target.closest("li");
+            if (!item) {
+                return;
+            }
+
+            event.preventDefault();
+            const { start, end } = getCurrentLayer();
+            textarea.setRangeText(item.textContent, start, end, "end");
+            textarea.focus();
+            hide();
+        });
+
+        textarea.addEventListener("input", () => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(load, 300);
+        });
+
+        textarea.addEventListener("blur", hide);
+    });
+});
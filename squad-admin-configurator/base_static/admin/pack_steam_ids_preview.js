@@ -0,0 +1,41 @@
+// Постраничная загрузка обработанного списка Steam ID на странице списка пользователей
+document.addEventListener("DOMContentLoaded", () => {
+    document.querySelectorAll(".pack-steam-ids-preview").forEach((preview) => {
+        const results = preview.querySelector(".pack-steam-ids-preview-results");
+        const search = preview.querySelector("input[type=search]");
+        let searchTimer = null;
+
+        const load = (query) => {
+            fetch(preview.dataset.url + query, { credentials: "same-origin" })
+                .then((response) => (response.ok ? response.text() : Promise.reject(response.status)))
+                .then((html) => {
+                    results.innerHTML = html;
+                })
+                .catch(() => {
+                    results.textContent = "Не удалось загрузить список";
+                });
+        };
+
+        // Ссылки пагинации ведут на ?page=..., загружаем их в этот же блок
+        results.addEventListener("click", (event) => {
+            const link = event.target.closest("a");
+            if (link && link.getAttribute("href")?.startsWith("?")) {
+                event.preventDefault();
+                load(link.search);
+            }
+        });
+
+        search.addEventListener("keydown", (event) => {
+            if (event.key === "Enter") {
+                event.preventDefault();
+            }
+        });
+
+        search.addEventListener("input", () => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => load("?q=" + encodeURIComponent(search.value.trim())), 300);
+        });
+
+        load("");
+    });
+});
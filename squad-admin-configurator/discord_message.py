@@ -1,40 +1,133 @@
 import logging
-from collections.abc import Sequence
-
-from discord_webhook import DiscordWebhook
-from requests.exceptions import Timeout
-
-
-def send_messages_to_discord(
-    webhook_uri: str,
-    username: str,
-    messages: list[str] | str = None,
-) -> None:
-    if isinstance(messages, str):
-        messages: list[str] = [messages]
-    elif not isinstance(messages, Sequence):
-        raise ValueError("message must be a sequence")
-
-    discord_webhook = DiscordWebhook(
-        url=webhook_uri,
-        username=username,
-        rate_limit_retry=True,
-    )
-
-    for text in messages:
-        discord_webhook.content = text
-        last_error: None | Exception = None
-        for _ in range(3):
+import time
+from collections.abc import Iterable
+
+import requests
+
+# Ограничение Discord на длину поля content у сообщения
+MAX_MESSAGE_LENGTH = 2000
+
+MESSAGES_SEPARATOR = "\n\n"
+
+
+class DiscordSendError(Exception):
+    pass
+
+
+def pack_messages(messages: Iterable[str], max_length: int = MAX_MESSAGE_LENGTH) -> list[list[int]]:
+    """
+    Упаковывает тексты в как можно меньшее количество сообщений Discord,
+    не превышая лимит длины одного сообщения
+
+    Возвращает список групп индексов исходных текстов, каждая группа -
+    одно сообщение, порядок текстов сохраняется
+    """
+    groups: list[list[int]] = []
+    current_length = 0
+
+    for index, text in enumerate(messages):
+        text_length = min(len(text), max_length)
+
+        if groups and current_length + len(MESSAGES_SEPARATOR) + text_length <= max_length:
+            groups[-1].append(index)
+            current_length += len(MESSAGES_SEPARATOR) + text_length
+        else:
+            groups.append([index])
+            current_length = text_length
+
+    return groups
+
+
+def join_messages(messages: Iterable[str], max_length: int = MAX_MESSAGE_LENGTH) -> str:
+    return MESSAGES_SEPARATOR.join(text[:max_length] for text in messages)
+
+
+class DiscordSender:
+    """
+    Отправка сообщений в вебхуки Discord через одну HTTP сессию
+
+    При таймаутах, ошибках соединения, ответах 5xx и 429 запрос повторяется
+    с экспоненциально растущей задержкой, при 429 задержка берется из ответа
+    Discord, но не больше max_delay
+
+    Любая ошибка отправки, в том числе неверный адрес вебхука, приводит
+    к DiscordSendError
+    """
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 4,
+        base_delay: float = 1,
+        max_delay: float = 30,
+        timeout: float = 10,
+        session: requests.Session | None = None,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    def send(self, webhook_uri: str, username: str, content: str) -> None:
+        """
+        Raises:
+            DiscordSendError: Если сообщение не удалось отправить за все попытки
+        """
+        last_error = ""
+        delay: float = 0
+
+        for attempt in range(self.max_attempts):
+            if attempt:
+                time.sleep(delay)
+
+            delay = min(self.base_delay * 2**attempt, self.max_delay)
+
             try:
-                discord_webhook.execute()
-                last_error = None
-            except Timeout as e:
-                logging.warning(f'Timeout when send message "{text}" to discord')
-                last_error = e
-            except ConnectionError as e:
-                logging.warning(f'Connection error when send message "{text}" to discord')
-                last_error = e
-            break
-
-        if last_error is not None:
-            logging.error("Ошибка при отправке сообщения в дискорд", exc_info=last_error)
+                response = self.session.post(
+                    webhook_uri,
+                    json={"username": username, "content": content},
+                    timeout=self.timeout,
+                )
+            except requests.Timeout:
+                last_error = "Timeout"
+                logging.warning("Timeout when send message to discord")
+                continue
+            except requests.ConnectionError:
+                last_error = "Connection error"
+                logging.warning("Connection error when send message to discord")
+                continue
+            except requests.RequestException as error:
+                # Неверный адрес вебхука и прочие ошибки запроса повторами не исправить
+                last_error = f"Request error: {error}"
+                logging.warning(f"Error when send message to discord, {last_error}")
+                break
+
+            if response.ok:
+                return
+
+            last_error = f"HTTP {response.status_code}: {response.text[:200]}"
+
+            if response.status_code == 429:
+                delay = min(self._get_retry_after(response, default=delay), self.max_delay)
+            elif response.status_code < 500:
+                # Ошибки в самом запросе повторами не исправить
+                break
+
+            logging.warning(f"Error when send message to discord, {last_error}")
+
+        raise DiscordSendError(last_error)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _get_retry_after(self, response: requests.Response, default: float) -> float:
+        try:
+            return float(response.json()["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            pass
+
+        try:
+            return float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            return default
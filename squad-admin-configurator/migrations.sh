@@ -5,3 +5,6 @@ set -e
 python3 manage.py makemigrations django_cron --noinput
 
 python3 manage.py migrate --noinput
+
+# Таблица действующих ролей производная, пересобирается после миграций
+python3 manage.py rebuild_effective_access
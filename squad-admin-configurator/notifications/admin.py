@@ -0,0 +1,26 @@
+from django.contrib import admin
+
+from .models import DiscordNotification
+
+
+@admin.register(DiscordNotification)
+class DiscordNotificationAdmin(admin.ModelAdmin):
+    fields = (
+        "text",
+        "username",
+        "creation_date",
+        "sent_date",
+        "attempts",
+        "next_attempt_date",
+        "last_error",
+    )
+    readonly_fields = fields
+    list_display = ("text_display", "creation_date", "sent_date", "attempts", "last_error")
+    list_filter = ("creation_date", "sent_date")
+
+    @admin.display(description="Текст уведомления")
+    def text_display(self, obj: DiscordNotification) -> str:
+        return obj.text[:100]
+
+    def has_add_permission(self, request) -> bool:
+        return False
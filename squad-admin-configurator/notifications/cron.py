@@ -0,0 +1,13 @@
+from django_cron import CronJobBase, Schedule
+
+from .services.discord_notification import discord_notification__delete_sent
+
+DELETE_SENT_OLDER_THAN_DAYS = 30
+
+
+class DeleteSentDiscordNotifications(CronJobBase):
+    schedule = Schedule(run_every_mins=60 * 24)
+    code = "Удаление отправленных уведомлений в Discord"
+
+    def do(self) -> None:
+        discord_notification__delete_sent(older_than_days=DELETE_SENT_OLDER_THAN_DAYS)
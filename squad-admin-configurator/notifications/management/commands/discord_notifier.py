@@ -0,0 +1,40 @@
+import time
+
+from discord_message import DiscordSender
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import close_old_connections
+from notifications.services.discord_notification import discord_notification__send_pending
+
+
+class Command(BaseCommand):
+    help = "Отправка накопившихся уведомлений в Discord, работает отдельным процессом"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "-s",
+            "--sleep",
+            type=float,
+            default=10,
+            help="Пауза между проверками очереди уведомлений в секундах",
+        )
+        parser.add_argument("--once", action="store_true", help="Отправить накопившиеся уведомления и завершиться")
+
+    def handle(self, *args, **options):
+        sender = DiscordSender()
+
+        try:
+            while True:
+                close_old_connections()
+
+                sent = discord_notification__send_pending(sender=sender)
+                if sent:
+                    self.stdout.write(f"Отправлено уведомлений: {sent}")
+
+                if options["once"]:
+                    return
+
+                time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sender.close()
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.29 on 2026-10-19 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiscordNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('webhook_uri', models.CharField(max_length=500, verbose_name='Вебхук Discord')),
+                ('username', models.CharField(max_length=80, verbose_name='Имя отправителя')),
+                ('text', models.TextField(verbose_name='Текст уведомления')),
+                ('creation_date', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('sent_date', models.DateTimeField(blank=True, null=True, verbose_name='Дата отправки')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Количество неудачных попыток отправки')),
+                ('next_attempt_date', models.DateTimeField(blank=True, null=True, verbose_name='Дата следующей попытки отправки')),
+                ('last_error', models.CharField(blank=True, max_length=300, verbose_name='Последняя ошибка отправки')),
+            ],
+            options={
+                'verbose_name': 'Уведомление в Discord',
+                'verbose_name_plural': '1. Уведомления в Discord',
+                'ordering': ('-creation_date',),
+                'indexes': [models.Index(condition=models.Q(('sent_date__isnull', True)), fields=['next_attempt_date', 'id'], name='discord_notification_pending')],
+            },
+        ),
+    ]
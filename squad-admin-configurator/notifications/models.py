@@ -0,0 +1,35 @@
+from django.db import models
+
+
+class DiscordNotification(models.Model):
+    """
+    Исходящее уведомление в Discord, записывается в базу и отправляется
+    отдельным процессом (manage.py discord_notifier), уведомления с одинаковым
+    вебхуком и именем отправителя склеиваются в общие сообщения
+    """
+
+    webhook_uri = models.CharField("Вебхук Discord", max_length=500)
+    username = models.CharField("Имя отправителя", max_length=80)
+    text = models.TextField("Текст уведомления")
+
+    creation_date = models.DateTimeField("Дата создания", auto_now_add=True)
+    sent_date = models.DateTimeField("Дата отправки", blank=True, null=True)
+
+    attempts = models.PositiveSmallIntegerField("Количество неудачных попыток отправки", default=0)
+    next_attempt_date = models.DateTimeField("Дата следующей попытки отправки", blank=True, null=True)
+    last_error = models.CharField("Последняя ошибка отправки", max_length=300, blank=True)
+
+    def __str__(self) -> str:
+        return self.text[:50]
+
+    class Meta:
+        verbose_name = "Уведомление в Discord"
+        verbose_name_plural = "1. Уведомления в Discord"
+        ordering = ("-creation_date",)
+        indexes = [
+            models.Index(
+                fields=["next_attempt_date", "id"],
+                condition=models.Q(sent_date__isnull=True),
+                name="discord_notification_pending",
+            ),
+        ]
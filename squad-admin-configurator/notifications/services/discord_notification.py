@@ -0,0 +1,97 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from discord_message import DiscordSender, DiscordSendError, join_messages, pack_messages
+from django.db.models import Q
+from django.utils import timezone
+from notifications.models import DiscordNotification
+
+MAX_ATTEMPTS = 8
+RETRY_BASE_DELAY = timedelta(minutes=1)
+RETRY_MAX_DELAY = timedelta(hours=1)
+SEND_BATCH_SIZE = 500
+
+
+def discord_notification__enqueue(*, webhook_uri: str, username: str, messages: list[str]) -> None:
+    """
+    Запись уведомлений в очередь на отправку, сама отправка происходит
+    в отдельном процессе
+    """
+    DiscordNotification.objects.bulk_create(
+        [DiscordNotification(webhook_uri=webhook_uri, username=username, text=text) for text in messages]
+    )
+
+
+def discord_notification__send_pending(*, sender: DiscordSender) -> int:
+    """
+    Отправка накопившихся уведомлений, уведомления для одного вебхука
+    склеиваются в сообщения до 2000 символов
+
+    Если вебхук не отвечает - все его неотправленные уведомления
+    откладываются с экспоненциально растущей задержкой
+
+    Возвращает количество отправленных уведомлений
+    """
+    now = timezone.now()
+
+    pending = (
+        DiscordNotification.objects.filter(
+            Q(next_attempt_date__isnull=True) | Q(next_attempt_date__lte=now),
+            sent_date__isnull=True,
+            attempts__lt=MAX_ATTEMPTS,
+        )
+        .only("pk", "webhook_uri", "username", "text", "attempts")
+        .order_by("id")[:SEND_BATCH_SIZE]
+    )
+
+    notifications_by_chat: defaultdict[tuple[str, str], list[DiscordNotification]] = defaultdict(list)
+    for notification in pending:
+        notifications_by_chat[(notification.webhook_uri, notification.username)].append(notification)
+
+    sent = 0
+    for (webhook_uri, username), notifications in notifications_by_chat.items():
+        groups = pack_messages(notification.text for notification in notifications)
+
+        for group_number, group in enumerate(groups):
+            batch = [notifications[index] for index in group]
+
+            try:
+                sender.send(webhook_uri, username, join_messages(notification.text for notification in batch))
+            except DiscordSendError as error:
+                unsent = [notifications[index] for unsent_group in groups[group_number:] for index in unsent_group]
+                _postpone(unsent, error=str(error))
+                break
+
+            DiscordNotification.objects.filter(pk__in=[notification.pk for notification in batch]).update(
+                sent_date=timezone.now()
+            )
+            sent += len(batch)
+
+    return sent
+
+
+def discord_notification__delete_sent(*, older_than_days: int) -> None:
+    """
+    Удаление отправленных уведомлений и уведомлений, которые исчерпали
+    попытки отправки, старше older_than_days дней
+    """
+    border_date = timezone.now() - timedelta(days=older_than_days)
+
+    DiscordNotification.objects.filter(
+        Q(sent_date__lt=border_date)
+        | Q(sent_date__isnull=True, attempts__gte=MAX_ATTEMPTS, creation_date__lt=border_date)
+    ).delete()
+
+
+def _postpone(notifications: list[DiscordNotification], *, error: str) -> None:
+    now = timezone.now()
+
+    for notification in notifications:
+        notification.attempts += 1
+        notification.next_attempt_date = now + min(
+            RETRY_BASE_DELAY * 2 ** (notification.attempts - 1),
+            RETRY_MAX_DELAY,
+        )
+        notification.last_error = error[:300]
+
+    DiscordNotification.objects.bulk_update(notifications, ["attempts", "next_attempt_date", "last_error"])
@@ -0,0 +1,58 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class DiscordStubServer:
+    """
+    Локальный HTTP сервер вместо вебхука Discord для тестов
+
+    Отвечает на POST запросы заданными ответами по очереди, после их
+    окончания - 204, все полученные тела запросов сохраняются в requests
+    """
+
+    def __init__(self, responses: list[tuple[int, dict | None]] | None = None) -> None:
+        self.responses = list(responses or [])
+        self.requests: list[dict] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/api/webhooks/1/token"
+
+    def __enter__(self) -> "DiscordStubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _next_response(self, body: dict) -> tuple[int, dict | None]:
+        with self._lock:
+            self.requests.append(body)
+            return self.responses.pop(0) if self.responses else (204, None)
+
+    def _make_handler(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                status, response = stub._next_response(body)
+
+                content = json.dumps(response).encode() if response is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
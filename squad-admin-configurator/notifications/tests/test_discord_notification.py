@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from discord_message import MAX_MESSAGE_LENGTH, DiscordSender
+from django.test import TestCase
+from django.utils import timezone
+from notifications.models import DiscordNotification
+from notifications.services.discord_notification import (
+    MAX_ATTEMPTS,
+    discord_notification__delete_sent,
+    discord_notification__enqueue,
+    discord_notification__send_pending,
+)
+
+from .discord_stub import DiscordStubServer
+
+
+class DiscordNotificationSendTest(TestCase):
+    def setUp(self) -> None:
+        self.sender = DiscordSender(base_delay=0, max_delay=0, timeout=5)
+
+    def tearDown(self) -> None:
+        self.sender.close()
+
+    def test_notifications_packed_into_messages(self) -> None:
+        with DiscordStubServer() as stub:
+            discord_notification__enqueue(webhook_uri=stub.url, username="bot", messages=["x" * 900] * 5)
+
+            self.assertEqual(discord_notification__send_pending(sender=self.sender), 5)
+
+        self.assertEqual(len(stub.requests), 3)
+        self.assertTrue(all(len(body["content"]) <= MAX_MESSAGE_LENGTH for body in stub.requests))
+        self.assertFalse(DiscordNotification.objects.filter(sent_date__isnull=True).exists())
+
+    def test_rate_limit_retried(self) -> None:
+        with DiscordStubServer([(429, {"retry_after": 0}), (500, None)]) as stub:
+            discord_notification__enqueue(webhook_uri=stub.url, username="bot", messages=["text"])
+
+            self.assertEqual(discord_notification__send_pending(sender=self.sender), 1)
+
+        self.assertEqual(len(stub.requests), 3)
+
+    def test_unavailable_webhook_postponed(self) -> None:
+        with DiscordStubServer([(500, None)] * self.sender.max_attempts) as stub:
+            discord_notification__enqueue(webhook_uri=stub.url, username="bot", messages=["first", "second"])
+
+            self.assertEqual(discord_notification__send_pending(sender=self.sender), 0)
+            # Отложенные уведомления не отправляются до следующей попытки
+            self.assertEqual(discord_notification__send_pending(sender=self.sender), 0)
+
+        self.assertEqual(len(stub.requests), self.sender.max_attempts)
+        for notification in DiscordNotification.objects.all():
+            self.assertEqual(notification.attempts, 1)
+            self.assertIsNotNone(notification.next_attempt_date)
+            self.assertEqual(notification.last_error, "HTTP 500: ")
+
+    def test_invalid_webhook_postponed(self) -> None:
+        discord_notification__enqueue(webhook_uri="", username="bot", messages=["text"])
+
+        self.assertEqual(discord_notification__send_pending(sender=self.sender), 0)
+
+        notification = DiscordNotification.objects.get()
+        self.assertEqual(notification.attempts, 1)
+        self.assertTrue(notification.last_error.startswith("Request error"))
+
+
+class DiscordNotificationDeleteTest(TestCase):
+    def test_sent_and_failed_deleted(self) -> None:
+        old_date = timezone.now() - timedelta(days=31)
+
+        DiscordNotification.objects.create(webhook_uri="", username="bot", text="sent", sent_date=old_date)
+        failed = DiscordNotification.objects.create(
+            webhook_uri="", username="bot", text="failed", attempts=MAX_ATTEMPTS
+        )
+        pending = DiscordNotification.objects.create(webhook_uri="", username="bot", text="pending", attempts=1)
+        recent = DiscordNotification.objects.create(
+            webhook_uri="", username="bot", text="recent", sent_date=timezone.now()
+        )
+        DiscordNotification.objects.filter(pk__in=[failed.pk, pending.pk]).update(creation_date=old_date)
+
+        discord_notification__delete_sent(older_than_days=30)
+
+        self.assertEqual(set(DiscordNotification.objects.values_list("pk", flat=True)), {pending.pk, recent.pk})
@@ -9,3 +9,19 @@ class AdvancedDjangoModelPermissions(DjangoModelPermissions):
     def __init__(self):
         self.perms_map = copy.deepcopy(self.perms_map)
         self.perms_map["GET"] = ["%(app_label)s.view_%(model_name)s"]
+
+
+class LookupDjangoModelPermissions(AdvancedDjangoModelPermissions):
+    """Для POST запросов, которые только читают данные, достаточно права на просмотр"""
+
+    def __init__(self):
+        super().__init__()
+        self.perms_map["POST"] = self.perms_map["GET"]
+
+
+class BulkChangeDjangoModelPermissions(AdvancedDjangoModelPermissions):
+    """Для POST запросов, которые изменяют или деактивируют записи, нужно право на изменение"""
+
+    def __init__(self):
+        super().__init__()
+        self.perms_map["POST"] = self.perms_map["PATCH"]
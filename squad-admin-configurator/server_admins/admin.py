@@ -2,10 +2,17 @@ from datetime import datetime
 
 import adminactions.actions as actions
 from access.admin import AccessModelAdmin
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.admin import site
+from django.contrib.admin.utils import unquote
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import EmptyPage, PageNotAnInteger
+from django.db.models import CharField, Q
+from django.db.models.functions import Cast
 from django.db.models.query import QuerySet
+from django.http import HttpResponse
 from django.http.request import HttpRequest
+from django.urls import path, reverse
 from django.utils.html import format_html, format_html_join
 from django.utils.safestring import SafeText, mark_safe
 from server_admins.models import (
@@ -15,15 +22,21 @@ from server_admins.models import (
     Server,
     ServerPrivileged,
     ServerPrivilegedPack,
+    ServerPrivilegedPackMember,
 )
+from server_admins.steam_ids_parser import SteamIDsSpec
 from server_admins.utils import date_or_perpetual
 
-from .steam_ids_parser import SteamIDsSpec
 from .tables import SteamIDSTable
 
 # Регистрация всех action из adminactions
 actions.add_to_site(site)
 
+STEAM_IDS_PREVIEW_PAGE_SIZE = 50
+
+# Сколько повторов Steam ID показывать предупреждениями после сохранения списка
+MAX_SAVE_WARNINGS = 10
+
 
 def custom_titled_filter(title):
     class Wrapper(admin.FieldListFilter):
@@ -269,6 +282,9 @@ class ServerPrivilegedPackAdmin(AccessModelAdmin):
     ordering = ("-creation_date",)
     search_fields = ("steam_ids", "servers__title")
 
+    class Media:
+        js = ("admin/pack_steam_ids_preview.js",)
+
     @admin.display(
         ordering="-date_of_end",
         empty_value="Бессрочно",
@@ -291,21 +307,75 @@ class ServerPrivilegedPackAdmin(AccessModelAdmin):
 
     @admin.display(description="Обработанный список Steam ID", empty_value="-")
     def parsed_steam_ids(self, obj: ServerPrivilegedPack) -> SafeText | str:
-        if obj.steam_ids == "":
+        if obj.pk is None or obj.steam_ids == "":
             return "-"
 
-        steam_ids_data = []
-        for node in SteamIDsSpec.parse(obj.steam_ids):
-            if node.kind == SteamIDsSpec.STEAMID.name:
-                steam_ids_data.append({"steam_id": node.value, "comment": ""})
-            elif node.kind == SteamIDsSpec.COMMENT.name and len(steam_ids_data) and steam_ids_data[-1]["comment"] == "":
-                steam_ids_data[-1]["comment"] = node.value
+        parsed = SteamIDsSpec.scan(obj.steam_ids, max_ids=obj.max_ids)
+        messages_html = format_html_join(
+            mark_safe("<br>"),
+            "{}",
+            ((message,) for message in parsed.get_error_messages() + parsed.get_warning_messages()),
+        )
 
-        if len(steam_ids_data) == 0:
-            return "-"
+        # Таблица загружается отдельным запросом постранично, чтобы большие
+        # списки не увеличивали размер и время открытия страницы
+        return format_html(
+            "{}"
+            '<div class="pack-steam-ids-preview" data-url="{}">'
+            '<input type="search" placeholder="Поиск по Steam ID или комментарию" class="vTextField">'
+            '<div class="pack-steam-ids-preview-results">Загрузка...</div>'
+            "</div>",
+            messages_html,
+            reverse("admin:server_admins_serverprivilegedpack_steam_ids_preview", args=[obj.pk]),
+        )
 
-        table = SteamIDSTable(steam_ids_data, orderable=False)
-        return table.as_html(self.request)
+    def get_urls(self):
+        urls = [
+            path(
+                "<path:object_id>/steam_ids_preview/",
+                self.admin_site.admin_view(self.steam_ids_preview),
+                name="server_admins_serverprivilegedpack_steam_ids_preview",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def steam_ids_preview(self, request: HttpRequest, object_id: str) -> HttpResponse:
+        """
+        Страница Steam ID списка из ServerPrivilegedPackMember, ?q= - поиск по
+        Steam ID и комментарию, ?page= - номер страницы, некорректный номер
+        заменяется первой страницей, номер за пределами - последней
+        """
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None or not self.has_view_permission(request, obj):
+            raise PermissionDenied
+
+        members = ServerPrivilegedPackMember.objects.filter(pack=obj).order_by("steam_id")
+
+        query = request.GET.get("q", "").strip()
+        if query:
+            members = members.annotate(steam_id_text=Cast("steam_id", CharField())).filter(
+                Q(steam_id_text__contains=query) | Q(comment__icontains=query)
+            )
+
+        table = SteamIDSTable(members.values("steam_id", "comment"), orderable=False)
+        try:
+            table.paginate(page=request.GET.get("page", 1), per_page=STEAM_IDS_PREVIEW_PAGE_SIZE)
+        except PageNotAnInteger:
+            table.paginate(page=1, per_page=STEAM_IDS_PREVIEW_PAGE_SIZE)
+        except EmptyPage:
+            table.paginate(page=table.paginator.num_pages, per_page=STEAM_IDS_PREVIEW_PAGE_SIZE)
+
+        return HttpResponse(table.as_html(request))
+
+    def save_model(self, request: HttpRequest, obj: ServerPrivilegedPack, form, change: bool) -> None:
+        super().save_model(request, obj, form, change)
+
+        warnings = SteamIDsSpec.scan(obj.steam_ids, max_ids=obj.max_ids).get_warning_messages()
+        if len(warnings) > MAX_SAVE_WARNINGS:
+            warnings = warnings[:MAX_SAVE_WARNINGS] + [f"и еще повторов: {len(warnings) - MAX_SAVE_WARNINGS}"]
+
+        for warning in warnings:
+            self.message_user(request, warning, messages.WARNING)
 
     def get_readonly_fields(self, request, obj: ServerPrivilegedPack | None = None):
         if request.user.is_superuser or obj is None:
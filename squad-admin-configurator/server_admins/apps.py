@@ -8,3 +8,4 @@ class ServerAdminsConfig(AppConfig):
 
     def ready(self):
         import server_admins.access  # noqa
+        import server_admins.signals  # noqa
@@ -0,0 +1,79 @@
+import random
+import time
+import tracemalloc
+from array import array
+from collections.abc import Sequence
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from server_admins.steam_ids_parser import SteamIDsSpec
+
+FIRST_STEAM_ID = 76561197960265728
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнение разбора списка Steam ID через узлы (parse + фильтрация) и потокового scan "
+        "по времени и пиковому потреблению памяти, с проверкой совпадения результатов"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 10000, 100000], help="Количество Steam ID")
+        parser.add_argument("--seed", type=int, default=None, help="Seed для генерации списков")
+        parser.add_argument(
+            "--max-ids", type=int, default=100, help="Ограничение количества ID для замера проверки с ранним выходом"
+        )
+
+    def handle(self, *args, **options):
+        rand = random.Random(options["seed"])
+
+        for size in options["sizes"]:
+            text = self.generate_text(size, rand)
+
+            nodes_steam_ids, nodes_time, nodes_memory = self.measure(self.parse_with_nodes, text)
+            scan_steam_ids, scan_time, scan_memory = self.measure(self.parse_with_scan, text)
+
+            if nodes_steam_ids != list(scan_steam_ids):
+                raise CommandError(f"Результаты разбора не совпадают для {size} Steam ID")
+
+            self.stdout.write(
+                f"{size} Steam ID: parse {nodes_time * 1000:.1f} мс, {nodes_memory / 1024:.0f} КиБ; "
+                f"scan {scan_time * 1000:.1f} мс, {scan_memory / 1024:.0f} КиБ"
+            )
+
+            if 0 < options["max_ids"] < size:
+                _, limited_time, limited_memory = self.measure(
+                    lambda value: SteamIDsSpec.scan(value, max_ids=options["max_ids"]).steam_ids, text
+                )
+                self.stdout.write(
+                    f"{size} Steam ID, проверка с max_ids={options['max_ids']}: "
+                    f"{limited_time * 1000:.2f} мс, {limited_memory / 1024:.0f} КиБ"
+                )
+
+    def generate_text(self, size: int, rand: random.Random) -> str:
+        lines = []
+        for number in range(size):
+            steam_id = FIRST_STEAM_ID + rand.randrange(10**9)
+            lines.append(f"{steam_id} # Игрок {number}" if number % 3 == 0 else str(steam_id))
+
+        return "\n".join(lines)
+
+    def parse_with_nodes(self, text: str) -> list[int]:
+        nodes = SteamIDsSpec.parse(text)
+        SteamIDsSpec.check_errors(nodes)
+        return [int(node.value) for node in nodes if node.kind == SteamIDsSpec.STEAMID.name]
+
+    def parse_with_scan(self, text: str) -> array:
+        return SteamIDsSpec.scan(text, check_duplicates=False).steam_ids
+
+    def measure(self, parse, text: str) -> tuple[Sequence[int], float, int]:
+        tracemalloc.start()
+        start = time.perf_counter()
+
+        try:
+            result = parse(text)
+            duration = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return result, duration, peak
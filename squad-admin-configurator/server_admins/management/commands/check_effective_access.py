@@ -0,0 +1,84 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db.models import Q
+from django.utils import timezone
+from server_admins.models import EffectiveAccess, Server
+from server_admins.services.effective_access import ROW_FIELDS, effective_access__check, effective_access__rebuild
+from server_admins.services.server_config import server__get_active_packs, server__get_active_privileges
+from server_admins.steam_ids_parser import SteamIDsSpec
+
+MAX_REPORTED_ROWS = 20
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверка таблицы действующих ролей с пересчетом по источникам и с правилами генерации "
+        "конфигурации администраторов для каждого активного сервера"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--fix", action="store_true", help="Пересобрать таблицу, если найдены расхождения")
+
+    def handle(self, *args, **options):
+        missing, extra = effective_access__check()
+        self.report("Недостающие записи", missing)
+        self.report("Лишние записи", extra)
+
+        config_mismatches = 0
+        now = timezone.now()
+
+        for server in Server.objects.filter(is_active=True):
+            expected = self.get_config_roles(server, now)
+            stored = set(
+                EffectiveAccess.objects.filter(Q(expires_at__gte=now) | Q(expires_at=None), server=server).values_list(
+                    "steam_id", "role_id"
+                )
+            )
+
+            if expected != stored:
+                config_mismatches += 1
+                self.stdout.write(
+                    f"{server}: роли не совпадают с конфигурацией, нет в таблице {len(expected - stored)}, "
+                    f"лишних в таблице {len(stored - expected)}"
+                )
+
+        if not missing and not extra and not config_mismatches:
+            self.stdout.write("Расхождений не найдено")
+            return
+
+        if options["fix"]:
+            effective_access__rebuild()
+            self.stdout.write("Таблица действующих ролей пересобрана")
+            return
+
+        raise CommandError("Найдены расхождения, для пересборки запустите с --fix или rebuild_effective_access")
+
+    def get_config_roles(self, server: Server, now) -> set[tuple[int, int]]:
+        """
+        Пары (Steam ID, роль) по источникам: эталон для server__generate_config,
+        который строит конфигурацию по таблице действующих ролей
+        """
+        roles: set[tuple[int, int]] = set()
+
+        for server_priv in server__get_active_privileges(server=server, now=now).select_related("privileged"):
+            for role in server_priv.roles.all():
+                if role.is_active:
+                    roles.add((server_priv.privileged.steam_id, role.pk))
+
+        for pack in server__get_active_packs(server=server, now=now):
+            steam_ids = set(SteamIDsSpec.scan(pack.steam_ids, check_duplicates=False).steam_ids)
+            for role in pack.roles.all():
+                if role.is_active:
+                    roles.update((steam_id, role.pk) for steam_id in steam_ids)
+
+        return roles
+
+    def report(self, title: str, rows: Counter) -> None:
+        if not rows:
+            return
+
+        self.stdout.write(f"{title}: {sum(rows.values())}")
+        for row, count in list(rows.items())[:MAX_REPORTED_ROWS]:
+            values = ", ".join(f"{field}={value}" for field, value in zip(ROW_FIELDS, row))
+            self.stdout.write(f"  {values}" + (f" (x{count})" if count > 1 else ""))
@@ -0,0 +1,68 @@
+import time
+
+from api.admin_actions import create_local_configs
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import close_old_connections
+from django.utils import timezone
+from server_admins.services.expiry import expiry__expire_due, expiry__get_scheduled_date, expiry__reschedule
+
+# Максимальный сон до ближайшей даты окончания полномочий, после него
+# перечитывается сохраненная дата, чтобы заметить более ранние даты
+# окончания, сохраненные в других процессах
+MAX_SLEEP_IN_SEC = 60
+
+# Интервал полного пересчета ближайшей даты, на случай если сохранение
+# прошло в обход сигналов
+RESCHEDULE_INTERVAL_IN_SEC = 5 * 60
+
+
+class Command(BaseCommand):
+    help = (
+        "Планировщик окончания полномочий, ждет ближайшую дату окончания полномочий, "
+        "деактивирует истекшие записи и обновляет локальные конфиги затронутых серверов"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--once", action="store_true", help="Обработать истекшие записи и завершиться")
+        parser.add_argument(
+            "--max-sleep",
+            type=float,
+            default=MAX_SLEEP_IN_SEC,
+            help="Максимальный сон до ближайшей даты окончания полномочий в секундах",
+        )
+
+    def handle(self, *args, **options):
+        next_reschedule = 0.0
+
+        try:
+            while True:
+                close_old_connections()
+
+                if time.monotonic() >= next_reschedule:
+                    next_date = expiry__reschedule()
+                    next_reschedule = time.monotonic() + RESCHEDULE_INTERVAL_IN_SEC
+                else:
+                    next_date = expiry__get_scheduled_date()
+
+                now = timezone.now()
+
+                if next_date is not None and next_date <= now:
+                    server_ids = expiry__expire_due(now=now)
+                    create_local_configs(server_ids=server_ids)
+
+                    self.stdout.write(f"Обработаны истекшие полномочия, обновлено серверов: {len(server_ids)}")
+
+                    next_reschedule = 0.0
+                    continue
+
+                if options["once"]:
+                    return
+
+                # Сон до ближайшей даты окончания, но не дольше max_sleep
+                sleep = options["max_sleep"]
+                if next_date is not None:
+                    sleep = min(sleep, (next_date - now).total_seconds())
+
+                time.sleep(sleep)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+from server_admins.models import EffectiveAccess
+from server_admins.services.effective_access import effective_access__rebuild
+
+
+class Command(BaseCommand):
+    help = "Полная пересборка таблицы действующих ролей по ролям на серверах и спискам пользователей"
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        effective_access__rebuild()
+
+        self.stdout.write(
+            f"Таблица действующих ролей пересобрана за {time.perf_counter() - start:.2f} с, "
+            f"записей: {EffectiveAccess.objects.count()}"
+        )
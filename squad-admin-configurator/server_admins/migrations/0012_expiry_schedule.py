@@ -0,0 +1,36 @@
+# Generated by Django 4.2.29 on 2026-10-19 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server_admins', '0011_alter_serverprivilegedpack_managers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpirySchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('next_date_of_end', models.DateTimeField(blank=True, null=True, verbose_name='Ближайшая дата окончания полномочий')),
+            ],
+            options={
+                'verbose_name': 'Расписание окончания полномочий',
+                'verbose_name_plural': 'Расписание окончания полномочий',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='privileged',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['date_of_end'], name='privileged_active_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serverprivileged',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['date_of_end'], name='srv_privileged_active_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serverprivilegedpack',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['date_of_end'], name='srv_pack_active_end_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.29 on 2026-10-19 16:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server_admins', '0012_expiry_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServerPrivilegedPackMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('steam_id', models.BigIntegerField(verbose_name='Steam ID')),
+                ('pack', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='server_admins.serverprivilegedpack', verbose_name='Список пользователей')),
+            ],
+            options={
+                'verbose_name': 'Steam ID из списка пользователей',
+                'verbose_name_plural': 'Steam ID из списков пользователей',
+                'indexes': [models.Index(fields=['steam_id'], name='pack_member_steam_id_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='serverprivilegedpackmember',
+            constraint=models.UniqueConstraint(fields=('pack', 'steam_id'), name='pack_member_unique_pack_steam_id'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.29 on 2026-10-19 16:52
+
+import re
+
+from django.db import migrations
+
+# Копия формата списка Steam ID из server_admins.steam_ids_parser на момент
+# миграции, чтобы дальнейшие изменения разбора не меняли ее результат
+STEAM_IDS_REGEX = re.compile(
+    r"[ \t]*(?:(?P<STEAMID>76\d{15})|(?P<COMMENT>#.*$)|(?P<NEWLINE>\r\n|\r|\n)|(?P<MISMATCH>.+))?",
+    re.M,
+)
+
+
+def get_steam_ids(text):
+    return {int(match.group("STEAMID")) for match in STEAM_IDS_REGEX.finditer(text) if match.lastgroup == "STEAMID"}
+
+
+def fill_pack_members(apps, schema_editor):
+    model_pack = apps.get_model("server_admins", "ServerPrivilegedPack")
+    model_pack_member = apps.get_model("server_admins", "ServerPrivilegedPackMember")
+
+    for pack in model_pack.objects.only("id", "steam_ids").iterator():
+        steam_ids = get_steam_ids(pack.steam_ids)
+
+        model_pack_member.objects.bulk_create(
+            [model_pack_member(pack_id=pack.id, steam_id=steam_id) for steam_id in steam_ids],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("server_admins", "0013_serverprivilegedpackmember"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_pack_members, migrations.RunPython.noop),
+    ]
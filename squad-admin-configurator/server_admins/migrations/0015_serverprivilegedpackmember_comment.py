@@ -0,0 +1,58 @@
+# Generated by Django 4.2.29 on 2026-10-19 16:52
+
+import re
+
+from django.db import migrations, models
+
+# Копия формата списка Steam ID из server_admins.steam_ids_parser на момент
+# миграции, чтобы дальнейшие изменения разбора не меняли ее результат
+STEAM_IDS_REGEX = re.compile(
+    r"[ \t]*(?:(?P<STEAMID>76\d{15})|(?P<COMMENT>#.*$)|(?P<NEWLINE>\r\n|\r|\n)|(?P<MISMATCH>.+))?",
+    re.M,
+)
+
+
+def get_comments(text):
+    """Первый комментарий после первого вхождения каждого Steam ID"""
+    occurrences = []
+    for match in STEAM_IDS_REGEX.finditer(text):
+        if match.lastgroup == "STEAMID":
+            occurrences.append([int(match.group("STEAMID")), None])
+        elif match.lastgroup == "COMMENT" and occurrences and occurrences[-1][1] is None:
+            occurrences[-1][1] = match.group("COMMENT")
+
+    comments = {}
+    for steam_id, comment in occurrences:
+        comments.setdefault(steam_id, comment or "")
+
+    return comments
+
+
+def fill_pack_members_comments(apps, schema_editor):
+    model_pack = apps.get_model("server_admins", "ServerPrivilegedPack")
+    model_pack_member = apps.get_model("server_admins", "ServerPrivilegedPackMember")
+
+    for pack in model_pack.objects.only("id", "steam_ids").iterator():
+        comments = get_comments(pack.steam_ids)
+
+        members = list(model_pack_member.objects.filter(pack_id=pack.id))
+        for member in members:
+            member.comment = comments.get(member.steam_id, "")
+
+        model_pack_member.objects.bulk_update(members, ["comment"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server_admins', '0014_fill_serverprivilegedpackmember'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serverprivilegedpackmember',
+            name='comment',
+            field=models.TextField(blank=True, help_text='Первый комментарий после Steam ID в списке', verbose_name='Комментарий'),
+        ),
+        migrations.RunPython(fill_pack_members_comments, migrations.RunPython.noop),
+    ]
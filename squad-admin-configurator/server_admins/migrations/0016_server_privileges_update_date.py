@@ -0,0 +1,19 @@
+# Generated by Django 4.2.29 on 2026-10-19 16:56
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server_admins', '0015_serverprivilegedpackmember_comment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='server',
+            name='privileges_update_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='Обновляется при любом изменении полномочий на сервере, по ней сбрасывается индекс разрешений', verbose_name='Дата изменения полномочий'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.29 on 2026-10-19 16:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server_admins', '0016_server_privileges_update_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EffectiveAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('steam_id', models.BigIntegerField(verbose_name='Steam ID')),
+                ('source', models.CharField(choices=[('direct', 'Роль на сервере'), ('pack', 'Список пользователей')], max_length=10, verbose_name='Источник')),
+                ('expires_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата окончания')),
+                ('pack', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='server_admins.serverprivilegedpack', verbose_name='Список пользователей')),
+                ('role', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='server_admins.role', verbose_name='Роль')),
+                ('server', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='server_admins.server', verbose_name='Сервер')),
+                ('server_privileged', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='server_admins.serverprivileged', verbose_name='Роль на сервере')),
+            ],
+            options={
+                'verbose_name': 'Действующая роль',
+                'verbose_name_plural': 'Действующие роли',
+                'indexes': [models.Index(fields=['steam_id'], name='effective_access_steam_id_idx'), models.Index(fields=['server', 'steam_id'], name='effective_access_server_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.29 on 2026-10-19 17:06
+
+from django.db import migrations, models
+
+
+def fill_update_date(apps, schema_editor):
+    for model_name in ("Privileged", "ServerPrivileged"):
+        model = apps.get_model("server_admins", model_name)
+        model.objects.update(update_date=models.F("creation_date"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server_admins', '0017_effective_access'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='privileged',
+            name='update_date',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Дата последнего изменения пользователя', verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='serverprivileged',
+            name='update_date',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Дата последнего изменения роли на сервере, включая изменение списка ролей', verbose_name='Дата изменения'),
+        ),
+        migrations.RunPython(fill_update_date, migrations.RunPython.noop),
+    ]
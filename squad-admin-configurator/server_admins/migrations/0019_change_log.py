@@ -0,0 +1,41 @@
+# Generated by Django 4.2.29 on 2026-10-19 17:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server_admins', '0018_update_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('seq', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Номер')),
+                ('model', models.CharField(choices=[('privileged', 'Пользователь'), ('server_privileged', 'Роль на сервере'), ('pack', 'Список пользователей'), ('pack_member', 'Steam ID из списка пользователей'), ('role', 'Роль'), ('permission', 'Разрешение')], max_length=20, verbose_name='Модель')),
+                ('object_id', models.BigIntegerField(help_text='Для Steam ID из списка - ID списка', verbose_name='ID записи')),
+                ('action', models.CharField(choices=[('create', 'Создание'), ('update', 'Изменение'), ('delete', 'Удаление')], max_length=10, verbose_name='Действие')),
+                ('steam_id', models.BigIntegerField(blank=True, help_text='Steam ID затронутого игрока', null=True, verbose_name='Steam ID')),
+                ('creation_date', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Запись журнала изменений',
+                'verbose_name_plural': 'Журнал изменений',
+                'ordering': ['seq'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChangeLogSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_seq', models.BigIntegerField(default=0, verbose_name='Последний выданный номер')),
+                ('compacted_seq', models.BigIntegerField(default=0, verbose_name='Последний удаленный номер')),
+            ],
+            options={
+                'verbose_name': 'Счетчик журнала изменений',
+                'verbose_name_plural': 'Счетчик журнала изменений',
+            },
+        ),
+    ]
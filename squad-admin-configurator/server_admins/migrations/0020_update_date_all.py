@@ -0,0 +1,40 @@
+# Generated by Django 4.2.29 on 2026-10-19 17:13
+
+from django.db import migrations, models
+
+
+def fill_update_date(apps, schema_editor):
+    # У серверов, ролей и разрешений нет даты добавления, остается дата миграции
+    model = apps.get_model("server_admins", "ServerPrivilegedPack")
+    model.objects.update(update_date=models.F("creation_date"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server_admins', '0019_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='permission',
+            name='update_date',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Дата последнего изменения разрешения', verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='role',
+            name='update_date',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Дата последнего изменения роли, включая изменение списка разрешений', verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='server',
+            name='update_date',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Дата последнего изменения сервера', verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='serverprivilegedpack',
+            name='update_date',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Дата последнего изменения списка, включая изменение серверов и ролей', verbose_name='Дата изменения'),
+        ),
+        migrations.RunPython(fill_update_date, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 
 from .steam_ids_parser import SteamIDsSpec
 
@@ -28,6 +29,17 @@ class Server(models.Model):
 
     description = models.CharField("Описание", help_text="Описание сервера", max_length=300, blank=True)
 
+    update_date = models.DateTimeField(
+        "Дата изменения", help_text="Дата последнего изменения сервера", auto_now=True, db_index=True
+    )
+
+    privileges_update_date = models.DateTimeField(
+        "Дата изменения полномочий",
+        help_text="Обновляется при любом изменении полномочий на сервере, по ней сбрасывается индекс разрешений",
+        default=timezone.now,
+        editable=False,
+    )
+
     privileged_accesses: "Manager[ServerPrivileged]"
     privileged_accesses_packs: "Manager[ServerPrivilegedPack]"
 
@@ -53,6 +65,9 @@ class Permission(models.Model):
         unique=True,
     )
     description = models.CharField("Описание", help_text="Описание игрового разрешения", max_length=300, blank=True)
+    update_date = models.DateTimeField(
+        "Дата изменения", help_text="Дата последнего изменения разрешения", auto_now=True, db_index=True
+    )
 
     def __str__(self) -> str:
         return self.title
@@ -81,6 +96,12 @@ class Role(models.Model):
         help_text="Набор разрешений который действует для этой роли",
     )
     description = models.CharField("Описание", help_text="Описание роли", max_length=300, blank=True)
+    update_date = models.DateTimeField(
+        "Дата изменения",
+        help_text="Дата последнего изменения роли, включая изменение списка разрешений",
+        auto_now=True,
+        db_index=True,
+    )
 
     privileged_accesses: "Manager[ServerPrivileged]"
 
@@ -111,6 +132,9 @@ class Privileged(models.Model):
     creation_date = models.DateTimeField(
         "Дата добавления", help_text="Дата добавления пользователя на сайт", auto_now_add=True
     )
+    update_date = models.DateTimeField(
+        "Дата изменения", help_text="Дата последнего изменения пользователя", auto_now=True, db_index=True
+    )
     date_of_end = models.DateTimeField(
         "Общая дата окончания полномочий",
         help_text="Дата после которой флаг 'Активирован' будет автоматически выключен",
@@ -126,6 +150,9 @@ class Privileged(models.Model):
     class Meta:
         verbose_name = "Пользователь"
         verbose_name_plural = "2. Пользователи"
+        indexes = [
+            models.Index(fields=["date_of_end"], condition=models.Q(is_active=True), name="privileged_active_end_idx"),
+        ]
 
     def clean(self) -> None:
         self.name = re.sub(r"\s", " ", self.name)
@@ -164,6 +191,12 @@ class ServerPrivileged(models.Model):
     creation_date = models.DateTimeField(
         "Дата добавления", help_text="Дата добавления роли на сервере", auto_now_add=True
     )
+    update_date = models.DateTimeField(
+        "Дата изменения",
+        help_text="Дата последнего изменения роли на сервере, включая изменение списка ролей",
+        auto_now=True,
+        db_index=True,
+    )
     date_of_end = models.DateTimeField(
         "Дата окончания роли",
         help_text="Дата после которой флаг 'Активирован' будет автоматически выключен",
@@ -179,6 +212,11 @@ class ServerPrivileged(models.Model):
     class Meta:
         verbose_name = "Роль на сервере"
         verbose_name_plural = "5. Роли пользователей на серверах"
+        indexes = [
+            models.Index(
+                fields=["date_of_end"], condition=models.Q(is_active=True), name="srv_privileged_active_end_idx"
+            ),
+        ]
 
 
 class ServerPrivilegedPack(models.Model):
@@ -225,6 +263,12 @@ class ServerPrivilegedPack(models.Model):
     creation_date = models.DateTimeField(
         "Дата добавления", help_text="Дата добавления списка на сайт", auto_now_add=True
     )
+    update_date = models.DateTimeField(
+        "Дата изменения",
+        help_text="Дата последнего изменения списка, включая изменение серверов и ролей",
+        auto_now=True,
+        db_index=True,
+    )
     date_of_end = models.DateTimeField(
         "Дата окончания действия",
         help_text="Дата после которой флаг 'Активирован' будет автоматически выключен",
@@ -240,6 +284,9 @@ class ServerPrivilegedPack(models.Model):
     class Meta:
         verbose_name = "Список пользователей"
         verbose_name_plural = "6. Списки пользователей"
+        indexes = [
+            models.Index(fields=["date_of_end"], condition=models.Q(is_active=True), name="srv_pack_active_end_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         self.full_clean()
@@ -249,13 +296,164 @@ class ServerPrivilegedPack(models.Model):
         if not self.is_active:
             return
 
-        nodes = SteamIDsSpec.parse(self.steam_ids)
-        errors = SteamIDsSpec.check_errors(nodes=nodes)
+        # Повторы Steam ID не ошибка, о них предупреждает админка после сохранения
+        errors = SteamIDsSpec.scan(self.steam_ids, max_ids=self.max_ids, check_duplicates=False).get_error_messages()
 
         if errors:
             raise ValidationError({"steam_ids": errors})
 
-        steam_ids = list(filter(lambda node: node.kind == SteamIDsSpec.STEAMID.name, nodes))
 
-        if self.max_ids > 0 and len(steam_ids) > self.max_ids:
-            raise ValidationError({"steam_ids": [f"Максимальное количество ID - {self.max_ids}"]})
+class ServerPrivilegedPackMember(models.Model):
+    """
+    Steam ID из списка пользователей, синхронизируется с текстом списка
+    при сохранении: добавляются, удаляются и обновляются только
+    изменившиеся Steam ID
+    """
+
+    pack = models.ForeignKey(
+        ServerPrivilegedPack, on_delete=models.CASCADE, verbose_name="Список пользователей", related_name="members"
+    )
+    steam_id = models.BigIntegerField("Steam ID")
+    comment = models.TextField("Комментарий", help_text="Первый комментарий после Steam ID в списке", blank=True)
+
+    class Meta:
+        verbose_name = "Steam ID из списка пользователей"
+        verbose_name_plural = "Steam ID из списков пользователей"
+        constraints = [
+            models.UniqueConstraint(fields=["pack", "steam_id"], name="pack_member_unique_pack_steam_id"),
+        ]
+        indexes = [
+            models.Index(fields=["steam_id"], name="pack_member_steam_id_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return str(self.steam_id)
+
+
+class EffectiveAccess(models.Model):
+    """
+    Роль, которая действует у Steam ID на сервере, с источником выдачи:
+    роль пользователя на сервере или список пользователей
+
+    Производная таблица, поддерживается сигналами при изменении источников,
+    содержит только выдачи с активными источником, пользователем, ролью и
+    сервером, истечение проверяется по expires_at при чтении. Пересобирается
+    командой rebuild_effective_access, сверяется check_effective_access
+    """
+
+    DIRECT = "direct"
+    PACK = "pack"
+    SOURCE_CHOICES = ((DIRECT, "Роль на сервере"), (PACK, "Список пользователей"))
+
+    server = models.ForeignKey(Server, on_delete=models.CASCADE, verbose_name="Сервер", related_name="+")
+    steam_id = models.BigIntegerField("Steam ID")
+    role = models.ForeignKey(Role, on_delete=models.CASCADE, verbose_name="Роль", related_name="+")
+    source = models.CharField("Источник", max_length=10, choices=SOURCE_CHOICES)
+    server_privileged = models.ForeignKey(
+        ServerPrivileged,
+        on_delete=models.CASCADE,
+        verbose_name="Роль на сервере",
+        related_name="+",
+        blank=True,
+        null=True,
+    )
+    pack = models.ForeignKey(
+        ServerPrivilegedPack,
+        on_delete=models.CASCADE,
+        verbose_name="Список пользователей",
+        related_name="+",
+        blank=True,
+        null=True,
+    )
+    expires_at = models.DateTimeField("Дата окончания", blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Действующая роль"
+        verbose_name_plural = "Действующие роли"
+        indexes = [
+            models.Index(fields=["steam_id"], name="effective_access_steam_id_idx"),
+            models.Index(fields=["server", "steam_id"], name="effective_access_server_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.steam_id} - {self.role_id}"
+
+
+class ExpirySchedule(models.Model):
+    """
+    Ближайшая дата окончания полномочий среди активных пользователей, ролей
+    на серверах и списков пользователей, хранится в единственной записи
+
+    Обновляется сигналами при сохранении и пересчитывается планировщиком
+    окончания полномочий (manage.py expiry_scheduler)
+    """
+
+    next_date_of_end = models.DateTimeField("Ближайшая дата окончания полномочий", blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Расписание окончания полномочий"
+        verbose_name_plural = "Расписание окончания полномочий"
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Запись журнала изменений полномочий: создание, изменение или удаление
+    пользователя, роли на сервере, списка пользователей, Steam ID в списке,
+    роли или разрешения
+
+    Номера seq выдаются по возрастанию в порядке фиксации транзакций, поэтому
+    клиент может читать журнал частями с последнего прочитанного номера, не
+    пропуская записей. Пишется сигналами в транзакции изменения, старые
+    записи удаляются планировщиком
+    """
+
+    PRIVILEGED = "privileged"
+    SERVER_PRIVILEGED = "server_privileged"
+    PACK = "pack"
+    PACK_MEMBER = "pack_member"
+    ROLE = "role"
+    PERMISSION = "permission"
+    MODEL_CHOICES = (
+        (PRIVILEGED, "Пользователь"),
+        (SERVER_PRIVILEGED, "Роль на сервере"),
+        (PACK, "Список пользователей"),
+        (PACK_MEMBER, "Steam ID из списка пользователей"),
+        (ROLE, "Роль"),
+        (PERMISSION, "Разрешение"),
+    )
+
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    ACTION_CHOICES = ((CREATE, "Создание"), (UPDATE, "Изменение"), (DELETE, "Удаление"))
+
+    seq = models.BigIntegerField("Номер", primary_key=True)
+    model = models.CharField("Модель", max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField("ID записи", help_text="Для Steam ID из списка - ID списка")
+    action = models.CharField("Действие", max_length=10, choices=ACTION_CHOICES)
+    steam_id = models.BigIntegerField("Steam ID", help_text="Steam ID затронутого игрока", blank=True, null=True)
+    creation_date = models.DateTimeField("Дата изменения", auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Запись журнала изменений"
+        verbose_name_plural = "Журнал изменений"
+        ordering = ["seq"]
+
+    def __str__(self) -> str:
+        return f"{self.seq} {self.model} {self.object_id} {self.action}"
+
+
+class ChangeLogSequence(models.Model):
+    """
+    Счетчик номеров журнала изменений в единственной записи, блокируется на
+    время транзакции, записывающей журнал
+
+    compacted_seq - записи с номером не больше этого удалены при очистке
+    """
+
+    last_seq = models.BigIntegerField("Последний выданный номер", default=0)
+    compacted_seq = models.BigIntegerField("Последний удаленный номер", default=0)
+
+    class Meta:
+        verbose_name = "Счетчик журнала изменений"
+        verbose_name_plural = "Счетчик журнала изменений"
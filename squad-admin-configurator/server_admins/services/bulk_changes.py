@@ -0,0 +1,17 @@
+from collections.abc import Collection, Iterable
+
+from django.utils import timezone
+from server_admins.models import Server
+from server_admins.services.player_access import player__invalidate_access
+
+
+def bulk_changes__apply(*, server_ids: Collection[int], steam_ids: Iterable[int]) -> None:
+    """
+    Массовые вставки и обновления проходят в обход сигналов: обновляет
+    дату изменения полномочий затронутых серверов и сбрасывает кеш
+    полномочий игроков
+    """
+    if server_ids:
+        Server.objects.filter(pk__in=server_ids).update(privileges_update_date=timezone.now())
+
+    player__invalidate_access(steam_ids=steam_ids)
@@ -0,0 +1,111 @@
+from collections.abc import Collection
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from server_admins.models import ChangeLogEntry, ChangeLogSequence
+
+CHANGE_LOG_SEQUENCE_PK = 1
+
+BATCH_SIZE = 1000
+
+
+class ChangeLogCompactedError(Exception):
+    """Запрошенные записи журнала уже удалены при очистке"""
+
+    def __init__(self, *, compacted_seq: int, last_seq: int) -> None:
+        super().__init__(f"Записи журнала до {compacted_seq} включительно удалены")
+        self.compacted_seq = compacted_seq
+        self.last_seq = last_seq
+
+
+def change_log__record(*, model: str, action: str, changes: Collection[tuple[int, int | None]]) -> None:
+    """
+    Нумерует и сохраняет записи журнала в текущей транзакции, changes - пары
+    ID записи и Steam ID затронутого игрока. Записи фиксируются вместе с
+    изменением, только если оно само идет в транзакции: изменения через API и
+    админ панель выполняются в транзакции запроса
+
+    Счетчик номеров блокируется до конца внешней транзакции, параллельные
+    изменения ждут ее фиксации, поэтому записи с меньшими номерами всегда
+    становятся видны раньше записей с большими
+    """
+    if not changes:
+        return
+
+    with transaction.atomic():
+        sequence, _ = ChangeLogSequence.objects.select_for_update().get_or_create(pk=CHANGE_LOG_SEQUENCE_PK)
+
+        ChangeLogEntry.objects.bulk_create(
+            (
+                ChangeLogEntry(seq=seq, model=model, object_id=object_id, action=action, steam_id=steam_id)
+                for seq, (object_id, steam_id) in enumerate(changes, start=sequence.last_seq + 1)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+        sequence.last_seq += len(changes)
+        sequence.save(update_fields=["last_seq"])
+
+
+def change_log__get_since(*, since: int, limit: int) -> tuple[list[ChangeLogEntry], bool, int]:
+    """
+    Записи журнала с номером больше since, не больше limit штук, есть ли
+    записи после них и номер последней записи журнала
+
+    Если часть записей после since уже удалена, вызывает ChangeLogCompactedError,
+    клиенту нужно заново загрузить полномочия целиком
+    """
+    entries = list(ChangeLogEntry.objects.filter(seq__gt=since).order_by("seq")[: limit + 1])
+
+    # Номера обновляются вместе с записями и до их удаления, поэтому читаются
+    # после записей: последний номер не меньше прочитанных, а удаление,
+    # попавшее в выборку, уже видно по номеру очистки
+    last_seq, compacted_seq = change_log__get_sequence()
+    if since < compacted_seq:
+        raise ChangeLogCompactedError(compacted_seq=compacted_seq, last_seq=last_seq)
+
+    return entries[:limit], len(entries) > limit, last_seq
+
+
+def change_log__get_sequence() -> tuple[int, int]:
+    """Номер последней записи журнала и номер, до которого записи удалены"""
+    return ChangeLogSequence.objects.filter(pk=CHANGE_LOG_SEQUENCE_PK).values_list(
+        "last_seq", "compacted_seq"
+    ).first() or (0, 0)
+
+
+def change_log__compact(*, older_than_days: int) -> int:
+    """
+    Удаление записей журнала старше older_than_days дней пачками, 0 - не удалять
+
+    Возвращает количество удаленных записей
+    """
+    if older_than_days <= 0:
+        return 0
+
+    border_seq = ChangeLogEntry.objects.filter(
+        creation_date__lt=timezone.now() - timedelta(days=older_than_days)
+    ).aggregate(border_seq=Max("seq"))["border_seq"]
+
+    if border_seq is None:
+        return 0
+
+    ChangeLogSequence.objects.filter(pk=CHANGE_LOG_SEQUENCE_PK, compacted_seq__lt=border_seq).update(
+        compacted_seq=border_seq
+    )
+
+    deleted = 0
+    while True:
+        batch_seqs = list(
+            ChangeLogEntry.objects.filter(seq__lte=border_seq)
+            .order_by("seq")
+            .values_list("seq", flat=True)[:BATCH_SIZE]
+        )
+
+        if not batch_seqs:
+            return deleted
+
+        batch_deleted, _ = ChangeLogEntry.objects.filter(seq__in=batch_seqs).delete()
+        deleted += batch_deleted
@@ -0,0 +1,278 @@
+from collections import Counter, defaultdict
+from collections.abc import Collection, Iterator
+
+from django.db import transaction
+from django.db.models import Q
+from server_admins.models import (
+    EffectiveAccess,
+    Role,
+    Server,
+    ServerPrivileged,
+    ServerPrivilegedPack,
+    ServerPrivilegedPackMember,
+)
+
+BATCH_SIZE = 1000
+
+# Поля, по которым сравниваются ожидаемые и сохраненные записи
+ROW_FIELDS = ("server_id", "steam_id", "role_id", "source", "server_privileged_id", "pack_id", "expires_at")
+
+
+def effective_access__sync_direct(
+    *,
+    server_privileged_ids: Collection[int] | None = None,
+    privileged_ids: Collection[int] | None = None,
+    server_ids: Collection[int] | None = None,
+    role_ids: Collection[int] | None = None,
+) -> None:
+    """
+    Пересчитывает записи ролей пользователей на серверах, попадающие под все
+    переданные ограничения, без ограничений - все записи этого источника
+    """
+    stored = Q(source=EffectiveAccess.DIRECT)
+    if server_privileged_ids is not None:
+        stored &= Q(server_privileged_id__in=server_privileged_ids)
+    if privileged_ids is not None:
+        stored &= Q(server_privileged__privileged_id__in=privileged_ids)
+    if server_ids is not None:
+        stored &= Q(server_id__in=server_ids)
+    if role_ids is not None:
+        stored &= Q(role_id__in=role_ids)
+
+    with transaction.atomic():
+        EffectiveAccess.objects.filter(stored).delete()
+        EffectiveAccess.objects.bulk_create(
+            _iter_direct_rows(
+                server_privileged_ids=server_privileged_ids,
+                privileged_ids=privileged_ids,
+                server_ids=server_ids,
+                role_ids=role_ids,
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+
+def effective_access__sync_packs(
+    *,
+    pack_ids: Collection[int] | None = None,
+    server_ids: Collection[int] | None = None,
+    role_ids: Collection[int] | None = None,
+    steam_ids: Collection[int] | None = None,
+) -> None:
+    """
+    Пересчитывает записи списков пользователей, попадающие под все переданные
+    ограничения, без ограничений - все записи этого источника
+    """
+    if steam_ids is not None and len(steam_ids) > BATCH_SIZE:
+        steam_ids = list(steam_ids)
+        for start in range(0, len(steam_ids), BATCH_SIZE):
+            effective_access__sync_packs(
+                pack_ids=pack_ids,
+                server_ids=server_ids,
+                role_ids=role_ids,
+                steam_ids=steam_ids[start : start + BATCH_SIZE],
+            )
+        return
+
+    with transaction.atomic():
+        EffectiveAccess.objects.filter(
+            _get_packs_filter(pack_ids=pack_ids, server_ids=server_ids, role_ids=role_ids, steam_ids=steam_ids)
+        ).delete()
+        EffectiveAccess.objects.bulk_create(
+            _iter_pack_rows(pack_ids=pack_ids, server_ids=server_ids, role_ids=role_ids, steam_ids=steam_ids),
+            batch_size=BATCH_SIZE,
+        )
+
+
+def effective_access__remove_pack_members(
+    *, pack_id: int, server_ids: Collection[int], steam_ids: Collection[int]
+) -> None:
+    """
+    Удаляет записи списка пользователей без пересчета, вызывается и до
+    фактического удаления связей, например перед очисткой серверов списка
+    """
+    steam_ids = list(steam_ids)
+    for start in range(0, len(steam_ids), BATCH_SIZE):
+        batch = steam_ids[start : start + BATCH_SIZE]
+        EffectiveAccess.objects.filter(
+            _get_packs_filter(pack_ids=[pack_id], server_ids=server_ids, steam_ids=batch)
+        ).delete()
+
+
+def effective_access__update_pack(*, pack: ServerPrivilegedPack) -> None:
+    """
+    Применяет к записям списка изменения его собственных полей, состав,
+    сервера и роли пересчитываются отдельно при их изменении
+    """
+    if not pack.is_active:
+        EffectiveAccess.objects.filter(pack=pack).delete()
+        return
+
+    if EffectiveAccess.objects.filter(pack=pack).exists():
+        EffectiveAccess.objects.filter(pack=pack).update(expires_at=pack.date_of_end)
+    else:
+        # Список только что активирован или у него еще нет записей
+        effective_access__sync_packs(pack_ids=[pack.pk])
+
+
+def effective_access__update_role(*, role: Role) -> None:
+    """Записи роли зависят только от ее активности"""
+    if not role.is_active:
+        EffectiveAccess.objects.filter(role=role).delete()
+    elif not EffectiveAccess.objects.filter(role=role).exists():
+        effective_access__sync_direct(role_ids=[role.pk])
+        effective_access__sync_packs(role_ids=[role.pk])
+
+
+def effective_access__update_server(*, server: Server) -> None:
+    """Записи сервера зависят только от его активности"""
+    if not server.is_active:
+        EffectiveAccess.objects.filter(server=server).delete()
+    elif not EffectiveAccess.objects.filter(server=server).exists():
+        effective_access__sync_direct(server_ids=[server.pk])
+        effective_access__sync_packs(server_ids=[server.pk])
+
+
+def effective_access__rebuild() -> None:
+    with transaction.atomic():
+        effective_access__sync_direct()
+        effective_access__sync_packs()
+
+
+def effective_access__check() -> tuple[Counter, Counter]:
+    """
+    Сверка таблицы с пересчетом по источникам
+
+    Возвращает недостающие и лишние записи, кортежи значений ROW_FIELDS
+    """
+    expected = Counter(_get_row_key(row) for row in _iter_direct_rows())
+    expected.update(_get_row_key(row) for row in _iter_pack_rows())
+
+    stored = Counter(EffectiveAccess.objects.values_list(*ROW_FIELDS).iterator())
+
+    return expected - stored, stored - expected
+
+
+def _get_row_key(row: EffectiveAccess) -> tuple:
+    return tuple(getattr(row, field) for field in ROW_FIELDS)
+
+
+def _get_packs_filter(
+    *,
+    pack_ids: Collection[int] | None = None,
+    server_ids: Collection[int] | None = None,
+    role_ids: Collection[int] | None = None,
+    steam_ids: Collection[int] | None = None,
+) -> Q:
+    stored = Q(source=EffectiveAccess.PACK)
+    if pack_ids is not None:
+        stored &= Q(pack_id__in=pack_ids)
+    if server_ids is not None:
+        stored &= Q(server_id__in=server_ids)
+    if role_ids is not None:
+        stored &= Q(role_id__in=role_ids)
+    if steam_ids is not None:
+        stored &= Q(steam_id__in=steam_ids)
+
+    return stored
+
+
+def _iter_direct_rows(
+    *,
+    server_privileged_ids: Collection[int] | None = None,
+    privileged_ids: Collection[int] | None = None,
+    server_ids: Collection[int] | None = None,
+    role_ids: Collection[int] | None = None,
+) -> Iterator[EffectiveAccess]:
+    grants = ServerPrivileged.roles.through.objects.filter(
+        serverprivileged__is_active=True,
+        serverprivileged__privileged__is_active=True,
+        serverprivileged__server__is_active=True,
+        role__is_active=True,
+    )
+    if server_privileged_ids is not None:
+        grants = grants.filter(serverprivileged_id__in=server_privileged_ids)
+    if privileged_ids is not None:
+        grants = grants.filter(serverprivileged__privileged_id__in=privileged_ids)
+    if server_ids is not None:
+        grants = grants.filter(serverprivileged__server_id__in=server_ids)
+    if role_ids is not None:
+        grants = grants.filter(role_id__in=role_ids)
+
+    rows = grants.values_list(
+        "serverprivileged_id",
+        "serverprivileged__server_id",
+        "serverprivileged__privileged__steam_id",
+        "role_id",
+        "serverprivileged__date_of_end",
+        "serverprivileged__privileged__date_of_end",
+    )
+
+    for server_privileged_id, server_id, steam_id, role_id, date_of_end, privileged_date_of_end in rows.iterator():
+        yield EffectiveAccess(
+            server_id=server_id,
+            steam_id=steam_id,
+            role_id=role_id,
+            source=EffectiveAccess.DIRECT,
+            server_privileged_id=server_privileged_id,
+            expires_at=min((date for date in (date_of_end, privileged_date_of_end) if date), default=None),
+        )
+
+
+def _iter_pack_rows(
+    *,
+    pack_ids: Collection[int] | None = None,
+    server_ids: Collection[int] | None = None,
+    role_ids: Collection[int] | None = None,
+    steam_ids: Collection[int] | None = None,
+) -> Iterator[EffectiveAccess]:
+    """
+    Записи собираются из трех запросов: роли и сервера активных списков
+    и их участники, без перемножения таблиц в базе
+    """
+    pack_roles = ServerPrivilegedPack.roles.through.objects.filter(
+        serverprivilegedpack__is_active=True, role__is_active=True
+    )
+    pack_servers = ServerPrivilegedPack.servers.through.objects.filter(
+        serverprivilegedpack__is_active=True, server__is_active=True
+    )
+    if pack_ids is not None:
+        pack_roles = pack_roles.filter(serverprivilegedpack_id__in=pack_ids)
+        pack_servers = pack_servers.filter(serverprivilegedpack_id__in=pack_ids)
+    if server_ids is not None:
+        pack_servers = pack_servers.filter(server_id__in=server_ids)
+    if role_ids is not None:
+        pack_roles = pack_roles.filter(role_id__in=role_ids)
+
+    roles: defaultdict[int, list[int]] = defaultdict(list)
+    dates_of_end = {}
+    for pack_id, role_id, date_of_end in pack_roles.values_list(
+        "serverprivilegedpack_id", "role_id", "serverprivilegedpack__date_of_end"
+    ):
+        roles[pack_id].append(role_id)
+        dates_of_end[pack_id] = date_of_end
+
+    servers: defaultdict[int, list[int]] = defaultdict(list)
+    for pack_id, server_id in pack_servers.filter(serverprivilegedpack_id__in=list(roles)).values_list(
+        "serverprivilegedpack_id", "server_id"
+    ):
+        servers[pack_id].append(server_id)
+
+    if not servers:
+        return
+
+    members = ServerPrivilegedPackMember.objects.filter(pack_id__in=list(servers))
+    if steam_ids is not None:
+        members = members.filter(steam_id__in=steam_ids)
+
+    for pack_id, steam_id in members.values_list("pack_id", "steam_id").iterator():
+        for server_id in servers[pack_id]:
+            for role_id in roles[pack_id]:
+                yield EffectiveAccess(
+                    server_id=server_id,
+                    steam_id=steam_id,
+                    role_id=role_id,
+                    source=EffectiveAccess.PACK,
+                    pack_id=pack_id,
+                    expires_at=dates_of_end[pack_id],
+                )
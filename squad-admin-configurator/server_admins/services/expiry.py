@@ -0,0 +1,188 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+from notifications.services.discord_notification import discord_notification__enqueue
+from server_admins.models import ChangeLogEntry, ExpirySchedule, Privileged, ServerPrivileged, ServerPrivilegedPack
+from server_admins.services.bulk_changes import bulk_changes__apply
+from server_admins.services.change_log import change_log__record
+from server_admins.services.effective_access import effective_access__sync_direct, effective_access__sync_packs
+from utils import reverse_to_admin_edit
+
+EXPIRED_PRIVILEGED_CHAT = settings.DISCORD["EXPIRED_PRIVILEGED_CHAT"]
+
+EXPIRY_SCHEDULE_PK = 1
+
+
+def expiry__get_next_date_of_end() -> datetime | None:
+    """
+    Ближайшая дата окончания полномочий по всем активным записям, каждая
+    выборка - поиск минимума по частичному индексу
+    """
+    dates = [
+        model.objects.filter(is_active=True).aggregate(next_date=Min("date_of_end"))["next_date"]
+        for model in (Privileged, ServerPrivileged, ServerPrivilegedPack)
+    ]
+
+    return min((date for date in dates if date is not None), default=None)
+
+
+def expiry__get_scheduled_date() -> datetime | None:
+    return ExpirySchedule.objects.filter(pk=EXPIRY_SCHEDULE_PK).values_list("next_date_of_end", flat=True).first()
+
+
+def expiry__reschedule() -> datetime | None:
+    """
+    Пересчет ближайшей даты окончания полномочий по данным в базе
+    """
+    next_date = expiry__get_next_date_of_end()
+
+    ExpirySchedule.objects.update_or_create(pk=EXPIRY_SCHEDULE_PK, defaults={"next_date_of_end": next_date})
+
+    return next_date
+
+
+def expiry__schedule(*, date_of_end: datetime) -> None:
+    """
+    Сдвигает ближайшую дату окончания полномочий, если переданная дата
+    наступит раньше, вызывается при сохранении записей с датой окончания
+    """
+    ExpirySchedule.objects.filter(
+        Q(next_date_of_end__isnull=True) | Q(next_date_of_end__gt=date_of_end),
+        pk=EXPIRY_SCHEDULE_PK,
+    ).update(next_date_of_end=date_of_end)
+
+
+def expiry__expire_due(*, now: datetime | None = None) -> set[int]:
+    """
+    Деактивирует все записи у которых наступила дата окончания полномочий,
+    массовыми обновлениями, и ставит в очередь уведомления о них
+
+    Возвращает ID серверов, конфигурация которых изменилась
+    """
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        server_privileges = list(
+            ServerPrivileged.objects.filter(is_active=True, date_of_end__lte=now)
+            .select_related("server", "privileged")
+            .prefetch_related("roles")
+        )
+        privileges = list(
+            Privileged.objects.filter(is_active=True, date_of_end__lte=now).prefetch_related(
+                "server_accesses__roles", "server_accesses__server"
+            )
+        )
+        server_packs = list(
+            ServerPrivilegedPack.objects.filter(is_active=True, date_of_end__lte=now).prefetch_related(
+                "roles", "servers", "members"
+            )
+        )
+
+        ServerPrivileged.objects.filter(pk__in=[server_priv.pk for server_priv in server_privileges]).update(
+            is_active=False, update_date=now
+        )
+        Privileged.objects.filter(pk__in=[priv.pk for priv in privileges]).update(is_active=False, update_date=now)
+        ServerPrivilegedPack.objects.filter(pk__in=[pack.pk for pack in server_packs]).update(
+            is_active=False, update_date=now
+        )
+
+        # Массовые обновления проходят в обход сигналов
+        effective_access__sync_direct(server_privileged_ids=[server_priv.pk for server_priv in server_privileges])
+        effective_access__sync_direct(privileged_ids=[priv.pk for priv in privileges])
+        effective_access__sync_packs(pack_ids=[pack.pk for pack in server_packs])
+
+        affected_servers = {server_priv.server_id for server_priv in server_privileges}
+        steam_ids = {server_priv.privileged.steam_id for server_priv in server_privileges}
+
+        for priv in privileges:
+            affected_servers.update(access.server_id for access in priv.server_accesses.all() if access.is_active)
+            steam_ids.add(priv.steam_id)
+
+        for pack in server_packs:
+            affected_servers.update(server.pk for server in pack.servers.all())
+            steam_ids.update(member.steam_id for member in pack.members.all())
+
+        bulk_changes__apply(server_ids=affected_servers, steam_ids=steam_ids)
+
+        change_log__record(
+            model=ChangeLogEntry.SERVER_PRIVILEGED,
+            action=ChangeLogEntry.UPDATE,
+            changes=[(server_priv.pk, server_priv.privileged.steam_id) for server_priv in server_privileges],
+        )
+        change_log__record(
+            model=ChangeLogEntry.PRIVILEGED,
+            action=ChangeLogEntry.UPDATE,
+            changes=[(priv.pk, priv.steam_id) for priv in privileges],
+        )
+        change_log__record(
+            model=ChangeLogEntry.PACK, action=ChangeLogEntry.UPDATE, changes=[(pack.pk, None) for pack in server_packs]
+        )
+
+        if EXPIRED_PRIVILEGED_CHAT["ENABLE"]:
+            messages = (
+                _server_privileges_messages(server_privileges)
+                + _privileges_messages(privileges)
+                + _server_packs_messages(server_packs)
+            )
+
+            if messages:
+                discord_notification__enqueue(
+                    webhook_uri=EXPIRED_PRIVILEGED_CHAT["CHAT_WEBHOOK"], username="Админ панель", messages=messages
+                )
+
+    return affected_servers
+
+
+def _server_privileges_messages(server_privileges: list[ServerPrivileged]) -> list[str]:
+    messages: list[str] = []
+    for server_priv in server_privileges:
+        roles_text: str = ", ".join([role.title for role in server_priv.roles.all()])
+
+        messages.append(
+            f"{settings.BASE_URL}"
+            f"{reverse_to_admin_edit(server_priv.privileged)}\n"
+            f"{server_priv.privileged.name} - "
+            f"{server_priv.privileged.steam_id}\n"
+            "Истекли полномочия на сервере:\n"
+            f"{server_priv.server.title} - {roles_text}"
+        )
+
+    return messages
+
+
+def _privileges_messages(privileges: list[Privileged]) -> list[str]:
+    messages: list[str] = []
+    for priv in privileges:
+        all_roles_text = []
+        for server_roles in priv.server_accesses.all():
+            roles_text = ", ".join([role.title for role in server_roles.roles.all()])
+
+            all_roles_text.append(f"{server_roles.server.title} - {roles_text};")
+
+        messages.append(
+            f"{settings.BASE_URL}{reverse_to_admin_edit(priv)}\n"
+            f"{priv.name} - {priv.steam_id}\n"
+            "Истекли все полномочия:\n" + " ".join(all_roles_text)
+        )
+
+    return messages
+
+
+def _server_packs_messages(server_packs: list[ServerPrivilegedPack]) -> list[str]:
+    messages: list[str] = []
+    for pack in server_packs:
+        roles_text: str = ", ".join([role.title for role in pack.roles.all()])
+        servers_text: str = ", ".join([server.title for server in pack.servers.all()])
+
+        messages.append(
+            f"{settings.BASE_URL}"
+            f"{reverse_to_admin_edit(pack)}\n"
+            f"Пак {pack.title}\n"
+            "Истекли полномочия на серверах:\n"
+            f"{servers_text} - {roles_text}"
+        )
+
+    return messages
@@ -0,0 +1,67 @@
+from django.db import transaction
+from server_admins.models import ServerPrivilegedPack, ServerPrivilegedPackMember
+from server_admins.steam_ids_parser import SteamIDsSpec
+
+BATCH_SIZE = 1000
+
+
+def server_privileged_pack__sync_members(*, pack: ServerPrivilegedPack) -> tuple[set[int], set[int]]:
+    """
+    Приводит Steam ID списка пользователей в базе к тексту списка, вставляет
+    и удаляет только разницу между старым и новым множеством
+
+    Комментарии обновляются только у Steam ID, у которых они изменились.
+    Возвращает добавленные и удаленные Steam ID
+    """
+    new_comments = server_privileged_pack__parse_members(steam_ids=pack.steam_ids)
+
+    with transaction.atomic():
+        old_comments = dict(ServerPrivilegedPackMember.objects.filter(pack=pack).values_list("steam_id", "comment"))
+
+        added = new_comments.keys() - old_comments.keys()
+        removed = old_comments.keys() - new_comments.keys()
+        changed = {
+            steam_id
+            for steam_id in new_comments.keys() & old_comments.keys()
+            if new_comments[steam_id] != old_comments[steam_id]
+        }
+
+        removed_list = list(removed)
+        for start in range(0, len(removed_list), BATCH_SIZE):
+            ServerPrivilegedPackMember.objects.filter(
+                pack=pack, steam_id__in=removed_list[start : start + BATCH_SIZE]
+            ).delete()
+
+        if added:
+            ServerPrivilegedPackMember.objects.bulk_create(
+                [
+                    ServerPrivilegedPackMember(pack=pack, steam_id=steam_id, comment=new_comments[steam_id])
+                    for steam_id in added
+                ],
+                batch_size=BATCH_SIZE,
+            )
+
+        if changed:
+            members = list(ServerPrivilegedPackMember.objects.filter(pack=pack, steam_id__in=changed))
+            for member in members:
+                member.comment = new_comments[member.steam_id]
+
+            ServerPrivilegedPackMember.objects.bulk_update(members, ["comment"], batch_size=BATCH_SIZE)
+
+    return added, removed
+
+
+def server_privileged_pack__parse_members(*, steam_ids: str) -> dict[int, str]:
+    """Steam ID списка с первым комментарием после первого вхождения"""
+    parsed = SteamIDsSpec.scan(steam_ids, with_comments=True, check_duplicates=False)
+
+    members: dict[int, str] = {}
+    for index, steam_id in enumerate(parsed.steam_ids):
+        if steam_id not in members:
+            members[steam_id] = parsed.comments.get(index, "")
+
+    return members
+
+
+def server_privileged_pack__get_members(*, pack_id: int) -> set[int]:
+    return set(ServerPrivilegedPackMember.objects.filter(pack_id=pack_id).values_list("steam_id", flat=True))
@@ -0,0 +1,84 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+from server_admins.models import EffectiveAccess, Role, Server
+
+
+@dataclass(frozen=True, slots=True)
+class ServerPermissionsIndex:
+    """
+    Разрешения каждого Steam ID на сервере по тем же правилам, что и
+    конфигурация администраторов сервера, по таблице действующих ролей
+
+    expiry_date - ближайшая дата окончания полномочий среди вошедших в индекс,
+    после нее индекс нужно построить заново
+    """
+
+    permissions: dict[int, frozenset[str]]
+    expiry_date: datetime | None
+
+    def get(self, steam_id: int) -> frozenset[str]:
+        return self.permissions.get(steam_id, frozenset())
+
+
+# server_id -> ((privileges_update_date, is_active), индекс), у каждого процесса
+# свой кеш, устаревший индекс определяется по дате изменения полномочий на сервере
+_indexes: dict[int, tuple[tuple[datetime, bool], ServerPermissionsIndex]] = {}
+
+
+def server__get_permissions_index(*, server: Server, now: datetime | None = None) -> ServerPermissionsIndex:
+    now = now or timezone.now()
+
+    version = (server.privileges_update_date, server.is_active)
+
+    cached = _indexes.get(server.pk)
+    if cached is not None and cached[0] == version and (cached[1].expiry_date is None or cached[1].expiry_date >= now):
+        return cached[1]
+
+    index = server__build_permissions_index(server=server, now=now)
+    _indexes[server.pk] = (version, index)
+
+    return index
+
+
+def server__get_players_permissions(*, server: Server, steam_ids: Iterable[int]) -> dict[int, frozenset[str]]:
+    index = server__get_permissions_index(server=server)
+    return {steam_id: index.get(steam_id) for steam_id in steam_ids}
+
+
+def server__build_permissions_index(*, server: Server, now: datetime) -> ServerPermissionsIndex:
+    """Индекс строится просмотром таблицы действующих ролей по индексу сервера"""
+    if not server.is_active:
+        return ServerPermissionsIndex(permissions={}, expiry_date=None)
+
+    rows = list(
+        EffectiveAccess.objects.filter(Q(expires_at__gte=now) | Q(expires_at=None), server=server).values_list(
+            "steam_id", "role_id", "expires_at"
+        )
+    )
+
+    roles_permissions: defaultdict[int, set[str]] = defaultdict(set)
+    for role_id, title in Role.permissions.through.objects.filter(role_id__in={row[1] for row in rows}).values_list(
+        "role_id", "permission__title"
+    ):
+        roles_permissions[role_id].add(title)
+
+    permissions: defaultdict[int, set[str]] = defaultdict(set)
+    dates_of_end: list[datetime] = []
+
+    for steam_id, role_id, expires_at in rows:
+        if role_id not in roles_permissions:
+            continue
+
+        permissions[steam_id].update(roles_permissions[role_id])
+        if expires_at is not None:
+            dates_of_end.append(expires_at)
+
+    return ServerPermissionsIndex(
+        permissions={steam_id: frozenset(titles) for steam_id, titles in permissions.items()},
+        expiry_date=min(dates_of_end, default=None),
+    )
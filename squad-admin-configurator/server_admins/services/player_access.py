@@ -0,0 +1,142 @@
+import time
+from collections.abc import Iterable
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from server_admins.models import EffectiveAccess, Role
+
+# Верхняя граница жизни записи в кеше, изменения, сделанные в обход сигналов
+# (массовые update), и изменения в кешах других процессов при локальном
+# бэкенде кеша видны не позже чем через это время
+PLAYER_ACCESS_CACHE_TIMEOUT = 5 * 60
+
+# Поколение кеша, его смена сбрасывает полномочия всех игроков разом, меняется
+# при изменениях, которые затрагивают неизвестное заранее число игроков
+PLAYER_ACCESS_GENERATION_KEY = "player_access:generation"
+
+
+def player__get_access(*, steam_id: int) -> dict:
+    """
+    Все действующие полномочия игрока на активных серверах: выданные напрямую
+    и через списки пользователей, с ролями, разрешениями и датой окончания
+
+    Результат кешируется по Steam ID до изменения связанных записей, но не
+    дольше ближайшей даты окончания полномочий
+    """
+    cache_key = _get_cache_key(_get_generation(), steam_id)
+
+    access = cache.get(cache_key)
+    if access is not None:
+        return access
+
+    now = timezone.now()
+    access = _build_access(steam_id, now)
+
+    timeout = PLAYER_ACCESS_CACHE_TIMEOUT
+    dates_of_end = [grant["date_of_end"] for grant in access["grants"] if grant["date_of_end"] is not None]
+    if dates_of_end:
+        timeout = max(1, min(timeout, int((min(dates_of_end) - now).total_seconds()) + 1))
+
+    cache.set(cache_key, access, timeout)
+
+    return access
+
+
+def player__invalidate_access(*, steam_ids: Iterable[int]) -> None:
+    """Сброс кеша полномочий игроков после фиксации текущей транзакции"""
+    steam_ids = set(steam_ids)
+    if not steam_ids:
+        return
+
+    def invalidate() -> None:
+        generation = _get_generation()
+        cache.delete_many([_get_cache_key(generation, steam_id) for steam_id in steam_ids])
+
+    transaction.on_commit(invalidate)
+
+
+def player__invalidate_all_access() -> None:
+    """Сброс кеша полномочий всех игроков после фиксации текущей транзакции"""
+    transaction.on_commit(lambda: cache.set(PLAYER_ACCESS_GENERATION_KEY, time.time_ns(), None))
+
+
+def _get_generation() -> int:
+    generation = cache.get(PLAYER_ACCESS_GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        cache.set(PLAYER_ACCESS_GENERATION_KEY, generation, None)
+
+    return generation
+
+
+def _get_cache_key(generation: int, steam_id: int) -> str:
+    return f"player_access:{generation}:{steam_id}"
+
+
+def _build_access(steam_id: int, now: datetime) -> dict:
+    """
+    Полномочия собираются двумя запросами по индексам: выдачи игрока из
+    таблицы действующих ролей и разрешения найденных ролей
+    """
+    rows = EffectiveAccess.objects.filter(Q(expires_at__gte=now) | Q(expires_at=None), steam_id=steam_id).values_list(
+        "source",
+        "server_privileged_id",
+        "server_privileged__privileged__name",
+        "pack_id",
+        "pack__title",
+        "server_id",
+        "server__title",
+        "role_id",
+        "expires_at",
+    )
+
+    grants: dict[tuple[str, int], dict] = {}
+
+    for source, server_privileged_id, name, pack_id, pack_title, server_id, server_title, role_id, expires_at in rows:
+        grant_id = server_privileged_id if source == EffectiveAccess.DIRECT else pack_id
+        grant = grants.setdefault(
+            (source, grant_id),
+            {
+                "source": source,
+                "id": grant_id,
+                "title": name if source == EffectiveAccess.DIRECT else pack_title,
+                "servers": {},
+                "roles": set(),
+                "date_of_end": expires_at,
+            },
+        )
+        grant["servers"][server_id] = server_title
+        grant["roles"].add(role_id)
+
+    roles: dict[int, dict] = {}
+    role_ids = set().union(*(grant["roles"] for grant in grants.values()))
+
+    role_rows = (
+        Role.objects.filter(pk__in=role_ids, is_active=True)
+        .order_by("pk", "permissions__title")
+        .values_list("pk", "title", "permissions__title")
+    )
+
+    for role_id, title, permission in role_rows:
+        role = roles.setdefault(role_id, {"id": role_id, "title": title, "permissions": []})
+        if permission is not None:
+            role["permissions"].append(permission)
+
+    result = []
+    for grant in grants.values():
+        grant_roles = [roles[role_id] for role_id in sorted(grant["roles"]) if role_id in roles]
+        if not grant_roles:
+            # Выдача без активных ролей не дает полномочий
+            continue
+
+        grant["roles"] = grant_roles
+        grant["servers"] = [{"id": server_id, "title": title} for server_id, title in sorted(grant["servers"].items())]
+        result.append(grant)
+
+    # Сначала истекающие раньше, бессрочные в конце
+    result.sort(key=lambda grant: (grant["date_of_end"] or datetime.max.replace(tzinfo=now.tzinfo), grant["id"]))
+
+    return {"steam_id": steam_id, "grants": result}
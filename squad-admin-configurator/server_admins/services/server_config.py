@@ -1,15 +1,44 @@
 from collections import defaultdict
+from datetime import datetime
 
 from django.conf import settings
-from django.db.models import Q
+from django.db.models import Q, QuerySet
 from django.template.loader import render_to_string
 from django.utils import timezone
-from server_admins.models import Server, ServerPrivileged, ServerPrivilegedPack
-from server_admins.steam_ids_parser import SteamIDsSpec
+from server_admins.models import EffectiveAccess, Role, Server, ServerPrivileged, ServerPrivilegedPack
+
+
+def server__get_active_privileges(*, server: Server, now: datetime) -> QuerySet[ServerPrivileged]:
+    """
+    Действующие роли пользователей на сервере, с ролями и их разрешениями,
+    выборка по источникам для сверки с таблицей действующих ролей
+    """
+    return ServerPrivileged.objects.filter(
+        Q(date_of_end__gte=now) | Q(date_of_end=None),
+        Q(privileged__date_of_end__gte=now) | Q(privileged__date_of_end=None),
+        privileged__is_active=True,
+        is_active=True,
+        server=server,
+    ).prefetch_related("roles__permissions")
 
 
-def server__generate_config(*, server: Server) -> str:
+def server__get_active_packs(*, server: Server, now: datetime) -> QuerySet[ServerPrivilegedPack]:
+    """
+    Действующие списки пользователей сервера, с ролями и их разрешениями,
+    выборка по источникам для сверки с таблицей действующих ролей
+    """
+    return ServerPrivilegedPack.objects.filter(
+        Q(date_of_end__gte=now) | Q(date_of_end=None), is_active=True, servers=server
+    ).prefetch_related("roles__permissions")
 
+
+def server__generate_config(*, server: Server) -> str:
+    """
+    Конфигурация администраторов сервера по таблице действующих ролей: один
+    запрос по индексу сервера и один на роли с разрешениями. Роли в конфиге
+    идут в порядке первого появления, сначала выданные напрямую, затем
+    через списки пользователей
+    """
     now = timezone.now()
 
     if not server.is_active:
@@ -18,56 +47,35 @@ def server__generate_config(*, server: Server) -> str:
             {"server": server, "now_date": now.strftime(settings.DATETIME_FORMAT)},
         )
 
-    server_privileges = (
-        ServerPrivileged.objects.filter(
-            Q(date_of_end__gte=now) | Q(date_of_end=None),
-            Q(privileged__date_of_end__gte=now) | Q(privileged__date_of_end=None),
-            privileged__is_active=True,
-            is_active=True,
-            server=server,
-        )
-        .select_related("privileged")
-        .prefetch_related("roles__permissions")
+    rows = sorted(
+        EffectiveAccess.objects.filter(Q(expires_at__gte=now) | Q(expires_at=None), server=server).values_list(
+            "source",
+            "server_privileged_id",
+            "pack_id",
+            "steam_id",
+            "role_id",
+            "server_privileged__privileged__name",
+            "pack__title",
+        ),
+        key=lambda row: (row[0] != EffectiveAccess.DIRECT, row[1] or 0, row[2] or 0, row[3]),
     )
 
-    server_privileged_packs = ServerPrivilegedPack.objects.filter(
-        Q(date_of_end__gte=now) | Q(date_of_end=None), is_active=True, servers=server
-    ).prefetch_related("roles__permissions")
+    roles = Role.objects.prefetch_related("permissions").in_bulk({row[4] for row in rows})
 
     roles_with_permissions = {}
     privileged_by_role = defaultdict(list)
-    packs_by_role = defaultdict(list)
-
-    for server_priv in server_privileges:
-        for role in server_priv.roles.all():
-            if not role.is_active:
-                continue
-
-            if role not in roles_with_permissions:
-                permissions: str = ",".join([perm.title for perm in role.permissions.all()])
-                roles_with_permissions[role] = permissions
-
-            privileged_by_role[role].append(server_priv.privileged)
-
-    for server_pack in server_privileged_packs:
-        for role in server_pack.roles.all():
-            if not role.is_active:
-                continue
-
-            if role not in roles_with_permissions:
-                permissions: str = ",".join([perm.title for perm in role.permissions.all()])
-                roles_with_permissions[role] = permissions
-
-            parsed_steam_ids = SteamIDsSpec.parse(server_pack.steam_ids)
-
-            steam_ids = [
-                node.value for node in filter(lambda node: node.kind == SteamIDsSpec.STEAMID.name, parsed_steam_ids)
-            ]
+    packs_by_role = defaultdict(dict)
 
-            packs_by_role[role].append({"title": server_pack.title, "steam_ids": steam_ids})
+    for source, _, pack_id, steam_id, role_id, name, pack_title in rows:
+        role = roles[role_id]
+        if role not in roles_with_permissions:
+            roles_with_permissions[role] = ",".join(perm.title for perm in role.permissions.all())
 
-    packs_by_role.default_factory = None
-    privileged_by_role.default_factory = None
+        if source == EffectiveAccess.DIRECT:
+            privileged_by_role[role].append({"steam_id": steam_id, "name": name})
+        else:
+            pack_config = packs_by_role[role].setdefault(pack_id, {"title": pack_title, "steam_ids": []})
+            pack_config["steam_ids"].append(steam_id)
 
     return render_to_string(
         "server_config/admins_active.django",
@@ -75,7 +83,7 @@ def server__generate_config(*, server: Server) -> str:
             "server": server,
             "now_date": now.strftime(settings.DATETIME_FORMAT),
             "roles_with_permissions": roles_with_permissions,
-            "privileged_by_role": privileged_by_role,
-            "packs_by_role": packs_by_role,
+            "privileged_by_role": dict(privileged_by_role),
+            "packs_by_role": {role: list(pack_configs.values()) for role, pack_configs in packs_by_role.items()},
         },
     )
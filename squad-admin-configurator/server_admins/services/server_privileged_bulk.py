@@ -0,0 +1,222 @@
+from collections.abc import Collection, Iterable
+
+from django.db import transaction
+from django.utils import timezone
+from server_admins.models import ChangeLogEntry, Privileged, Role, Server, ServerPrivileged
+from server_admins.services.bulk_changes import bulk_changes__apply
+from server_admins.services.change_log import change_log__record
+from server_admins.services.effective_access import effective_access__sync_direct
+from server_admins.services.expiry import expiry__schedule
+
+CREATED = "created"
+UPDATED = "updated"
+DEACTIVATED = "deactivated"
+ERROR = "error"
+
+# Поля записи, которые меняются массовым изменением, кроме ролей
+UPDATE_FIELDS = ("server", "is_active", "date_of_end", "comment")
+
+
+def server_privileged__bulk_create(*, items: list[dict]) -> list[dict]:
+    """
+    Создание ролей пользователей на серверах одной транзакцией, items - данные
+    записей с ID сервера, пользователя и ролей
+
+    Связанные ID проверяются одним запросом на модель, записи без ошибок
+    создаются массовыми вставками. Возвращает результат для каждого элемента
+    items в том же порядке
+    """
+    results = _check_relations(items)
+
+    server_privileges: list[ServerPrivileged] = []
+    roles: list[list[int]] = []
+    for item, result in zip(items, results):
+        if result is not None:
+            continue
+
+        server_privileges.append(
+            ServerPrivileged(
+                server_id=item["server"],
+                privileged_id=item["privileged"],
+                is_active=item["is_active"],
+                date_of_end=item["date_of_end"],
+                comment=item["comment"],
+            )
+        )
+        roles.append(item["roles"])
+
+    with transaction.atomic():
+        ServerPrivileged.objects.bulk_create(server_privileges)
+        ServerPrivileged.roles.through.objects.bulk_create(
+            ServerPrivileged.roles.through(serverprivileged_id=server_priv.pk, role_id=role_id)
+            for server_priv, role_ids in zip(server_privileges, roles)
+            for role_id in set(role_ids)
+        )
+
+        _apply_changes(
+            server_privileges=server_privileges,
+            action=ChangeLogEntry.CREATE,
+            server_ids={server_priv.server_id for server_priv in server_privileges},
+        )
+
+    created = iter(server_privileges)
+    return [result or {"id": next(created).pk, "status": CREATED} for result in results]
+
+
+def server_privileged__bulk_update(*, items: list[dict]) -> list[dict]:
+    """
+    Частичное изменение ролей пользователей на серверах одной транзакцией,
+    items - ID записи и изменяемые поля, переданные роли заменяют текущие
+
+    Записи и связанные ID загружаются одним запросом на модель, изменения
+    применяются массовым обновлением всех полей из UPDATE_FIELDS. Возвращает результат для каждого
+    элемента items в том же порядке
+    """
+    results = _check_relations(items)
+
+    with transaction.atomic():
+        # Записи блокируются до конца транзакции, чтобы не затереть параллельные изменения
+        existing = ServerPrivileged.objects.select_for_update().in_bulk([item["id"] for item in items])
+        server_ids = {server_priv.server_id for server_priv in existing.values()}
+
+        now = timezone.now()
+        seen_ids = set()
+        server_privileges: list[ServerPrivileged] = []
+        roles: dict[int, list[int]] = {}
+
+        for index, item in enumerate(items):
+            server_priv = existing.get(item["id"])
+            if server_priv is None:
+                results[index] = _error({"id": [f"Роль на сервере с ID {item['id']} не найдена"]}, item["id"])
+            elif item["id"] in seen_ids:
+                results[index] = _error({"id": ["ID повторяется в запросе"]}, item["id"])
+
+            seen_ids.add(item["id"])
+
+            if results[index] is not None:
+                continue
+
+            for field in UPDATE_FIELDS:
+                if field in item:
+                    setattr(server_priv, f"{field}_id" if field == "server" else field, item[field])
+
+            server_priv.update_date = now
+            server_privileges.append(server_priv)
+
+            if "roles" in item:
+                roles[server_priv.pk] = item["roles"]
+
+        ServerPrivileged.objects.bulk_update(server_privileges, [*UPDATE_FIELDS, "update_date"])
+
+        ServerPrivileged.roles.through.objects.filter(serverprivileged_id__in=list(roles)).delete()
+        ServerPrivileged.roles.through.objects.bulk_create(
+            ServerPrivileged.roles.through(serverprivileged_id=server_priv_id, role_id=role_id)
+            for server_priv_id, role_ids in roles.items()
+            for role_id in set(role_ids)
+        )
+
+        _apply_changes(
+            server_privileges=server_privileges,
+            action=ChangeLogEntry.UPDATE,
+            # Старые сервера тоже, если запись перенесена на другой сервер
+            server_ids=server_ids | {server_priv.server_id for server_priv in server_privileges},
+        )
+
+    return [result or {"id": items[index]["id"], "status": UPDATED} for index, result in enumerate(results)]
+
+
+def server_privileged__bulk_deactivate(*, ids: list[int]) -> list[dict]:
+    """
+    Деактивация ролей пользователей на серверах одним массовым обновлением,
+    возвращает результат для каждого ID в том же порядке
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        existing = ServerPrivileged.objects.select_for_update().in_bulk(ids)
+        server_privileges = [server_priv for server_priv in existing.values() if server_priv.is_active]
+
+        ServerPrivileged.objects.filter(pk__in=[server_priv.pk for server_priv in server_privileges]).update(
+            is_active=False, update_date=now
+        )
+        for server_priv in server_privileges:
+            server_priv.is_active = False
+
+        _apply_changes(
+            server_privileges=server_privileges,
+            action=ChangeLogEntry.UPDATE,
+            server_ids={server_priv.server_id for server_priv in server_privileges},
+        )
+
+    return [
+        (
+            {"id": pk, "status": DEACTIVATED}
+            if pk in existing
+            else _error({"id": [f"Роль на сервере с ID {pk} не найдена"]}, pk)
+        )
+        for pk in ids
+    ]
+
+
+def _check_relations(items: list[dict]) -> list[dict | None]:
+    """
+    Проверка существования серверов, пользователей и ролей одним запросом
+    на каждую модель, для элементов с ошибками возвращает результат ошибки
+    """
+    servers = _get_existing_ids(Server, (item["server"] for item in items if "server" in item))
+    privileges = _get_existing_ids(Privileged, (item["privileged"] for item in items if "privileged" in item))
+    roles = _get_existing_ids(Role, (role_id for item in items for role_id in item.get("roles", ())))
+
+    results: list[dict | None] = []
+    for item in items:
+        errors = {}
+        if "server" in item and item["server"] not in servers:
+            errors["server"] = [f"Сервер с ID {item['server']} не найден"]
+        if "privileged" in item and item["privileged"] not in privileges:
+            errors["privileged"] = [f"Пользователь с ID {item['privileged']} не найден"]
+
+        missing_roles = sorted(set(item.get("roles", ())) - roles)
+        if missing_roles:
+            errors["roles"] = [f"Роль с ID {role_id} не найдена" for role_id in missing_roles]
+
+        results.append(_error(errors, item.get("id")) if errors else None)
+
+    return results
+
+
+def _get_existing_ids(model: type[Server | Privileged | Role], ids: Iterable[int]) -> set[int]:
+    ids = set(ids)
+    if not ids:
+        return set()
+
+    return set(model.objects.filter(pk__in=ids).values_list("pk", flat=True))
+
+
+def _error(errors: dict, pk: int | None = None) -> dict:
+    return {"id": pk, "status": ERROR, "errors": errors}
+
+
+def _apply_changes(*, server_privileges: list[ServerPrivileged], action: str, server_ids: Collection[int]) -> None:
+    """
+    Массовые вставки и обновления проходят в обход сигналов, их действия для
+    всех записей выполняются здесь одним запросом на каждое
+    """
+    if not server_privileges:
+        return
+
+    ids = [server_priv.pk for server_priv in server_privileges]
+    steam_ids = dict(ServerPrivileged.objects.filter(pk__in=ids).values_list("pk", "privileged__steam_id"))
+
+    effective_access__sync_direct(server_privileged_ids=ids)
+    bulk_changes__apply(server_ids=server_ids, steam_ids=steam_ids.values())
+    change_log__record(
+        model=ChangeLogEntry.SERVER_PRIVILEGED, action=action, changes=[(pk, steam_ids[pk]) for pk in ids]
+    )
+
+    dates_of_end = [
+        server_priv.date_of_end
+        for server_priv in server_privileges
+        if server_priv.is_active and server_priv.date_of_end is not None
+    ]
+    if dates_of_end:
+        expiry__schedule(date_of_end=min(dates_of_end))
@@ -0,0 +1,93 @@
+from collections import defaultdict
+from collections.abc import Iterator
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+from server_admins.models import Role, ServerPrivileged
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Ключ в выгрузке -> поле в запросе
+EXPORT_FIELDS = {
+    "id": "pk",
+    "server_id": "server_id",
+    "server_title": "server__title",
+    "privileged_id": "privileged_id",
+    "steam_id": "privileged__steam_id",
+    "name": "privileged__name",
+    "privileged_is_active": "privileged__is_active",
+    "privileged_date_of_end": "privileged__date_of_end",
+    "is_active": "is_active",
+    "date_of_end": "date_of_end",
+    "comment": "comment",
+    "creation_date": "creation_date",
+    "update_date": "update_date",
+}
+
+
+def server_privileged__iter_export(
+    *,
+    server_id: int | None = None,
+    active_only: bool = False,
+    changed_since: datetime | None = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[dict]:
+    """
+    Роли пользователей на серверах плоскими словарями с данными пользователя,
+    сервера и ролей, в порядке ID
+
+    Записи читаются курсором на стороне базы частями по chunk_size, роли
+    подгружаются одним запросом на часть, в памяти держится только одна часть
+
+    active_only - только действующие записи, по тем же правилам, что и
+    конфигурация сервера; changed_since - записи, у которых с этой даты
+    изменились они сами или их пользователь
+    """
+    server_privileges = ServerPrivileged.objects.order_by("pk")
+
+    if server_id is not None:
+        server_privileges = server_privileges.filter(server_id=server_id)
+
+    if active_only:
+        now = timezone.now()
+        server_privileges = server_privileges.filter(
+            Q(date_of_end__gte=now) | Q(date_of_end=None),
+            Q(privileged__date_of_end__gte=now) | Q(privileged__date_of_end=None),
+            privileged__is_active=True,
+            is_active=True,
+        )
+
+    if changed_since is not None:
+        server_privileges = server_privileges.filter(
+            Q(update_date__gte=changed_since) | Q(privileged__update_date__gte=changed_since)
+        )
+
+    role_titles = dict(Role.objects.values_list("pk", "title"))
+
+    names = tuple(EXPORT_FIELDS)
+
+    chunk: list[dict] = []
+    for values in server_privileges.values_list(*EXPORT_FIELDS.values()).iterator(chunk_size=chunk_size):
+        chunk.append(dict(zip(names, values)))
+        if len(chunk) >= chunk_size:
+            yield from _add_roles(chunk, role_titles)
+            chunk = []
+
+    if chunk:
+        yield from _add_roles(chunk, role_titles)
+
+
+def _add_roles(chunk: list[dict], role_titles: dict[int, str]) -> list[dict]:
+    roles: defaultdict[int, list[int]] = defaultdict(list)
+    for server_privileged_id, role_id in (
+        ServerPrivileged.roles.through.objects.filter(serverprivileged_id__in=[row["id"] for row in chunk])
+        .order_by("role_id")
+        .values_list("serverprivileged_id", "role_id")
+    ):
+        roles[server_privileged_id].append(role_id)
+
+    for row in chunk:
+        row["roles"] = [{"id": role_id, "title": role_titles.get(role_id, "")} for role_id in roles[row["id"]]]
+
+    return chunk
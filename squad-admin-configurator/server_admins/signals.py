@@ -0,0 +1,435 @@
+from collections.abc import Collection
+
+from django.db.models import Model, QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .models import ChangeLogEntry, Permission, Privileged, Role, Server, ServerPrivileged, ServerPrivilegedPack
+from .services.change_log import change_log__record
+from .services.effective_access import (
+    effective_access__remove_pack_members,
+    effective_access__sync_direct,
+    effective_access__sync_packs,
+    effective_access__update_pack,
+    effective_access__update_role,
+    effective_access__update_server,
+)
+from .services.expiry import expiry__schedule
+from .services.pack_members import server_privileged_pack__get_members, server_privileged_pack__sync_members
+from .services.player_access import player__invalidate_access, player__invalidate_all_access
+
+# Изменился состав Steam ID списка пользователей на серверах server_ids,
+# аргументы: pack_id, server_ids, added, removed (множества Steam ID).
+# Активность списка не учитывается, ее проверяют получатели сигнала
+pack_members_changed = Signal()
+
+# Поля списка пользователей, которые попадают в полномочия всех его игроков,
+# изменения Steam ID сбрасывают кеш только затронутых игроков
+PACK_ACCESS_FIELDS = ("is_active", "date_of_end", "title")
+
+# Модели журнала изменений
+CHANGE_LOG_MODELS: dict[type[Model], str] = {
+    Privileged: ChangeLogEntry.PRIVILEGED,
+    ServerPrivileged: ChangeLogEntry.SERVER_PRIVILEGED,
+    ServerPrivilegedPack: ChangeLogEntry.PACK,
+    Role: ChangeLogEntry.ROLE,
+    Permission: ChangeLogEntry.PERMISSION,
+}
+
+
+@receiver(post_save, sender=Privileged)
+@receiver(post_save, sender=ServerPrivileged)
+@receiver(post_save, sender=ServerPrivilegedPack)
+def schedule_expiry(sender, instance: Privileged | ServerPrivileged | ServerPrivilegedPack, **kwargs) -> None:
+    if instance.is_active and instance.date_of_end is not None:
+        expiry__schedule(date_of_end=instance.date_of_end)
+
+
+@receiver(post_save, sender=Privileged)
+@receiver(post_save, sender=ServerPrivileged)
+@receiver(post_save, sender=ServerPrivilegedPack)
+@receiver(post_save, sender=Role)
+@receiver(post_save, sender=Permission)
+def record_change_on_save(sender, instance: Model, created: bool, **kwargs) -> None:
+    # Подключается раньше остальных получателей, чтобы запись о создании списка
+    # шла в журнале до записей о его Steam ID
+    action = ChangeLogEntry.CREATE if created else ChangeLogEntry.UPDATE
+    _record_changes(sender, action, [(instance.pk, _get_steam_id(instance))])
+
+
+@receiver(post_save, sender=ServerPrivilegedPack)
+def sync_pack_members(sender, instance: ServerPrivilegedPack, **kwargs) -> None:
+    # Действующие роли списка обновляются до синхронизации состава: при
+    # активации списка записи строятся по старому составу, а разница в
+    # составе применяется уже через pack_members_changed
+    effective_access__update_pack(pack=instance)
+
+    added, removed = server_privileged_pack__sync_members(pack=instance)
+
+    _record_pack_members_changes(instance.pk, added=added, removed=removed)
+
+    if added or removed:
+        _send_pack_members_changed(
+            instance.pk, set(instance.servers.values_list("pk", flat=True)), added=added, removed=removed
+        )
+
+
+@receiver(m2m_changed, sender=ServerPrivilegedPack.servers.through)
+def notify_pack_servers_changed(
+    sender, instance: ServerPrivilegedPack | Server, action: str, reverse: bool, pk_set: set[int] | None, **kwargs
+) -> None:
+    """При добавлении или удалении серверов у списка для них меняются все его Steam ID"""
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if action == "pre_clear":
+        # Для clear pk_set не передается, связи читаются до удаления
+        relation = instance.privileged_accesses_packs if reverse else instance.servers
+        related_ids = set(relation.values_list("pk", flat=True))
+    else:
+        related_ids = set(pk_set or ())
+
+    if reverse:
+        # Изменение со стороны сервера, связанные ID - списки
+        server_ids, pack_ids = {instance.pk}, related_ids
+    else:
+        server_ids, pack_ids = related_ids, {instance.pk}
+
+    for pack_id in pack_ids:
+        members = server_privileged_pack__get_members(pack_id=pack_id)
+
+        if action == "post_add":
+            _send_pack_members_changed(pack_id, server_ids, added=members, removed=set())
+        else:
+            _send_pack_members_changed(pack_id, server_ids, added=set(), removed=members)
+
+
+@receiver(pre_delete, sender=ServerPrivilegedPack)
+def remember_deleted_pack_members(sender, instance: ServerPrivilegedPack, **kwargs) -> None:
+    instance._deleted_members = (
+        set(instance.servers.values_list("pk", flat=True)),
+        server_privileged_pack__get_members(pack_id=instance.pk),
+    )
+
+
+@receiver(post_delete, sender=ServerPrivilegedPack)
+def notify_pack_deleted(sender, instance: ServerPrivilegedPack, **kwargs) -> None:
+    server_ids, members = getattr(instance, "_deleted_members", (set(), set()))
+    _record_pack_members_changes(instance.pk, added=set(), removed=members)
+    _send_pack_members_changed(instance.pk, server_ids, added=set(), removed=members)
+
+
+@receiver(pack_members_changed)
+def invalidate_pack_members_access(sender, added: set[int], removed: set[int], **kwargs) -> None:
+    player__invalidate_access(steam_ids=added | removed)
+
+
+@receiver(pre_save, sender=Privileged)
+def remember_privileged_steam_id(sender, instance: Privileged, **kwargs) -> None:
+    instance._previous_steam_id = (
+        Privileged.objects.filter(pk=instance.pk).values_list("steam_id", flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Privileged)
+@receiver(post_delete, sender=Privileged)
+def invalidate_privileged_access(sender, instance: Privileged, **kwargs) -> None:
+    # При смене Steam ID полномочия остаются закешированы и под старым
+    steam_ids = {instance.steam_id, getattr(instance, "_previous_steam_id", None)}
+    player__invalidate_access(steam_ids=steam_ids - {None})
+
+
+@receiver(post_save, sender=ServerPrivileged)
+@receiver(post_delete, sender=ServerPrivileged)
+def invalidate_server_privileged_access(sender, instance: ServerPrivileged, **kwargs) -> None:
+    # При каскадном удалении пользователя его Steam ID уже сброшен сигналом Privileged
+    player__invalidate_access(
+        steam_ids=Privileged.objects.filter(pk=instance.privileged_id).values_list("steam_id", flat=True)
+    )
+
+
+@receiver(m2m_changed, sender=ServerPrivileged.roles.through)
+def invalidate_server_privileged_roles_access(
+    sender, instance: ServerPrivileged | Role, action: str, reverse: bool, **kwargs
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:
+        # Изменение со стороны роли затрагивает всех ее пользователей
+        player__invalidate_all_access()
+    else:
+        invalidate_server_privileged_access(sender, instance)
+
+
+@receiver(pre_save, sender=ServerPrivilegedPack)
+def remember_pack_access_fields(sender, instance: ServerPrivilegedPack, **kwargs) -> None:
+    instance._previous_access_fields = (
+        ServerPrivilegedPack.objects.filter(pk=instance.pk).values_list(*PACK_ACCESS_FIELDS).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=ServerPrivilegedPack)
+def invalidate_pack_access(sender, instance: ServerPrivilegedPack, created: bool, **kwargs) -> None:
+    """
+    Кеш всех игроков сбрасывается только при изменении полей из
+    PACK_ACCESS_FIELDS, изменения состава сбрасываются точечно через
+    pack_members_changed
+    """
+    if created:
+        return
+
+    previous = getattr(instance, "_previous_access_fields", None)
+    if previous != tuple(getattr(instance, field) for field in PACK_ACCESS_FIELDS):
+        player__invalidate_all_access()
+
+
+@receiver(post_save, sender=Server)
+@receiver(post_delete, sender=Server)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidate_all_access(sender, **kwargs) -> None:
+    """Изменения, которые затрагивают полномочия неизвестного заранее числа игроков"""
+    player__invalidate_all_access()
+
+
+@receiver(m2m_changed, sender=ServerPrivilegedPack.roles.through)
+@receiver(m2m_changed, sender=Role.permissions.through)
+def invalidate_all_access_on_m2m(sender, action: str, **kwargs) -> None:
+    if action in ("post_add", "post_remove", "post_clear"):
+        player__invalidate_all_access()
+
+
+@receiver(m2m_changed, sender=ServerPrivileged.roles.through)
+@receiver(m2m_changed, sender=ServerPrivilegedPack.servers.through)
+@receiver(m2m_changed, sender=ServerPrivilegedPack.roles.through)
+@receiver(m2m_changed, sender=Role.permissions.through)
+def touch_update_date_on_m2m(
+    sender, instance: Model, action: str, reverse: bool, model: type[Model], pk_set: set[int] | None, **kwargs
+) -> None:
+    """Изменение связей не сохраняет записи, которым принадлежит поле, дата изменения обновляется отдельно"""
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    owner_model, owner_ids = _get_m2m_owners(sender, instance, action, reverse, model, pk_set)
+    owner_model.objects.filter(pk__in=owner_ids).update(update_date=timezone.now())
+
+
+@receiver(post_save, sender=ServerPrivileged)
+@receiver(post_delete, sender=ServerPrivileged)
+def touch_server_by_server_privileged(sender, instance: ServerPrivileged, **kwargs) -> None:
+    _touch_servers(Server.objects.filter(pk=instance.server_id))
+
+
+@receiver(m2m_changed, sender=ServerPrivileged.roles.through)
+def touch_servers_by_server_privileged_roles(
+    sender, instance: ServerPrivileged | Role, action: str, reverse: bool, **kwargs
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:
+        _touch_servers(Server.objects.filter(privileged_accesses__roles=instance))
+    else:
+        _touch_servers(Server.objects.filter(pk=instance.server_id))
+
+
+@receiver(post_save, sender=Privileged)
+def touch_servers_by_privileged(sender, instance: Privileged, **kwargs) -> None:
+    _touch_servers(Server.objects.filter(privileged_accesses__privileged=instance))
+
+
+@receiver(pack_members_changed)
+def touch_servers_by_pack_members(sender, server_ids: set[int], **kwargs) -> None:
+    _touch_servers(Server.objects.filter(pk__in=server_ids))
+
+
+@receiver(post_save, sender=ServerPrivilegedPack)
+def touch_servers_by_pack(sender, instance: ServerPrivilegedPack, **kwargs) -> None:
+    _touch_servers(Server.objects.filter(privileged_accesses_packs=instance))
+
+
+@receiver(m2m_changed, sender=ServerPrivilegedPack.roles.through)
+def touch_servers_by_pack_roles(
+    sender, instance: ServerPrivilegedPack | Role, action: str, reverse: bool, **kwargs
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:
+        _touch_servers(Server.objects.filter(privileged_accesses_packs__roles=instance))
+    else:
+        _touch_servers(Server.objects.filter(privileged_accesses_packs=instance))
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def touch_all_servers(sender, **kwargs) -> None:
+    _touch_servers(Server.objects.all())
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+def touch_all_servers_on_m2m(sender, action: str, **kwargs) -> None:
+    if action in ("post_add", "post_remove", "post_clear"):
+        _touch_servers(Server.objects.all())
+
+
+@receiver(post_save, sender=ServerPrivileged)
+def sync_effective_access_by_server_privileged(sender, instance: ServerPrivileged, **kwargs) -> None:
+    effective_access__sync_direct(server_privileged_ids=[instance.pk])
+
+
+@receiver(m2m_changed, sender=ServerPrivileged.roles.through)
+def sync_effective_access_by_server_privileged_roles(
+    sender, instance: ServerPrivileged | Role, action: str, reverse: bool, pk_set: set[int] | None, **kwargs
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        effective_access__sync_direct(server_privileged_ids=[instance.pk])
+    elif action == "post_clear":
+        effective_access__sync_direct(role_ids=[instance.pk])
+    else:
+        effective_access__sync_direct(server_privileged_ids=pk_set, role_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Privileged)
+def sync_effective_access_by_privileged(sender, instance: Privileged, **kwargs) -> None:
+    effective_access__sync_direct(privileged_ids=[instance.pk])
+
+
+@receiver(pack_members_changed)
+def sync_effective_access_by_pack_members(
+    sender, pack_id: int, server_ids: set[int], added: set[int], removed: set[int], **kwargs
+) -> None:
+    # Сигнал может прийти до удаления связей (очистка серверов), поэтому
+    # удаленные Steam ID не пересчитываются, а только удаляются
+    if removed:
+        effective_access__remove_pack_members(pack_id=pack_id, server_ids=server_ids, steam_ids=removed)
+    if added:
+        effective_access__sync_packs(pack_ids=[pack_id], server_ids=server_ids, steam_ids=added)
+
+
+@receiver(m2m_changed, sender=ServerPrivilegedPack.roles.through)
+def sync_effective_access_by_pack_roles(
+    sender, instance: ServerPrivilegedPack | Role, action: str, reverse: bool, pk_set: set[int] | None, **kwargs
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if action == "post_clear":
+        if reverse:
+            effective_access__sync_packs(role_ids=[instance.pk])
+        else:
+            effective_access__sync_packs(pack_ids=[instance.pk])
+    elif reverse:
+        effective_access__sync_packs(pack_ids=pk_set, role_ids=[instance.pk])
+    else:
+        effective_access__sync_packs(pack_ids=[instance.pk], role_ids=pk_set)
+
+
+@receiver(post_save, sender=Role)
+def sync_effective_access_by_role(sender, instance: Role, **kwargs) -> None:
+    effective_access__update_role(role=instance)
+
+
+@receiver(post_save, sender=Server)
+def sync_effective_access_by_server(sender, instance: Server, **kwargs) -> None:
+    effective_access__update_server(server=instance)
+
+
+@receiver(post_delete, sender=Privileged)
+@receiver(post_delete, sender=ServerPrivileged)
+@receiver(post_delete, sender=ServerPrivilegedPack)
+@receiver(post_delete, sender=Role)
+@receiver(post_delete, sender=Permission)
+def record_change_on_delete(sender, instance: Model, **kwargs) -> None:
+    _record_changes(sender, ChangeLogEntry.DELETE, [(instance.pk, _get_steam_id(instance))])
+
+
+@receiver(m2m_changed, sender=ServerPrivileged.roles.through)
+@receiver(m2m_changed, sender=ServerPrivilegedPack.servers.through)
+@receiver(m2m_changed, sender=ServerPrivilegedPack.roles.through)
+@receiver(m2m_changed, sender=Role.permissions.through)
+def record_change_on_m2m(
+    sender, instance: Model, action: str, reverse: bool, model: type[Model], pk_set: set[int] | None, **kwargs
+) -> None:
+    """Изменение связей записывается как изменение записей, которым принадлежит поле"""
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    owner_model, owner_ids = _get_m2m_owners(sender, instance, action, reverse, model, pk_set)
+
+    steam_ids = {}
+    if owner_model is ServerPrivileged:
+        steam_ids = dict(ServerPrivileged.objects.filter(pk__in=owner_ids).values_list("pk", "privileged__steam_id"))
+
+    _record_changes(owner_model, ChangeLogEntry.UPDATE, [(pk, steam_ids.get(pk)) for pk in sorted(owner_ids)])
+
+
+def _touch_servers(servers: QuerySet[Server]) -> None:
+    # Подзапрос с join может вернуть сервер несколько раз, поэтому через pk__in
+    Server.objects.filter(pk__in=servers.values("pk")).update(privileges_update_date=timezone.now())
+
+
+def _send_pack_members_changed(pack_id: int, server_ids: set[int], added: set[int], removed: set[int]) -> None:
+    if server_ids and (added or removed):
+        pack_members_changed.send(
+            sender=ServerPrivilegedPack, pack_id=pack_id, server_ids=server_ids, added=added, removed=removed
+        )
+
+
+def _get_m2m_owners(
+    sender: type[Model],
+    instance: Model,
+    action: str,
+    reverse: bool,
+    model: type[Model],
+    pk_set: set[int] | None,
+) -> tuple[type[Model], set[int]]:
+    """Модель, которой принадлежит поле связи, и ID ее записей, затронутых изменением"""
+    if not reverse:
+        return type(instance), {instance.pk}
+
+    if action == "pre_clear":
+        # Для clear pk_set не передается, связи читаются до удаления
+        field = next(field for field in model._meta.many_to_many if field.remote_field.through is sender)
+        return model, set(model.objects.filter(**{field.name: instance}).values_list("pk", flat=True))
+
+    return model, set(pk_set or ())
+
+
+def _record_changes(model: type[Model], action: str, changes: Collection[tuple[int, int | None]]) -> None:
+    change_log__record(model=CHANGE_LOG_MODELS[model], action=action, changes=changes)
+
+
+def _record_pack_members_changes(pack_id: int, added: set[int], removed: set[int]) -> None:
+    change_log__record(
+        model=ChangeLogEntry.PACK_MEMBER,
+        action=ChangeLogEntry.DELETE,
+        changes=[(pack_id, steam_id) for steam_id in sorted(removed)],
+    )
+    change_log__record(
+        model=ChangeLogEntry.PACK_MEMBER,
+        action=ChangeLogEntry.CREATE,
+        changes=[(pack_id, steam_id) for steam_id in sorted(added)],
+    )
+
+
+def _get_steam_id(instance: Model) -> int | None:
+    if isinstance(instance, Privileged):
+        return instance.steam_id
+
+    if isinstance(instance, ServerPrivileged):
+        # При каскадном удалении пользователя его запись удаляется после ролей на серверах
+        return Privileged.objects.filter(pk=instance.privileged_id).values_list("steam_id", flat=True).first()
+
+    return None
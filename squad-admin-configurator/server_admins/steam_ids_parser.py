@@ -1,16 +1,65 @@
 import re
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
 from enum import Enum
 from functools import cache
 from typing import Iterable
 
 
-@dataclass
+@dataclass(slots=True)
 class Node:
     kind: str
     value: str
 
 
+@dataclass(slots=True)
+class SteamIDsError:
+    line: int
+    value: str
+
+    def __str__(self) -> str:
+        return error_description(SteamIDsSpec.MISMATCH.name, self.line, self.value)
+
+
+@dataclass(slots=True)
+class SteamIDsDuplicate:
+    line: int
+    steam_id: int
+    first_line: int
+
+    def __str__(self) -> str:
+        return f"Steam ID {self.steam_id} в строке #{self.line} уже есть в строке #{self.first_line}"
+
+
+@dataclass(slots=True)
+class ParsedSteamIDs:
+    """
+    Результат SteamIDsSpec.scan: Steam ID числами в array('Q'), первый
+    комментарий после каждого Steam ID (по его индексу), ошибки и повторы
+
+    При превышении max_ids разбор останавливается на первом лишнем Steam ID
+    """
+
+    max_ids: int = 0
+    steam_ids: array = field(default_factory=lambda: array("Q"))
+    comments: dict[int, str] = field(default_factory=dict)
+    errors: list[SteamIDsError] = field(default_factory=list)
+    duplicates: list[SteamIDsDuplicate] = field(default_factory=list)
+    max_ids_exceeded: bool = False
+
+    def get_error_messages(self) -> list[str]:
+        messages = [str(error) for error in self.errors]
+
+        if self.max_ids_exceeded:
+            messages.append(f"Максимальное количество ID - {self.max_ids}")
+
+        return messages
+
+    def get_warning_messages(self) -> list[str]:
+        """Повторы не мешают сохранению, в список пользователей попадает первое вхождение"""
+        return [str(duplicate) for duplicate in self.duplicates]
+
+
 class SteamIDsSpec(Enum):
     """Спецификация формата файла для списка steam id"""
 
@@ -30,6 +79,60 @@ class SteamIDsSpec(Enum):
     def get_compiled_regex(cls):
         return re.compile(cls.get_regex(), re.M)
 
+    @classmethod
+    @cache
+    def get_compiled_scan_regex(cls):
+        """
+        Регулярное выражение для scan: пробелы пропускаются вместе со
+        следующим узлом, остальные узлы как в get_regex
+        """
+        nodes = "|".join(f"(?P<{kind.name}>{kind.value})" for kind in cls if kind is not cls.EMPTY)
+        return re.compile(rf"[ \t]*(?:{nodes})?", re.M)
+
+    @classmethod
+    def scan(
+        cls, text: str, with_comments: bool = False, max_ids: int = 0, check_duplicates: bool = True
+    ) -> ParsedSteamIDs:
+        """
+        Разбор за один проход без создания узлов, сохраняются только
+        Steam ID, ошибки, повторы и при with_comments - комментарии
+
+        При max_ids > 0 разбор прекращается как только Steam ID больше max_ids,
+        без check_duplicates не тратится память на поиск повторов
+        """
+        result = ParsedSteamIDs(max_ids=max_ids)
+        steam_ids = result.steam_ids
+        first_lines: dict[int, int] = {}
+        line = 1
+
+        for _match in cls.get_compiled_scan_regex().finditer(text):
+            kind = _match.lastgroup
+
+            if kind == "STEAMID":
+                steam_id = int(_match.group(kind))
+
+                if check_duplicates:
+                    first_line = first_lines.get(steam_id)
+                    if first_line is None:
+                        first_lines[steam_id] = line
+                    else:
+                        result.duplicates.append(SteamIDsDuplicate(line, steam_id, first_line))
+
+                steam_ids.append(steam_id)
+
+                if max_ids and len(steam_ids) > max_ids:
+                    result.max_ids_exceeded = True
+                    break
+            elif kind == "NEWLINE":
+                line += 1
+            elif kind == "COMMENT":
+                if with_comments and steam_ids and len(steam_ids) - 1 not in result.comments:
+                    result.comments[len(steam_ids) - 1] = _match.group(kind)
+            elif kind == "MISMATCH":
+                result.errors.append(SteamIDsError(line, _match.group(kind)))
+
+        return result
+
     @classmethod
     def parse_iter(cls, text):
         spec = cls.get_compiled_regex()
@@ -1,13 +1,18 @@
 from django.contrib import admin
 from django.db.models.query import F, QuerySet
+from django.http import JsonResponse
 from django.http.request import HttpRequest
+from django.urls import path
 from django.utils.safestring import SafeText
 from utils import textarea_form
 
-from .layers_parser import LayerSpec
-from .models import LayersPack, Rotation, RotationLayersPack
+from .forms import LayersAutocompleteWidget, LayersCatalogForm
+from .layers_catalog import layers_catalog__get_index
+from .models import LayersCatalog, LayersPack, Rotation, RotationLayersPack
 from .tables import LayersTable
 
+MAX_AUTOCOMPLETE_RESULTS = 20
+
 
 class RotationLayersPackInline(admin.StackedInline):
     fields = ["queue_number", "pack", "start_time_at", "end_time_at", "start_date", "slug", "description"]
@@ -42,12 +47,35 @@ class LayersPackAdmin(admin.ModelAdmin):
         self.request = request
         return super().get_queryset(request)
 
+    def formfield_for_dbfield(self, db_field, request: HttpRequest, **kwargs):
+        if db_field.name == "layers":
+            kwargs["widget"] = LayersAutocompleteWidget()
+        return super().formfield_for_dbfield(db_field, request, **kwargs)
+
+    def get_urls(self):
+        urls = [
+            path(
+                "layers_autocomplete/",
+                self.admin_site.admin_view(self.layers_autocomplete),
+                name="server_rotations_layerspack_layers_autocomplete",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def layers_autocomplete(self, request: HttpRequest) -> JsonResponse:
+        """Поиск известных карт по префиксу названия в каталоге карт, ?term=<префикс>"""
+        term = request.GET.get("term", "").strip()
+
+        results = layers_catalog__get_index().search_prefix(term, MAX_AUTOCOMPLETE_RESULTS) if term else []
+
+        return JsonResponse({"results": results})
+
     @admin.display(description="Обработанный список карт")
     def parsed_layers(self, obj: LayersPack) -> str | SafeText:
         if obj.layers == "":
             return "-"
 
-        layers = [{"layer": node.value} for node in LayerSpec.parse(obj.layers) if node.kind == LayerSpec.LAYER.name]
+        layers = [{"layer": layer} for layer in obj.normalized_layers]
 
         if len(layers) == 0:
             return "-"
@@ -55,3 +83,18 @@ class LayersPackAdmin(admin.ModelAdmin):
         table = LayersTable(layers, orderable=False)
 
         return table.as_html(self.request)
+
+
+@admin.register(LayersCatalog)
+class LayersCatalogAdmin(admin.ModelAdmin):
+    form = LayersCatalogForm
+    fields = ["title", "is_active", "layers_file", "layers", "layers_count", "update_date"]
+    readonly_fields = ["layers_count", "update_date"]
+    list_display = ["title", "is_active", "layers_count", "update_date"]
+    list_display_links = ["title"]
+    list_filter = ["is_active", "update_date"]
+    search_fields = ["title"]
+
+    @admin.display(description="Количество карт")
+    def layers_count(self, obj: LayersCatalog) -> int:
+        return len(obj.get_layers())
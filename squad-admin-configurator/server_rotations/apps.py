@@ -5,3 +5,6 @@ class ServerRotationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "server_rotations"
     verbose_name = "3. Ротации карт"
+
+    def ready(self):
+        import server_rotations.signals  # noqa
@@ -0,0 +1,48 @@
+from django import forms
+from django.contrib.admin.widgets import AdminTextareaWidget
+from django.core.exceptions import ValidationError
+from django.urls import reverse_lazy
+
+from .models import LayersCatalog
+
+
+class LayersCatalogForm(forms.ModelForm):
+    """Форма каталога карт с загрузкой списка карт из текстового файла"""
+
+    layers_file = forms.FileField(
+        label="Файл со списком карт",
+        help_text="Текстовый файл в UTF-8, каждая карта с новой строки, заменяет список карт",
+        required=False,
+    )
+
+    class Meta:
+        model = LayersCatalog
+        fields = ["title", "is_active", "layers"]
+
+    def clean(self):
+        cleaned_data = super().clean()
+
+        layers_file = cleaned_data.get("layers_file")
+        if layers_file is not None:
+            try:
+                cleaned_data["layers"] = layers_file.read().decode("utf-8-sig")
+            except UnicodeDecodeError:
+                raise ValidationError({"layers_file": "Файл должен быть в кодировке UTF-8"})
+
+        return cleaned_data
+
+
+class LayersAutocompleteWidget(AdminTextareaWidget):
+    """Поле списка карт с подсказками названий карт из каталога карт"""
+
+    class Media:
+        js = ("admin/layers_autocomplete.js",)
+
+    def __init__(self, attrs=None):
+        super().__init__(
+            {
+                "class": "vLargeTextField layers-autocomplete",
+                "data-autocomplete-url": reverse_lazy("admin:server_rotations_layerspack_layers_autocomplete"),
+                **(attrs or {}),
+            }
+        )
@@ -0,0 +1,117 @@
+import time
+from bisect import bisect_left
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from .layers_parser import LayerSpec, Node
+from .models import LayersCatalog
+
+MAX_SUGGESTIONS = 3
+
+# Интервал проверки версии каталогов, в пределах него индекс берется без
+# запросов к базе, изменения каталогов в этом процессе сбрасывают его сразу
+VERSION_CHECK_INTERVAL_IN_SEC = 30
+
+
+@dataclass(frozen=True, slots=True)
+class LayersCatalogIndex:
+    """
+    Индекс известных карт: множество для точной проверки и отсортированный
+    по названию в нижнем регистре список для поиска по префиксу бинарным поиском
+    """
+
+    layers: frozenset[str]
+    keys: tuple[str, ...]
+    sorted_layers: tuple[str, ...]
+
+    @classmethod
+    def from_layers(cls, layers: set[str]) -> "LayersCatalogIndex":
+        sorted_layers = tuple(sorted(layers, key=lambda layer: (layer.lower(), layer)))
+        return cls(
+            layers=frozenset(layers),
+            keys=tuple(layer.lower() for layer in sorted_layers),
+            sorted_layers=sorted_layers,
+        )
+
+    def __contains__(self, layer: str) -> bool:
+        return layer in self.layers
+
+    def __len__(self) -> int:
+        return len(self.layers)
+
+    def search_prefix(self, prefix: str, limit: int = 20) -> list[str]:
+        """Карты начинающиеся с prefix без учета регистра"""
+        prefix = prefix.lower()
+        index = bisect_left(self.keys, prefix)
+        result: list[str] = []
+
+        while index < len(self.keys) and len(result) < limit and self.keys[index].startswith(prefix):
+            result.append(self.sorted_layers[index])
+            index += 1
+
+        return result
+
+    def check_errors(self, nodes: Iterable[Node]) -> list[str]:
+        """
+        Ошибки для карт отсутствующих в каталоге с похожими вариантами,
+        пустой каталог ничего не проверяет
+        """
+        if not self.layers:
+            return []
+
+        current_line = 1
+        errors: list[str] = []
+
+        for node in nodes:
+            match node.kind:
+                case LayerSpec.NEWLINE.name:
+                    current_line += 1
+                case LayerSpec.LAYER.name:
+                    layer = LayerSpec.get_layer_name(node.value)
+                    if layer in self.layers:
+                        continue
+
+                    error = f"Карта '{layer}' в строке #{current_line} отсутствует в каталоге карт"
+
+                    suggestions = self.search_prefix(layer.rsplit("_", 1)[0], MAX_SUGGESTIONS)
+                    if suggestions:
+                        error += f", возможно: {', '.join(suggestions)}"
+
+                    errors.append(error)
+
+        return errors
+
+
+# Версия каталогов (id, дата изменения), время ее проверки и индекс, у каждого
+# процесса свой, пересобирается только при изменении, удалении или отключении каталогов
+_index: tuple[tuple, float, LayersCatalogIndex] | None = None
+
+
+def layers_catalog__get_index() -> LayersCatalogIndex:
+    global _index
+
+    now = time.monotonic()
+    if _index is not None and now - _index[1] < VERSION_CHECK_INTERVAL_IN_SEC:
+        return _index[2]
+
+    version = tuple(LayersCatalog.objects.filter(is_active=True).order_by("id").values_list("id", "update_date"))
+
+    if _index is not None and _index[0] == version:
+        _index = (version, now, _index[2])
+        return _index[2]
+
+    layers: set[str] = set()
+    for catalog in LayersCatalog.objects.filter(pk__in=[catalog_id for catalog_id, _ in version]).only("layers"):
+        layers.update(catalog.get_layers())
+
+    _index = (version, now, LayersCatalogIndex.from_layers(layers))
+
+    return _index[2]
+
+
+def layers_catalog__expire_index() -> None:
+    """Проверка версии каталогов при следующем получении индекса, без ожидания интервала"""
+    global _index
+
+    if _index is not None:
+        _index = (_index[0], float("-inf"), _index[2])
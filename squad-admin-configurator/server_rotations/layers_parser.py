@@ -1,4 +1,5 @@
 import re
+from collections.abc import Iterator
 from dataclasses import dataclass
 from enum import Enum
 from functools import cache
@@ -11,7 +12,12 @@ class Node:
 
 
 class LayerSpec(Enum):
-    """Спецификация формата файла для списка карт"""
+    """
+    Спецификация формата файла для списка карт
+
+    Регулярное выражение - эталон формата, разбор текста выполняет
+    линейный tokenize, который выдает ту же последовательность узлов
+    """
 
     LAYER = r"^[A-Za-z0-9_-]+(?: *\|{1,2} *[A-Za-z+ ]+){0,2}\b"
     EMPTY = r"[ \t]+"
@@ -31,17 +37,28 @@ class LayerSpec(Enum):
 
     @classmethod
     def parse_iter(cls, text):
-        spec = cls.get_compiled_regex()
-
-        for _match in spec.finditer(text):
-            yield Node(_match.lastgroup, _match.group())
+        return tokenize(text)
 
     @classmethod
     def parse(cls, text) -> list[Node]:
+        return list(tokenize(text))
+
+    @classmethod
+    def parse_regex(cls, text) -> list[Node]:
+        """Разбор эталонным регулярным выражением, для сравнения с tokenize"""
         spec = cls.get_compiled_regex()
 
         return [Node(_m.lastgroup, _m.group()) for _m in spec.finditer(text)]
 
+    @classmethod
+    def get_layers(cls, nodes) -> list[str]:
+        return [node.value for node in nodes if node.kind == LayerSpec.LAYER.name]
+
+    @classmethod
+    def get_layer_name(cls, value: str) -> str:
+        """Название карты из строки с картой, без указанных через | фракций"""
+        return value.split("|", 1)[0].strip()
+
     @classmethod
     def check_errors(cls, nodes) -> list:
         current_line = 1
@@ -57,6 +74,96 @@ class LayerSpec(Enum):
         return errors
 
 
+_BOUNDARY = re.compile(r"\b")
+_NAME_RUN = re.compile(r"[A-Za-z0-9_-]*")
+_SPACES_RUN = re.compile(r" *")
+_FACTIONS_RUN = re.compile(r"[A-Za-z+ ]*")
+_LAYER_KIND = LayerSpec.LAYER.name
+
+# Остальные узлы различаются по первому символу, в каждой ветке один
+# повтор по классу символов, поэтому совпадение ищется за линейное время
+_OTHER_NODES = re.compile(r"(?P<EMPTY>[ \t]+)|(?P<COMMENT>(?:#|//)[^\n]*)|(?P<NEWLINE>\r\n|\r|\n)|(?P<MISMATCH>[^\n]+)")
+
+
+def _last_boundary(text: str, start: int, end: int) -> int | None:
+    """Самая правая граница слова в промежутке (start, end]"""
+    for position in range(end, start, -1):
+        if _BOUNDARY.match(text, position):
+            return position
+
+    return None
+
+
+def _match_factions(text: str, position: int) -> tuple[int, int] | None:
+    """
+    Группа ` *\\|{1,2} *[A-Za-z+ ]+` с позиции position, возвращает
+    промежуток (start, end] в котором может закончиться группа
+    """
+    position = _SPACES_RUN.match(text, position).end()
+    if not text.startswith("|", position):
+        return None
+
+    # Без второго | после || группа не совпадет: ни пробелы, ни фракции не начинаются с |
+    position += 2 if text.startswith("||", position) else 1
+
+    end = _FACTIONS_RUN.match(text, position).end()
+    if end == position:
+        return None
+
+    return position, end
+
+
+def _match_layer(text: str, position: int) -> int | None:
+    """
+    Конец совпадения LAYER с начала строки position, такой же, какой
+    выбирает регулярное выражение перебором с возвратами
+
+    Жадные повторы перебираются от длинных к коротким и первое совпадение
+    - самое правое допустимое окончание в порядке: вторая группа фракций,
+    первая группа, название карты. Окончания второй группы не зависят от
+    того, где закончилась первая, поэтому каждый промежуток проверяется
+    один раз и время разбора линейно
+    """
+    name_end = _NAME_RUN.match(text, position).end()
+    if name_end == position:
+        return None
+
+    first = _match_factions(text, name_end) if text.startswith((" ", "|"), name_end) else None
+    if first is not None:
+        second = _match_factions(text, first[1])
+        if second is not None:
+            end = _last_boundary(text, *second)
+            if end is not None:
+                return end
+
+        end = _last_boundary(text, *first)
+        if end is not None:
+            return end
+
+    return _last_boundary(text, position, name_end)
+
+
+def tokenize(text: str) -> Iterator[Node]:
+    """
+    Разбор списка карт за линейное время, выдает те же узлы что и
+    LayerSpec.parse_regex
+    """
+    position = 0
+    length = len(text)
+
+    while position < length:
+        if position == 0 or text[position - 1] == "\n":
+            end = _match_layer(text, position)
+            if end is not None:
+                yield Node(_LAYER_KIND, text[position:end])
+                position = end
+                continue
+
+        match = _OTHER_NODES.match(text, position)
+        yield Node(match.lastgroup, match.group())
+        position = match.end()
+
+
 def error_description(kind, line, value):
     """Генерация человекочитаемого описания ошибок"""
     match kind:
@@ -0,0 +1,22 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from server_rotations.models import LayersCatalog
+
+
+class Command(BaseCommand):
+    help = "Импорт каталога известных карт из текстового файла, каталог с таким названием перезаписывается"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path", type=Path, help="Путь до файла, каждая карта с новой строки")
+        parser.add_argument("--title", default="Основной", help="Название каталога")
+
+    def handle(self, *args, **options):
+        try:
+            layers = options["path"].read_text(encoding="utf-8-sig")
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(f"Не удалось прочитать файл, {e}")
+
+        catalog, _ = LayersCatalog.objects.update_or_create(title=options["title"], defaults={"layers": layers})
+
+        self.stdout.write(f"Каталог {catalog.title}: {len(catalog.get_layers())} карт")
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.29 on 2026-10-19 16:29
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server_rotations', '0009_rotationlayerspack_slug_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rotation',
+            name='packs_update_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='Обновляется при любом изменении наборов карт ротации, по ней сбрасывается кеш расписания', verbose_name='Дата изменения наборов карт'),
+        ),
+    ]
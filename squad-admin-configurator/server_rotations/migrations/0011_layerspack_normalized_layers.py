@@ -0,0 +1,46 @@
+# Generated by Django 4.2.29 on 2026-10-19 16:30
+
+import re
+
+from django.db import migrations, models
+
+# Копия формата списка карт из server_rotations.layers_parser на момент
+# миграции, чтобы дальнейшие изменения разбора не меняли ее результат
+LAYERS_REGEX = re.compile(
+    r"(?P<LAYER>^[A-Za-z0-9_-]+(?: *\|{1,2} *[A-Za-z+ ]+){0,2}\b)"
+    r"|(?P<EMPTY>[ \t]+)"
+    r"|(?P<COMMENT>(#|//).*$)"
+    r"|(?P<NEWLINE>\r\n|\r|\n)"
+    r"|(?P<MISMATCH>.+)",
+    re.M,
+)
+
+
+def get_layers(text):
+    return [match.group() for match in LAYERS_REGEX.finditer(text) if match.lastgroup == "LAYER"]
+
+
+def fill_normalized_layers(apps, schema_editor):
+    model_layers_pack = apps.get_model("server_rotations", "LayersPack")
+
+    packs = list(model_layers_pack.objects.only("pk", "layers"))
+    for pack in packs:
+        pack.normalized_layers = get_layers(pack.layers)
+
+    model_layers_pack.objects.bulk_update(packs, ["normalized_layers"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server_rotations', '0010_rotation_packs_update_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='layerspack',
+            name='normalized_layers',
+            field=models.JSONField(default=list, editable=False, help_text='Список карт без комментариев и пустых строк, заполняется при сохранении', verbose_name='Обработанный список карт'),
+        ),
+        migrations.RunPython(fill_normalized_layers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.29 on 2026-10-19 16:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server_rotations', '0011_layerspack_normalized_layers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LayersCatalog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(help_text='Название каталога', max_length=100, unique=True, verbose_name='Название')),
+                ('is_active', models.BooleanField(default=True, help_text='Используется ли каталог для проверки карт', verbose_name='Активирован')),
+                ('layers', models.TextField(blank=True, help_text='Названия известных карт, каждая с новой строки, пустые строки и комментарии с # или // пропускаются', verbose_name='Список карт')),
+                ('update_date', models.DateTimeField(auto_now=True, help_text='Дата последнего изменения каталога', verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'каталог карт',
+                'verbose_name_plural': '3. Каталоги карт',
+                'ordering': ['title'],
+            },
+        ),
+    ]
@@ -1,8 +1,13 @@
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 
 from .layers_parser import LayerSpec
 
+# Слаги, совпадающие с постоянными адресами API ротации (<url>/forecast),
+# набор с таким слагом по адресу <url>/<slug> получить нельзя
+RESERVED_SLUGS = ("forecast",)
+
 
 class LayersPack(models.Model):
     """Пак с картами"""
@@ -14,6 +19,12 @@ class LayersPack(models.Model):
         help_text="Список карт, каждая карта (леер) с новой строки, поддерживаются комментарии с символа # или //",
         blank=True,
     )
+    normalized_layers = models.JSONField(
+        "Обработанный список карт",
+        help_text="Список карт без комментариев и пустых строк, заполняется при сохранении",
+        default=list,
+        editable=False,
+    )
     creation_date = models.DateTimeField(
         "Дата добавления", help_text="Дата добавления наборка с картами", auto_now_add=True
     )
@@ -26,10 +37,19 @@ class LayersPack(models.Model):
     def __str__(self) -> str:
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Обработанный список заполняется только здесь, clean лишь проверяет ошибки
+        self.normalized_layers = LayerSpec.get_layers(LayerSpec.parse(self.layers))
+        return super().save(*args, **kwargs)
+
     def clean(self):
+        from .layers_catalog import layers_catalog__get_index
+
         parsed_layers = LayerSpec.parse(self.layers)
 
-        errors: list[str] = LayerSpec.check_errors(parsed_layers)
+        errors: list[str] = LayerSpec.check_errors(parsed_layers) + layers_catalog__get_index().check_errors(
+            parsed_layers
+        )
 
         if errors:
             raise ValidationError({"layers": errors})
@@ -106,6 +126,9 @@ class RotationLayersPack(models.Model):
         ):
             raise ValidationError({"slug": ["Такое название уже есть"]})
 
+        if self.slug in RESERVED_SLUGS:
+            raise ValidationError({"slug": ["Это название занято адресом API"]})
+
         if self.start_date and (self.start_time_at is None or self.end_time_at is None):
             raise ValidationError(
                 {
@@ -144,6 +167,13 @@ class Rotation(models.Model):
 
     creation_date = models.DateTimeField("Дата добавление", help_text="Дата добавления ротации", auto_now_add=True)
 
+    packs_update_date = models.DateTimeField(
+        "Дата изменения наборов карт",
+        help_text="Обновляется при любом изменении наборов карт ротации, по ней сбрасывается кеш расписания",
+        default=timezone.now,
+        editable=False,
+    )
+
     class Meta:
         verbose_name = "ротация"
         verbose_name_plural = "1. Ротации"
@@ -151,3 +181,33 @@ class Rotation(models.Model):
 
     def __str__(self) -> str:
         return self.title
+
+
+class LayersCatalog(models.Model):
+    """Каталог известных карт, по нему проверяются наборы с картами"""
+
+    title = models.CharField("Название", help_text="Название каталога", max_length=100, unique=True)
+    is_active = models.BooleanField("Активирован", help_text="Используется ли каталог для проверки карт", default=True)
+    layers = models.TextField(
+        "Список карт",
+        help_text="Названия известных карт, каждая с новой строки, пустые строки и комментарии с # или // пропускаются",
+        blank=True,
+    )
+    update_date = models.DateTimeField("Дата изменения", help_text="Дата последнего изменения каталога", auto_now=True)
+
+    class Meta:
+        verbose_name = "каталог карт"
+        verbose_name_plural = "3. Каталоги карт"
+        ordering = ["title"]
+
+    def __str__(self) -> str:
+        return self.title
+
+    def get_layers(self) -> list[str]:
+        layers = []
+        for line in self.layers.splitlines():
+            layer = line.split("#", 1)[0].split("//", 1)[0].strip()
+            if layer:
+                layers.append(layer)
+
+        return layers
@@ -0,0 +1,24 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .layers_catalog import layers_catalog__expire_index
+from .models import LayersCatalog, LayersPack, Rotation, RotationLayersPack
+
+
+@receiver(post_save, sender=RotationLayersPack)
+@receiver(post_delete, sender=RotationLayersPack)
+def touch_rotation_by_rotation_pack(sender, instance: RotationLayersPack, **kwargs) -> None:
+    Rotation.objects.filter(pk=instance.rotation_id).update(packs_update_date=timezone.now())
+
+
+@receiver(post_save, sender=LayersPack)
+def touch_rotations_by_pack(sender, instance: LayersPack, **kwargs) -> None:
+    Rotation.objects.filter(packs_through__pack=instance).update(packs_update_date=timezone.now())
+
+
+@receiver(post_save, sender=LayersCatalog)
+@receiver(post_delete, sender=LayersCatalog)
+def expire_layers_catalog_index(sender, instance: LayersCatalog, **kwargs) -> None:
+    transaction.on_commit(layers_catalog__expire_index)
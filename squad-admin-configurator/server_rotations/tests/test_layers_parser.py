@@ -0,0 +1,73 @@
+import random
+
+from django.test import SimpleTestCase
+from server_rotations.layers_parser import LayerSpec, Node
+
+FRAGMENTS = (
+    "Narva_RAAS_v1",
+    "Gorodok-AAS",
+    " | ",
+    "||",
+    "|",
+    "USA+CombinedArms",
+    "RUS",
+    " ",
+    "  ",
+    "\t",
+    "\n",
+    "\r\n",
+    "\r",
+    "#",
+    "//",
+    "-",
+    "_",
+    "+",
+    "é",
+    "Ж",
+    "1",
+    ".",
+)
+
+SEED = 20261019
+FUZZ_CASES = 3000
+MAX_FRAGMENTS = 40
+
+# Длинная строка пробелов между |, на ней регулярное выражение перебирает
+# все разбиения пробелов между " *" и "[A-Za-z+ ]+" обеих групп фракций
+PATHOLOGICAL_INPUTS = {
+    "spaces between pipes": lambda size: "Map|" + " " * size + "|\n",
+    "spaces in both groups": lambda size: "Map|" + " " * size + "||" + " " * size + "\n",
+    "many lines": lambda size: "Narva_RAAS_v1 | USA+CombinedArms | RUS // comment\n" * size,
+}
+
+
+class LayersTokenizerTest(SimpleTestCase):
+    """Линейный разбор списка карт выдает те же узлы, что и эталонное регулярное выражение"""
+
+    def test_random_texts(self) -> None:
+        rand = random.Random(SEED)
+
+        for _ in range(FUZZ_CASES):
+            text = "".join(rand.choice(FRAGMENTS) for _ in range(rand.randint(0, MAX_FRAGMENTS)))
+
+            self.assertEqual(LayerSpec.parse(text), LayerSpec.parse_regex(text), text)
+
+    def test_pathological_inputs(self) -> None:
+        for title, make_input in PATHOLOGICAL_INPUTS.items():
+            with self.subTest(title):
+                text = make_input(25)
+
+                self.assertEqual(LayerSpec.parse(text), LayerSpec.parse_regex(text))
+
+    def test_long_input(self) -> None:
+        # На таком размере регулярное выражение перебирает разбиения пробелов очень долго
+        text = PATHOLOGICAL_INPUTS["spaces in both groups"](5000)
+
+        self.assertEqual(LayerSpec.parse(text)[0], Node(LayerSpec.LAYER.name, "Map"))
+
+    def test_layers(self) -> None:
+        text = "Narva_RAAS_v1 | USA+CombinedArms || RUS\n# комментарий\n\nGorodok_AAS_v2 // комментарий\n"
+
+        self.assertEqual(
+            LayerSpec.get_layers(LayerSpec.parse(text)), ["Narva_RAAS_v1 | USA+CombinedArms || RUS", "Gorodok_AAS_v2"]
+        )
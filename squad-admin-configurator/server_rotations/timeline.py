@@ -0,0 +1,261 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+
+from .models import Rotation, RotationLayersPack
+
+
+@dataclass(frozen=True, slots=True)
+class TimeWindows:
+    """
+    Наборы карт с временем применения, отсортированные по
+    (start_time_at, end_time_at, -id)
+    """
+
+    starts: tuple[time, ...]
+    packs: tuple[RotationLayersPack, ...]
+    ends: tuple[time, ...]
+
+    @classmethod
+    def from_packs(cls, packs: Iterable[RotationLayersPack]) -> "TimeWindows":
+        sorted_packs = tuple(sorted(packs, key=lambda pack: (pack.start_time_at, pack.end_time_at, -pack.pk)))
+        return cls(
+            starts=tuple(pack.start_time_at for pack in sorted_packs),
+            packs=sorted_packs,
+            ends=tuple(sorted(pack.end_time_at for pack in sorted_packs)),
+        )
+
+    def get_next_boundary(self, now: datetime) -> datetime | None:
+        """
+        Ближайшее после now начало окна или первый момент после окончания
+        окна (окончание входит в окно), в пределах дня now
+        """
+        moment = now.time()
+        boundaries: list[datetime] = []
+
+        index = bisect_right(self.starts, moment)
+        if index < len(self.starts):
+            boundaries.append(datetime.combine(now.date(), self.starts[index], tzinfo=now.tzinfo))
+
+        index = bisect_left(self.ends, moment)
+        if index < len(self.ends):
+            end = datetime.combine(now.date(), self.ends[index], tzinfo=now.tzinfo)
+            boundaries.append(end + timedelta(microseconds=1))
+
+        return min(boundaries, default=None)
+
+    def find(self, moment: time) -> RotationLayersPack | None:
+        """
+        Набор с самым поздним началом среди тех, в чей интервал попадает
+        moment, при равенстве - с самым поздним окончанием, затем с меньшим id
+        """
+        for index in range(bisect_right(self.starts, moment) - 1, -1, -1):
+            if self.packs[index].end_time_at >= moment:
+                return self.packs[index]
+
+        return None
+
+
+@dataclass(slots=True)
+class ForecastEntry:
+    """Промежуток [start, end) в течение которого будет выдаваться набор карт"""
+
+    start: datetime
+    end: datetime
+    pack: RotationLayersPack | None
+
+
+@dataclass(frozen=True, slots=True)
+class RotationTimeline:
+    """
+    Скомпилированное расписание ротации, выбор текущего набора карт -
+    бинарный поиск без запросов к базе
+
+    Приоритет совпадает с RotationDistribution.query_current_pack: сначала
+    наборы на конкретную дату, затем ежедневные наборы по времени, затем
+    набор с текущим номером в очереди
+    """
+
+    queue_numbers: tuple[int, ...]
+    queue: tuple[RotationLayersPack, ...]
+    dated_windows: dict[date, TimeWindows]
+    daily_windows: TimeWindows
+    packs_by_slug: dict[str, RotationLayersPack]
+
+    @classmethod
+    def compile(cls, rotation_packs: Iterable[RotationLayersPack]) -> "RotationTimeline":
+        queue: list[RotationLayersPack] = []
+        dated_packs: defaultdict[date, list[RotationLayersPack]] = defaultdict(list)
+        daily_packs: list[RotationLayersPack] = []
+        packs_by_slug: dict[str, RotationLayersPack] = {}
+
+        for pack in sorted(rotation_packs, key=lambda pack: pack.pk):
+            if pack.slug and pack.slug not in packs_by_slug:
+                packs_by_slug[pack.slug] = pack
+
+            if pack.queue_number is not None:
+                queue.append(pack)
+            elif pack.start_time_at is not None and pack.end_time_at is not None:
+                if pack.start_date is not None:
+                    dated_packs[pack.start_date].append(pack)
+                else:
+                    daily_packs.append(pack)
+
+        queue.sort(key=lambda pack: (pack.queue_number, pack.pk))
+
+        return cls(
+            queue_numbers=tuple(pack.queue_number for pack in queue),
+            queue=tuple(queue),
+            dated_windows={day: TimeWindows.from_packs(packs) for day, packs in dated_packs.items()},
+            daily_windows=TimeWindows.from_packs(daily_packs),
+            packs_by_slug=packs_by_slug,
+        )
+
+    def get_current_pack(self, now: datetime, last_queue_number: int) -> RotationLayersPack | None:
+        moment = now.time()
+
+        dated_windows = self.dated_windows.get(now.date())
+        if dated_windows is not None:
+            pack = dated_windows.find(moment)
+            if pack is not None:
+                return pack
+
+        pack = self.daily_windows.find(moment)
+        if pack is not None:
+            return pack
+
+        index = bisect_left(self.queue_numbers, last_queue_number)
+        if index < len(self.queue_numbers) and self.queue_numbers[index] == last_queue_number:
+            return self.queue[index]
+
+        return None
+
+    def get_next_window_boundary(self, now: datetime) -> datetime:
+        """
+        Ближайший момент после now, когда выбор набора по временным окнам
+        может измениться, не позже следующей полуночи (смена дня меняет
+        наборы на конкретную дату)
+        """
+        midnight = datetime.combine(now.date() + timedelta(days=1), time.min, tzinfo=now.tzinfo)
+        boundaries = [midnight, self.daily_windows.get_next_boundary(now)]
+
+        dated_windows = self.dated_windows.get(now.date())
+        if dated_windows is not None:
+            boundaries.append(dated_windows.get_next_boundary(now))
+
+        return min(boundary for boundary in boundaries if boundary is not None)
+
+    def get_next_pack_by_queue(self, last_queue_number: int) -> RotationLayersPack | None:
+        index = bisect_right(self.queue_numbers, last_queue_number)
+        if index < len(self.queue):
+            return self.queue[index]
+
+        for pack in self.queue:
+            if pack.start_date is None:
+                return pack
+
+        return None
+
+    def get_scheduled_pack(self, now: datetime, last_queue_number: int, is_new_day: bool) -> RotationLayersPack | None:
+        """
+        Набор, который выберет CreateRotationsFiles: текущий набор, без него -
+        следующий в очереди, при первом запуске за день (is_new_day) очередь
+        сдвигается, если текущий набор взят из нее
+        """
+        pack = self.get_current_pack(now, last_queue_number)
+        if pack is None:
+            return self.get_next_pack_by_queue(last_queue_number)
+
+        if is_new_day and pack.queue_number == last_queue_number:
+            return self.get_next_pack_by_queue(last_queue_number)
+
+        return pack
+
+    def forecast(
+        self,
+        start: datetime,
+        end: datetime,
+        last_queue_number: int,
+        last_update_date: datetime | None,
+        advance_queue: bool,
+    ) -> list[ForecastEntry]:
+        """
+        Моделирование выдачи наборов с start до end, расчет ведется только на
+        границах временных окон и на смене дня, без перебора запусков крона
+
+        advance_queue - сдвигает ли очередь CreateRotationsFiles, день для
+        сдвига считается по UTC, как и в крон-задаче. Задержка крона между
+        границей и его ближайшим запуском не учитывается
+        """
+        entries: list[ForecastEntry] = []
+        last_update_day = last_update_date.astimezone(dt_timezone.utc).date() if last_update_date else None
+        moment = start
+
+        while moment < end:
+            next_moment = self.get_next_window_boundary(moment)
+
+            if advance_queue:
+                utc_day = moment.astimezone(dt_timezone.utc).date()
+                pack = self.get_scheduled_pack(moment, last_queue_number, is_new_day=last_update_day != utc_day)
+                last_update_day = utc_day
+
+                if pack is not None and pack.queue_number is not None:
+                    last_queue_number = pack.queue_number
+
+                next_utc_day = datetime.combine(utc_day + timedelta(days=1), time.min, tzinfo=dt_timezone.utc)
+                next_moment = min(next_moment, next_utc_day.astimezone(moment.tzinfo))
+            else:
+                pack = self.get_current_pack(moment, last_queue_number)
+
+            next_moment = min(next_moment, end)
+
+            if entries and entries[-1].pack is pack:
+                entries[-1].end = next_moment
+            else:
+                entries.append(ForecastEntry(start=moment, end=next_moment, pack=pack))
+
+            moment = next_moment
+
+        return entries
+
+
+# rotation_id -> (packs_update_date, расписание), у каждого процесса свой кеш,
+# устаревшее расписание определяется по дате изменения наборов у ротации
+_timelines: dict[int, tuple[datetime, RotationTimeline]] = {}
+
+
+def rotation__get_timeline(*, rotation: Rotation) -> RotationTimeline:
+    return rotation__get_timelines(rotations=[rotation])[rotation.pk]
+
+
+def rotation__get_timelines(*, rotations: Iterable[Rotation]) -> dict[int, RotationTimeline]:
+    """
+    Расписания для нескольких ротаций, наборы карт всех устаревших
+    расписаний загружаются одним запросом
+    """
+    timelines: dict[int, RotationTimeline] = {}
+    stale_rotations: list[Rotation] = []
+
+    for rotation in rotations:
+        cached = _timelines.get(rotation.pk)
+        if cached is not None and cached[0] == rotation.packs_update_date:
+            timelines[rotation.pk] = cached[1]
+        else:
+            stale_rotations.append(rotation)
+
+    if not stale_rotations:
+        return timelines
+
+    packs_by_rotation: defaultdict[int, list[RotationLayersPack]] = defaultdict(list)
+    for pack in RotationLayersPack.objects.select_related("pack").filter(rotation__in=stale_rotations):
+        packs_by_rotation[pack.rotation_id].append(pack)
+
+    for rotation in stale_rotations:
+        timeline = RotationTimeline.compile(packs_by_rotation[rotation.pk])
+        _timelines[rotation.pk] = (rotation.packs_update_date, timeline)
+        timelines[rotation.pk] = timeline
+
+    return timelines
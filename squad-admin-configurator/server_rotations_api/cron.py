@@ -2,49 +2,54 @@ from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 from django_cron import CronJobBase, Schedule
+from server_rotations.timeline import rotation__get_timelines
+from utils import write_file_atomically
 
 from .models import RotationDistribution
 
 
 class CreateRotationsFiles(CronJobBase):
+    """
+    Расписания всех ротаций загружаются одним запросом, текущий набор
+    карт выбирается в памяти, файл перезаписывается только если изменилось
+    его содержимое, состояние распространений сохраняется одним запросом
+    """
+
     schedule = Schedule(run_every_mins=2)
     code = "Обновление локальных файлов с ротациями"
 
     def do(self):
         now = timezone.now()
 
-        rot_distributions = RotationDistribution.objects.select_related("rotation").filter(
-            is_active=True,
-            type_of_distribution__in=RotationDistribution.TYPES_OF_DISTRIBUTION_WITH_LOCAL,
+        rot_distributions = list(
+            RotationDistribution.objects.select_related("rotation").filter(
+                is_active=True,
+                type_of_distribution__in=RotationDistribution.TYPES_OF_DISTRIBUTION_WITH_LOCAL,
+            )
         )
 
-        settings.ROTATIONS_CONFIG_DIR.mkdir(exist_ok=True)
+        timelines = rotation__get_timelines(rotations=[distrib.rotation for distrib in rot_distributions])
+        local_now = timezone.localtime(now)
 
-        with transaction.atomic():
-            for distrib in rot_distributions:
-                pack = distrib.get_current_pack()
-                if pack is None:
-                    pack = distrib.get_next_pack_by_queue()
-                else:
-                    last_update_date_pass = (
-                        (distrib.last_update_date.date() != now.date()) if distrib.last_update_date else True
-                    )
+        settings.ROTATIONS_CONFIG_DIR.mkdir(exist_ok=True)
 
-                    is_need_next_pack = distrib.last_queue_number == pack.queue_number and last_update_date_pass
+        for distrib in rot_distributions:
+            is_new_day = (distrib.last_update_date.date() != now.date()) if distrib.last_update_date else True
+            pack = timelines[distrib.rotation_id].get_scheduled_pack(local_now, distrib.last_queue_number, is_new_day)
 
-                    if is_need_next_pack:
-                        pack = distrib.get_next_pack_by_queue()
+            config_hash = distrib.get_config_hash(pack)
+            path = settings.ROTATIONS_CONFIG_DIR / distrib.local_filename
 
-                with open(
-                    settings.ROTATIONS_CONFIG_DIR / distrib.local_filename,
-                    "w",
-                    encoding="utf-8",
-                ) as file:
-                    file.write(distrib.format_config(pack))
+            if config_hash != distrib.local_config_hash or not path.exists():
+                write_file_atomically(path, distrib.format_config(pack))
+                distrib.local_config_hash = config_hash
 
-                distrib.last_update_date = now
+            distrib.last_update_date = now
 
-                if pack and pack.queue_number is not None:
-                    distrib.last_queue_number = pack.queue_number
+            if pack and pack.queue_number is not None:
+                distrib.last_queue_number = pack.queue_number
 
-                distrib.save()
+        with transaction.atomic():
+            RotationDistribution.objects.bulk_update(
+                rot_distributions, ["last_update_date", "last_queue_number", "local_config_hash"]
+            )
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.29 on 2026-10-19 16:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server_rotations_api', '0005_alter_rotationdistribution_description_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rotationdistribution',
+            name='local_config_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Хеш содержимого локального файла без даты генерации, файл перезаписывается только при изменении', max_length=64, verbose_name='Хеш локального файла'),
+        ),
+    ]
@@ -1,10 +1,14 @@
+import hashlib
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
+
 from base import DistributionModel
 from django.conf import settings
 from django.db import models
 from django.db.models import F, Q
 from django.utils import timezone
-from server_rotations.layers_parser import LayerSpec
 from server_rotations.models import Rotation, RotationLayersPack
+from server_rotations.timeline import ForecastEntry, rotation__get_timeline
 
 
 class RotationDistribution(DistributionModel):
@@ -25,17 +29,80 @@ class RotationDistribution(DistributionModel):
         "Последний номер в очереди", help_text="Последний номер набора с картами который был взят из ротации", default=1
     )
 
+    local_config_hash = models.CharField(
+        "Хеш локального файла",
+        help_text="Хеш содержимого локального файла без даты генерации, файл перезаписывается только при изменении",
+        max_length=64,
+        blank=True,
+        editable=False,
+    )
+
     class Meta(DistributionModel.Meta):
         verbose_name = "распространение ротации"
         verbose_name_plural = "1. Распространение ротаций"
         ordering = ["rotation"]
 
     def get_next_pack_by_queue(self) -> RotationLayersPack | None:
+        return rotation__get_timeline(rotation=self.rotation).get_next_pack_by_queue(self.last_queue_number)
+
+    def get_current_pack(self) -> RotationLayersPack | None:
+        return rotation__get_timeline(rotation=self.rotation).get_current_pack(
+            timezone.localtime(), self.last_queue_number
+        )
+
+    @property
+    def advances_queue(self) -> bool:
+        """Сдвигает ли CreateRotationsFiles очередь этого распространения"""
+        return self.is_active and self.type_of_distribution in self.TYPES_OF_DISTRIBUTION_WITH_LOCAL
+
+    def get_forecast(self, start: datetime, end: datetime) -> list[ForecastEntry]:
+        return rotation__get_timeline(rotation=self.rotation).forecast(
+            timezone.localtime(start),
+            end,
+            self.last_queue_number,
+            self.last_update_date,
+            advance_queue=self.advances_queue,
+        )
+
+    def get_current_pack_expiry_date(self, now: datetime | None = None) -> datetime:
+        """
+        Момент, до которого результат get_current_pack не изменится: ближайшая
+        граница временного окна ротации или ежедневный сдвиг очереди
+
+        Очередь сдвигает CreateRotationsFiles при первом запуске после смены
+        даты в UTC, пока сдвиг не выполнен - возвращается now
+        """
+        now = timezone.localtime(now)
+        expiry_date = rotation__get_timeline(rotation=self.rotation).get_next_window_boundary(now)
+
+        if not self.advances_queue:
+            return expiry_date
+
+        utc_now = now.astimezone(dt_timezone.utc)
+        if self.last_update_date is None:
+            return now
+
+        if self.last_update_date.astimezone(dt_timezone.utc).date() != utc_now.date():
+            return now
+
+        next_utc_day = datetime.combine(utc_now.date() + timedelta(days=1), time.min, tzinfo=dt_timezone.utc)
+
+        return min(expiry_date, next_utc_day)
+
+    def get_pack_by_slug(self, slug: str) -> RotationLayersPack | None:
+        return rotation__get_timeline(rotation=self.rotation).packs_by_slug.get(slug)
+
+    def query_next_pack_by_queue(self) -> RotationLayersPack | None:
+        """
+        Эталонная реализация get_next_pack_by_queue через ORM, используется
+        для проверки скомпилированного расписания
+        """
         rotation_pack_manager = RotationLayersPack.objects.select_related("pack")
 
         pack_m2m = (
             rotation_pack_manager.order_by(
                 "queue_number",
+                "id",
             )
             .filter(
                 queue_number__isnull=False,
@@ -47,7 +114,7 @@ class RotationDistribution(DistributionModel):
 
         if pack_m2m is None:
             pack_m2m = (
-                rotation_pack_manager.order_by("queue_number")
+                rotation_pack_manager.order_by("queue_number", "id")
                 .filter(
                     queue_number__isnull=False,
                     rotation=self.rotation,
@@ -58,8 +125,12 @@ class RotationDistribution(DistributionModel):
 
         return pack_m2m
 
-    def get_current_pack(self) -> RotationLayersPack | None:
-        now: timezone.datetime = timezone.localtime()
+    def query_current_pack(self, now: datetime | None = None) -> RotationLayersPack | None:
+        """
+        Эталонная реализация get_current_pack через ORM, используется для
+        проверки скомпилированного расписания
+        """
+        now = timezone.localtime(now)
         pack_m2m = (
             RotationLayersPack.objects.select_related("pack")
             .order_by(
@@ -79,10 +150,17 @@ class RotationDistribution(DistributionModel):
         )
         return pack_m2m
 
-    def format_config(self, pack_m2m: RotationLayersPack | None) -> str:
-        now = timezone.localtime()
+    def get_config_hash(self, pack_m2m: RotationLayersPack | None) -> str:
+        return hashlib.sha256(self.format_config(pack_m2m, with_date=False).encode()).hexdigest()
+
+    def format_config(self, pack_m2m: RotationLayersPack | None, with_date: bool = True) -> str:
+        """
+        Текст файла ротации, без даты генерации (with_date=False) текст
+        зависит только от набора карт и используется для сравнения содержимого
+        """
+        date_text = f"{timezone.localtime().strftime(settings.DATETIME_FORMAT)} {settings.TIME_ZONE}"
         if pack_m2m is None:
-            return f"// Ротаций не найдено {now.strftime(settings.DATETIME_FORMAT)} {settings.TIME_ZONE}"
+            return f"// Ротаций не найдено {date_text}" if with_date else "// Ротаций не найдено"
 
         number = None
         date = None
@@ -95,14 +173,12 @@ class RotationDistribution(DistributionModel):
                 f"по {pack_m2m.end_time_at.strftime(settings.TIME_FORMAT)}"
             )
 
-        layers = [layer.value for layer in LayerSpec.parse(pack_m2m.pack.layers) if layer.kind == LayerSpec.LAYER.name]
-
-        layers_text = "\n".join(layers)
+        layers_text = "\n".join(pack_m2m.pack.normalized_layers)
 
         config = (
             f"// {self.rotation.title}"
             f" - {number or date}"
-            f" - {now.strftime(settings.DATETIME_FORMAT)} {settings.TIME_ZONE}\n\n"
+            f"{f' - {date_text}' if with_date else ''}\n\n"
             f"{layers_text}"
         )
 
@@ -0,0 +1,22 @@
+from rest_framework import serializers
+
+MAX_FORECAST_DAYS = 31
+
+
+class ForecastQuerySerializer(serializers.Serializer):
+    days = serializers.IntegerField(min_value=1, max_value=MAX_FORECAST_DAYS, default=14)
+
+
+class ForecastEntrySerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    queue_number = serializers.IntegerField(source="pack.queue_number", allow_null=True, default=None)
+    slug = serializers.CharField(source="pack.slug", allow_null=True, default=None)
+    title = serializers.CharField(source="pack.pack.title", allow_null=True, default=None)
+
+
+class ForecastSerializer(serializers.Serializer):
+    rotation = serializers.CharField(source="rotation.title")
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    schedule = ForecastEntrySerializer(many=True)
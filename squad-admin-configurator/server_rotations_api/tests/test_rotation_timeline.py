@@ -0,0 +1,149 @@
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+
+from django.test import TestCase
+from django.utils import timezone
+from server_rotations.models import LayersPack, Rotation, RotationLayersPack
+from server_rotations.timeline import ForecastEntry, RotationTimeline
+from server_rotations_api.cron import CreateRotationsFiles
+from server_rotations_api.models import RotationDistribution
+
+DAY = date(2026, 1, 5)
+
+
+class RotationTimelineTest(TestCase):
+    """
+    Скомпилированное расписание ротации сверяется с эталонными запросами
+    через ORM на границах всех интервалов и всех номерах очереди
+    """
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        rotation = Rotation.objects.create(title="Ротация")
+        layers_pack = LayersPack.objects.create(title="Набор", layers="Narva_RAAS_v1")
+
+        packs = [
+            {"queue_number": 1},
+            {"queue_number": 2},
+            # Одинаковые номера в очереди упорядочиваются по ID
+            {"queue_number": 2},
+            {"queue_number": 5},
+            {"start_time_at": time(10), "end_time_at": time(12)},
+            # Пересекающееся окно
+            {"start_time_at": time(11), "end_time_at": time(13)},
+            {"start_date": DAY, "start_time_at": time(14), "end_time_at": time(15)},
+            {"start_date": DAY + timedelta(days=1), "start_time_at": time(9), "end_time_at": time(18)},
+            {"start_time_at": time(23, 30), "end_time_at": time(23, 59, 59)},
+        ]
+        RotationLayersPack.objects.bulk_create(
+            RotationLayersPack(rotation=rotation, pack=layers_pack, **fields) for fields in packs
+        )
+
+        cls.distrib = RotationDistribution.objects.create(
+            rotation=rotation, title="Распространение", type_of_distribution=RotationDistribution.LOCAL
+        )
+
+    def setUp(self) -> None:
+        self.packs = list(RotationLayersPack.objects.select_related("pack").filter(rotation=self.distrib.rotation))
+        self.timeline = RotationTimeline.compile(self.packs)
+
+    def test_next_pack_by_queue(self) -> None:
+        for queue_number in self.get_queue_numbers():
+            with self.subTest(queue_number=queue_number):
+                self.distrib.last_queue_number = queue_number
+
+                self.assertSamePack(
+                    self.timeline.get_next_pack_by_queue(queue_number), self.distrib.query_next_pack_by_queue()
+                )
+
+    def test_current_pack(self) -> None:
+        for queue_number in self.get_queue_numbers():
+            self.distrib.last_queue_number = queue_number
+
+            for moment in self.get_moments():
+                with self.subTest(queue_number=queue_number, moment=moment):
+                    self.assertSamePack(
+                        self.timeline.get_current_pack(moment, queue_number), self.distrib.query_current_pack(moment)
+                    )
+
+    def test_forecast(self) -> None:
+        start = timezone.make_aware(datetime.combine(DAY, time(8, 0, 30)))
+
+        for last_update_date in (None, start - timedelta(days=1), start):
+            with self.subTest(last_update_date=last_update_date):
+                self.distrib.last_queue_number = 1
+                self.distrib.last_update_date = last_update_date
+
+                self.check_forecast(start, start + timedelta(days=2))
+
+    def check_forecast(self, start: datetime, end: datetime) -> None:
+        """
+        Пошаговое моделирование запусков CreateRotationsFiles, на каждом
+        запуске набор, выбранный по эталонным запросам через ORM, должен
+        совпадать с прогнозом скомпилированного расписания
+        """
+        forecast = self.timeline.forecast(
+            start, end, self.distrib.last_queue_number, self.distrib.last_update_date, True
+        )
+
+        step = timedelta(minutes=CreateRotationsFiles.schedule.run_every_mins)
+        last_update_date = self.distrib.last_update_date
+        moment = start
+
+        while moment < end:
+            utc_moment = moment.astimezone(dt_timezone.utc)
+            is_new_day = (
+                (last_update_date.astimezone(dt_timezone.utc).date() != utc_moment.date()) if last_update_date else True
+            )
+            pack = self.query_scheduled_pack(moment, is_new_day)
+
+            last_update_date = utc_moment
+            if pack is not None and pack.queue_number is not None:
+                self.distrib.last_queue_number = pack.queue_number
+
+            self.assertSamePack(pack, self.get_forecast_pack(forecast, moment), moment.isoformat())
+
+            moment += step
+
+    def query_scheduled_pack(self, moment: datetime, is_new_day: bool) -> RotationLayersPack | None:
+        """
+        Выбор набора кроном через эталонные запросы, как до появления
+        скомпилированного расписания
+        """
+        pack = self.distrib.query_current_pack(moment)
+        if pack is None or (is_new_day and pack.queue_number == self.distrib.last_queue_number):
+            return self.distrib.query_next_pack_by_queue()
+
+        return pack
+
+    def get_forecast_pack(self, forecast: list[ForecastEntry], moment: datetime) -> RotationLayersPack | None:
+        for entry in forecast:
+            if entry.start <= moment < entry.end:
+                return entry.pack
+
+        return None
+
+    def get_queue_numbers(self) -> list[int]:
+        queue_numbers = {0} | {pack.queue_number for pack in self.packs if pack.queue_number}
+        queue_numbers.add(max(queue_numbers) + 1)
+
+        return sorted(queue_numbers)
+
+    def get_moments(self) -> list[datetime]:
+        days = {DAY - timedelta(days=1)} | {pack.start_date for pack in self.packs if pack.start_date}
+
+        times = {time.min, time.max}
+        for pack in self.packs:
+            for border in (pack.start_time_at, pack.end_time_at):
+                if border is None:
+                    continue
+
+                border_datetime = datetime.combine(DAY, border)
+                times.update((border_datetime + timedelta(seconds=shift)).time() for shift in (-1, 0, 1))
+
+        return [timezone.make_aware(datetime.combine(day, moment)) for day in sorted(days) for moment in sorted(times)]
+
+    def assertSamePack(
+        self, first: RotationLayersPack | None, second: RotationLayersPack | None, msg: str | None = None
+    ) -> None:
+        self.assertEqual(first and first.pk, second and second.pk, msg)
@@ -1,5 +1,14 @@
+import hashlib
+import math
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiResponse, extend_schema
 from rest_framework import status
@@ -8,17 +17,69 @@ from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
 from .models import RotationDistribution
+from .serializers import ForecastQuerySerializer, ForecastSerializer
+
+# Текст по слагу не зависит от времени, поэтому клиент каждый раз
+# перепроверяет его по ETag, а на сервере он хранится до изменения наборов
+BY_SLUG_CACHE_TIMEOUT = 60 * 60
+
+
+def _get_cache_key(*parts) -> str:
+    return "rotation_config:" + hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def _cached_config_response(
+    request,
+    cache_key: str,
+    render: Callable[[], tuple[str, str]],
+    max_age: int,
+    cache_timeout: int,
+    last_modified: datetime | None = None,
+) -> HttpResponse:
+    """
+    Текст ротации из кеша с заголовками ETag, Last-Modified и Cache-Control,
+    на условный запрос с совпавшим ETag или датой отвечает 304
+
+    render возвращает текст файла и хеш его содержимого без даты генерации,
+    без last_modified используется дата генерации текста. ETag слабый: тексты
+    с одним хешем различаются датой генерации в комментарии
+    """
+    config = cache.get(cache_key)
+    if config is None:
+        text, config_hash = render()
+        config = {"text": text, "etag": f"W/{quote_etag(config_hash)}", "render_date": int(timezone.now().timestamp())}
+
+        if cache_timeout > 0:
+            cache.set(cache_key, config, cache_timeout)
+
+    last_modified_timestamp = int(last_modified.timestamp()) if last_modified else config["render_date"]
+
+    response = HttpResponse(config["text"], content_type="text/plain;charset=UTF-8")
+    response.headers["ETag"] = config["etag"]
+    response.headers["Last-Modified"] = http_date(last_modified_timestamp)
+    patch_cache_control(response, max_age=max_age, must_revalidate=True)
+
+    return get_conditional_response(
+        request, etag=config["etag"], last_modified=last_modified_timestamp, response=response
+    )
 
 
 class RotationDistributionViewSet(ViewSet):
     permission_classes = []
     authentication_classes = []
 
+    @classmethod
+    def get_extra_actions(cls):
+        # Маршруты с постоянным окончанием должны проверяться раньше by_slug,
+        # иначе <url>/forecast будет принят за набор со слагом forecast
+        return sorted(super().get_extra_actions(), key=lambda action: action.url_path.endswith("<str:slug>"))
+
     @action(methods=["get"], detail=False, url_path="<str:url>", url_name="current")
     @extend_schema(
         methods=["get"],
         responses={
             (200, "text/plain;charset=UTF-8"): OpenApiResponse(OpenApiTypes.STR, description="Текст ротации"),
+            304: OpenApiResponse(description="Текст ротации не изменился с указанного ETag или даты"),
             404: OpenApiResponse(OpenApiTypes.JSON_PTR, description="Ротация не найдена"),
             403: OpenApiResponse(OpenApiTypes.JSON_PTR, description="Ротация не активна"),
         },
@@ -26,19 +87,36 @@ class RotationDistributionViewSet(ViewSet):
     def current(self, request, url: str) -> HttpResponse | Response:
         distrib = get_object_or_404(RotationDistribution.objects.select_related("rotation"), url=url)
 
-        if distrib.is_active:
-            return HttpResponse(
-                distrib.format_config(distrib.get_current_pack()),
-                content_type="text/plain;charset=UTF-8",
-            )
+        if not distrib.is_active:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        now = timezone.now()
+        expiry_date = distrib.get_current_pack_expiry_date(now)
+        max_age = max(0, math.floor((expiry_date - now).total_seconds()))
+
+        def render() -> tuple[str, str]:
+            pack = distrib.get_current_pack()
+            return distrib.format_config(pack), distrib.get_config_hash(pack)
+
+        # Текст меняется только на границе расписания, при сдвиге очереди
+        # или изменении ротации, все это входит в ключ кеша
+        cache_key = _get_cache_key(
+            "current",
+            distrib.pk,
+            distrib.rotation.title,
+            distrib.rotation.packs_update_date,
+            distrib.last_queue_number,
+            expiry_date,
+        )
 
-        return Response(status=status.HTTP_403_FORBIDDEN)
+        return _cached_config_response(request, cache_key, render, max_age=max_age, cache_timeout=max_age)
 
     @action(methods=["get"], detail=False, url_path="<str:url>/<str:slug>", url_name="by_slug")
     @extend_schema(
         methods=["get"],
         responses={
             (200, "text/plain;charset=UTF-8"): OpenApiResponse(OpenApiTypes.STR, description="Текст ротации"),
+            304: OpenApiResponse(description="Текст ротации не изменился с указанного ETag или даты"),
             404: OpenApiResponse(OpenApiTypes.JSON_PTR, description="Ротация не найдена"),
             403: OpenApiResponse(OpenApiTypes.JSON_PTR, description="Ротация не активна"),
         },
@@ -49,12 +127,59 @@ class RotationDistributionViewSet(ViewSet):
         if not distrib.is_active:
             return Response(status=status.HTTP_403_FORBIDDEN)
 
-        pack = distrib.rotation.packs_through.filter(slug=slug).first()
+        pack = distrib.get_pack_by_slug(slug)
 
         if pack is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
-        return HttpResponse(
-            distrib.format_config(pack),
-            content_type="text/plain;charset=UTF-8",
+        def render() -> tuple[str, str]:
+            return distrib.format_config(pack), distrib.get_config_hash(pack)
+
+        cache_key = _get_cache_key(
+            "by_slug", distrib.pk, distrib.rotation.title, distrib.rotation.packs_update_date, slug
+        )
+
+        return _cached_config_response(
+            request,
+            cache_key,
+            render,
+            max_age=0,
+            cache_timeout=BY_SLUG_CACHE_TIMEOUT,
+            last_modified=distrib.rotation.packs_update_date,
         )
+
+    @action(methods=["get"], detail=False, url_path="<str:url>/forecast", url_name="forecast")
+    @extend_schema(
+        methods=["get"],
+        parameters=[ForecastQuerySerializer],
+        responses={
+            200: ForecastSerializer,
+            400: OpenApiResponse(OpenApiTypes.JSON_PTR, description="Не верное количество дней"),
+            404: OpenApiResponse(OpenApiTypes.JSON_PTR, description="Ротация не найдена"),
+            403: OpenApiResponse(OpenApiTypes.JSON_PTR, description="Ротация не активна"),
+        },
+    )
+    def forecast(self, request, url: str) -> Response:
+        """
+        Расписание выдачи наборов карт на ближайшие days дней, с учетом
+        ежедневного сдвига очереди и временных окон
+        """
+        distrib = get_object_or_404(RotationDistribution.objects.select_related("rotation"), url=url)
+
+        if not distrib.is_active:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        query_serializer = ForecastQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+
+        start = timezone.localtime()
+        end = start + timedelta(days=query_serializer.validated_data["days"])
+
+        forecast = {
+            "rotation": distrib.rotation,
+            "start": start,
+            "end": end,
+            "schedule": distrib.get_forecast(start, end),
+        }
+
+        return Response(ForecastSerializer(forecast).data)
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     "api.apps.ApiConfig",
     "django_cron",
     "django_cron_proxy.apps.DjangoCronProxyConfig",
+    "notifications.apps.NotificationsConfig",
     "drf_spectacular",
 ]
 
@@ -142,10 +143,10 @@ ROTATIONS_CONFIG_DIR = BASE_DIR / CONFIG["ROTATIONS"]["ROTATIONS_CONFIG_DIR"]
 
 CRON_CLASSES = [
     "api.cron.CreateAdminsConfig",
-    "server_admins.cron.DisablingPrivilegedByEndTime",
-    "server_admins.cron.DisablingServerPrivilegedByEndTime",
-    "server_admins.cron.DisablingServerPrivilegedPacksByEndTime",
+    "api.cron.DeleteOldWebhookLogs",
+    "api.cron.CompactChangeLog",
     "server_rotations_api.cron.CreateRotationsFiles",
+    "notifications.cron.DeleteSentDiscordNotifications",
 ]
 
 DJANGO_CRON_DELETE_LOGS_OLDER_THAN = CONFIG["CRON"]["DELETE_LOGS_OLDER_THAN"]
@@ -156,6 +157,8 @@ TIME_FORMAT = "%H:%M:%S"
 
 DISCORD = CONFIG["DISCORD"]
 HMAC_VALIDATION = CONFIG["HMAC_VALIDATION"]
+WEBHOOK_LOGS = CONFIG["WEBHOOK_LOGS"]
+CHANGE_LOG = CONFIG["CHANGE_LOG"]
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
@@ -201,6 +204,7 @@ JAZZMIN_SETTINGS = {
         "server_rotations_api",
         "auth",
         "django_cron_proxy",
+        "notifications",
     ],
     "icons": {
         "auth": "fas fa-users-cog",
@@ -217,9 +221,11 @@ JAZZMIN_SETTINGS = {
         "api.RoleWebhook": "fas fa-ear-listen",
         "server_rotations.LayersPack": "fas fa-book",
         "server_rotations.Rotation": "fas fa-layer-group",
+        "server_rotations.LayersCatalog": "fas fa-list",
         "server_rotations_api.RotationDistribution": "fas fa-rss",
         "auth_api.TokenProxy": "fas fa-key",
         "django_cron_proxy.CronJobLog": "fas fa-book",
+        "notifications.DiscordNotification": "fas fa-envelope",
     },
     "default_icon_parents": "fas fa-chevron-circle-right",
     "default_icon_children": "fas fa-circle",
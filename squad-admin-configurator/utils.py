@@ -1,4 +1,7 @@
+import os
 import re
+import tempfile
+from pathlib import Path
 
 from django import forms
 from django.contrib.admin.widgets import AdminTextareaWidget
@@ -48,3 +51,21 @@ def regex_validator(value) -> None:
 def url_postfix_validator(value) -> None:
     if value is not None and not re.fullmatch("[A-Za-z0-9_]+", value):
         raise ValidationError("Только латинские буквы, цифры и знак подчеркивания")
+
+
+def write_file_atomically(path: Path, text: str) -> None:
+    """
+    Запись файла через временный файл в том же каталоге и переименование,
+    читающий файл процесс всегда видит либо старое, либо новое содержимое
+    """
+    file_descriptor, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+
+    try:
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+            file.write(text)
+
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise